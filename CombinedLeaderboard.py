@@ -0,0 +1,80 @@
+#
+# CombinedLeaderboard
+#
+# One PowerScore ranking of every team across all of the divisions.
+#
+# Each division's teams are kept sorted on their own, and the combined list is a k-way merge of those (heapq.merge), so
+#   when one division refreshes only that division gets sorted again.  The merge is redone only when something changed.
+#
+# Team rows are copied when a division is taken in, so the leaderboard can be drawn while another division is in the
+#   middle of a refresh on the worker thread.
+#
+
+import heapq
+from ExternalScoring import ExternalScoring
+
+
+class CombinedLeaderboard:
+
+    # Constructor
+    def __init__(self, scoringSystems: list[ExternalScoring]):
+        self.scoringSystems = scoringSystems
+
+        # per division: its teams, best PowerScore first, and the data they came from
+        self.divisionRows = [[] for scoringSystem in scoringSystems]
+        self.divisionBuiltFrom = [None for scoringSystem in scoringSystems]
+
+        # the merged list (None when it needs to be merged again)
+        self.rows = None
+
+    # Take in a division's latest data, if it has changed.  Only call this when the division isn't being refreshed.
+    #   Returns True if anything changed.
+    def updateDivision(self, divisionIndex):
+
+        scoringSystem = self.scoringSystems[divisionIndex]
+
+        builtFrom = (scoringSystem.getTeams(), scoringSystem.getUpdateCount())
+        current = self.divisionBuiltFrom[divisionIndex]
+        if current is not None and current[0] is builtFrom[0] and current[1] == builtFrom[1]:
+            return False
+
+        # nothing to rank until the division has loaded
+        if scoringSystem.getUpdateCount() == 0:
+            return False
+
+        teams = scoringSystem.getTeams()
+        rows = []
+        for teamNum in teams:
+            row = dict(teams[teamNum])
+            row['division'] = divisionIndex
+            row['eventCode'] = scoringSystem.eventCode
+            rows.append(row)
+        rows.sort(key=self.sortKey)
+
+        self.divisionRows[divisionIndex] = rows
+        self.divisionBuiltFrom[divisionIndex] = builtFrom
+        self.rows = None
+        return True
+
+    # Forget a division that has been unloaded (see DivisionCache).  It comes back with its next refresh.
+    def dropDivision(self, divisionIndex):
+        if self.divisionBuiltFrom[divisionIndex] is None:
+            return False
+        self.divisionRows[divisionIndex] = []
+        self.divisionBuiltFrom[divisionIndex] = None
+        self.rows = None
+        return True
+
+    # Highest PowerScore first.  Ties go to the lower team number, so the order never jumps around between redraws.
+    @staticmethod
+    def sortKey(row):
+        return (-row['powerScore'], row['number'])
+
+    # Every team from every loaded division, best PowerScore first
+    def getRows(self):
+        if self.rows is None:
+            self.rows = list(heapq.merge(*self.divisionRows, key=self.sortKey))
+        return self.rows
+
+    def getLoadedCount(self):
+        return sum(1 for builtFrom in self.divisionBuiltFrom if builtFrom is not None)
@@ -0,0 +1,58 @@
+#
+# DivisionCache
+#
+# Keeps memory in check when a lot of events are listed (a regional hub with a dozen or more).  Only the divisions that
+#   have been viewed recently keep their teams and matches; once more than maxLoaded have data, the one viewed longest
+#   ago is unloaded (see ExternalScoring.unload) and is fetched again if it's picked again.
+#
+# With maxLoaded or fewer events nothing is ever unloaded, and everything works just as it always has.
+#
+
+from collections import OrderedDict
+from ExternalScoring import ExternalScoring
+
+
+class DivisionCache:
+
+    # Constructor.  maxLoaded of 0 means no limit.
+    def __init__(self, scoringSystems: list[ExternalScoring], maxLoaded):
+        self.scoringSystems = scoringSystems
+        self.maxLoaded = maxLoaded
+
+        # division index -> None, least recently viewed first
+        self.recent = OrderedDict()
+
+    def isLimited(self):
+        return self.maxLoaded > 0 and len(self.scoringSystems) > self.maxLoaded
+
+    # May this division be fetched without being viewed (for the combined leaderboard)?  Only if it's one of the
+    #   recently viewed ones, or there's no limit to worry about.
+    def isResident(self, index):
+        return not self.isLimited() or index in self.recent
+
+    # The division at index is on screen now.  Returns the indexes of any divisions that were unloaded to make room.
+    def use(self, index, isBusy):
+        self.recent[index] = None
+        self.recent.move_to_end(index)
+        return self.trim(isBusy)
+
+    # Unload the least recently viewed divisions until no more than maxLoaded are left.  isBusy(index) says whether a
+    #   division is being fetched on the worker right now; those are left alone (and tried again next time), since the
+    #   fetch would just fill the data back in.  Returns the indexes unloaded.
+    def trim(self, isBusy):
+
+        unloaded = []
+        if not self.isLimited():
+            return unloaded
+
+        # (the last one is the division on screen ... it always stays)
+        for index in list(self.recent)[:-1]:
+            if len(self.recent) <= self.maxLoaded:
+                break
+            if isBusy(index):
+                continue
+            self.scoringSystems[index].unload()
+            del self.recent[index]
+            unloaded.append(index)
+
+        return unloaded
@@ -6,9 +6,14 @@
 # event, teams, and matches dictionary objects are constructed from remote data in these methods
 #
 
-from math import sqrt
+from array import array
+from datetime import datetime
+from math import erf, sqrt
+import time
 import traceback
 import requests
+from ScoreStats import ScoreStats
+from StageTimes import StageTimes, StageTimer
 
 class ExternalScoringException(Exception):
 
@@ -17,30 +22,317 @@ class ExternalScoringException(Exception):
         super().__init__(self.message)
 
 
+# How much a team's match-to-match contribution varies: the sum of the variances of its auto, teleop, and endgame
+#   PowerScores.  PowerScore * (100 - X) / 100 is roughly the standard deviation for each one (see updatePredictions).
+def getTeamVariance(team):
+    variance = 0.
+    for psKey, xKey in (('autoPowerScore', 'autoX'), ('telePowerScore', 'teleX'), ('endgPowerScore', 'endgX')):
+        sd = team.get(psKey, 0.) * max(0., (100 - team.get(xKey, 0)) / 100.)
+        variance += sd * sd
+    return variance
+
+
+# Chance that an alliance with a PowerScore margin over the other alliance wins, when the margin has the given variance
+#   (see updatePredictions)
+def getWinProb(margin, variance):
+    if variance > 0:
+        return 0.5 * (1 + erf(margin / sqrt(2 * variance)))
+    elif margin > 0:
+        return 1.
+    elif margin < 0:
+        return 0.
+    return 0.5
+
+
+# Each played match's contributions (see getContribution) are 16 numbers in a row: for each team, red1 red2 blue1 blue2,
+#   its share of the overall, auto, teleop, and endgame score
+contributionSlots = {('red', 'team1'): 0, ('red', 'team2'): 4, ('blue', 'team1'): 8, ('blue', 'team2'): 12}
+contributionsPerMatch = 16
+
+
+# The team fields that show up on screen.  A team is in the change set (see updateChanges) when any of these change.
+changeFields = ('name', 'city', 'state', 'country', 'rank', 'rp', 'tbp', 'highest', 'real_matches',
+                'powerScore', 'autoPowerScore', 'telePowerScore', 'endgPowerScore', 'overallX', 'autoX', 'teleX', 'endgX',
+                'partnerPS', 'opponentPS', 'luck')
+
+
 class ExternalScoring:
     
     # Constructor
+    #   Nothing is fetched here.  Call loadEvent() (or updateEvent()) to get the event info; until then the event name is
+    #   just the event code.
     def __init__(self,season, eventCode, auth):
-        self.event = {}
+        self.event = {'name': eventCode, 'divisionCode': None}
+        self.eventLoaded = False
         self.teams = {}
         self.matches = {}
+        self.predictions = {}
+        self.contributionRows = {}
+        self.contributions = array('d')
         self.season = season
         self.eventCode = eventCode
         self.auth = auth
         self.requestURI = "http://ftc-api.firstinspires.org/v2.0/"
 
-        self.updateEvent()
+        # how long each stage of a refresh takes
+        self.stageTimes = StageTimes()
+
+        # what happened during the most recent refresh (see getRefreshMetrics)
+        self.refreshRequests = []
+        self.refreshMetrics = {}
 
         self.updateCount = 0
         self.updateStatusMsg = ""
+
+        # what changed in the most recent refresh (see getChanges), and the state it was compared against
+        self.changes = {'updateCount': 0, 'first': True, 'newMatches': [], 'teams': {}}
+        self.changeBaseline = None
         self.isUpdating = False
 
+        # running statistics of every alliance score so far (see updateScoreStats)
+        self.scoreStats = ScoreStats()
+
+        # where each refresh is saved for later (see SeasonStore), if anywhere
+        self.seasonStore = None
+
+        # where each refresh is handed to other display processes on this machine (see SharedSnapshot), if anywhere
+        self.sharedSnapshot = None
+
+        # True if new data is pushed to us (see RemoteScoring.waitForChange), rather than us having to poll for it
+        self.pushUpdates = False
+
     def getEvent(self):
         return self.event
+
+    def isEventLoaded(self):
+        return self.eventLoaded
+
+    def setSeasonStore(self, seasonStore):
+        self.seasonStore = seasonStore
+
+    # Save the new data in the season store, if there is one.  Only done once the refresh has counted: the store is a
+    #   record for later, and the database being locked (by a --backfill writing to the same file) or the disk being
+    #   full shouldn't cost the display its new data.  A failure goes in the metrics log, and the next refresh saves the
+    #   whole event again anyway.
+    def saveToSeasonStore(self):
+        if self.seasonStore is None:
+            return
+        try:
+            self.seasonStore.saveEvent(self)
+        except Exception as x:
+            self.refreshMetrics['storeError'] = f"{type(x).__name__}: {x}"
+
+    def setSharedSnapshot(self, sharedSnapshot):
+        self.sharedSnapshot = sharedSnapshot
+
+    # Hand the new data to the other displays on this machine, if we're sharing.  The refresh itself went fine, so a
+    #   failure here (like /dev/shm filling up) is only noted in the metrics log, and the other displays keep the last
+    #   snapshot until the next one gets through.
+    def shareSnapshot(self):
+        if self.sharedSnapshot is None:
+            return
+        try:
+            self.sharedSnapshot.write(self.getSnapshot())
+        except Exception as x:
+            self.refreshMetrics['shareError'] = f"{type(x).__name__}: {x}"
     
     def getTeams(self):
         return self.teams
     
+    # Predict every unplayed match from the current PowerScores, all in one pass.  This runs once per refresh, so the
+    #   panels just look the results up (see getPredictions).
+    #
+    # The predicted score for an alliance is the sum of its teams' PowerScores (same as it's always been).  For the win
+    #   probability, each team's auto, teleop, and endgame PowerScores are treated as independent and normally distributed.
+    #   The X consistency metric is 100 * (1 - the RMS relative deviation of a team's match contributions), so
+    #   PowerScore * (100 - X) / 100 is roughly the standard deviation of what the team contributes in a match.
+    def updatePredictions(self):
+
+        teams = self.teams
+
+        # per team: total PowerScore and variance, computed once rather than once per match
+        teamPS = {}
+        teamVariance = {}
+        for teamNum in teams:
+            teamPS[teamNum] = teams[teamNum].get('powerScore', 0.)
+            teamVariance[teamNum] = getTeamVariance(teams[teamNum])
+
+        predictions = {}
+        for matchid in self.matches:
+            match = self.matches[matchid]
+            if match['played']:
+                continue
+
+            red = match['alliances']['red']
+            blue = match['alliances']['blue']
+            redPS = teamPS.get(red['team1'], 0.) + teamPS.get(red['team2'], 0.)
+            bluePS = teamPS.get(blue['team1'], 0.) + teamPS.get(blue['team2'], 0.)
+            variance = teamVariance.get(red['team1'], 0.) + teamVariance.get(red['team2'], 0.) + teamVariance.get(blue['team1'], 0.) + teamVariance.get(blue['team2'], 0.)
+
+            # chance that red - blue > 0
+            redWinProb = getWinProb(redPS - bluePS, variance)
+
+            predictions[matchid] = {
+                'red': int(redPS + .5),
+                'blue': int(bluePS + .5),
+                'redWinProb': redWinProb,
+            }
+
+        # replaced all at once, since the display may be reading the old ones on another thread
+        self.predictions = predictions
+
+    # What the PowerScore calculation worked out a team scored in one played match: (overall, auto, teleop, endgame),
+    #   its share of its alliance's score in the final round.  None if the match hasn't been played, the team wasn't
+    #   in it, or the PowerScores weren't calculated here (a PowerScore server doesn't send them).
+    def getContribution(self, matchid, teamNum):
+
+        row = self.contributionRows.get(matchid)
+        if row is None:
+            return None
+
+        alliances = self.matches[matchid]['alliances']
+        for color in ('red', 'blue'):
+            for position in ('team1', 'team2'):
+                if alliances[color][position] == teamNum:
+                    start = row + contributionSlots[(color, position)]
+                    return tuple(self.contributions[start:start + 4])
+        return None
+
+    # Strength of schedule and luck, for every team, from one pass over the played matches.  Each team gets:
+    #   partnerPS    the average PowerScore of its partners
+    #   opponentPS   the average PowerScore of the teams it played against
+    #   luck         RP per match it actually got, minus what it should have got from the PowerScores.  Positive means
+    #                  the results went its way more often than the numbers say they should have.
+    #
+    # Both RPs are worked out from the match results (2 for a win, 1 for a tie) rather than taken from the rankings, since
+    #   what else earns RP changes every season.  Expected RP is 2 * the chance of winning (see getWinProb), using the
+    #   current PowerScores.
+    def updateScheduleMetrics(self):
+
+        teams = self.teams
+
+        teamPS = {}
+        teamVariance = {}
+        for teamNum in teams:
+            teamPS[teamNum] = teams[teamNum].get('powerScore', 0.)
+            teamVariance[teamNum] = getTeamVariance(teams[teamNum])
+
+        # per team: [matches, partner PS, opponent PS, actual RP, expected RP], all totals
+        totals = {}
+        for teamNum in teams:
+            totals[teamNum] = [0, 0., 0., 0., 0.]
+
+        for matchid in self.matches:
+            match = self.matches[matchid]
+            if not match['played']:
+                continue
+
+            red = match['alliances']['red']
+            blue = match['alliances']['blue']
+            redPS = teamPS.get(red['team1'], 0.) + teamPS.get(red['team2'], 0.)
+            bluePS = teamPS.get(blue['team1'], 0.) + teamPS.get(blue['team2'], 0.)
+            variance = teamVariance.get(red['team1'], 0.) + teamVariance.get(red['team2'], 0.) + teamVariance.get(blue['team1'], 0.) + teamVariance.get(blue['team2'], 0.)
+            redWinProb = getWinProb(redPS - bluePS, variance)
+
+            redRP = 1.
+            if red['total'] > blue['total']:
+                redRP = 2.
+            elif red['total'] < blue['total']:
+                redRP = 0.
+
+            for alliance, winProb, rp, opponentPS in ((red, redWinProb, redRP, bluePS), (blue, 1 - redWinProb, 2 - redRP, redPS)):
+                for teamNum, partnerNum in ((alliance['team1'], alliance['team2']), (alliance['team2'], alliance['team1'])):
+                    if teamNum not in totals:
+                        continue
+                    total = totals[teamNum]
+                    total[0] += 1
+                    total[1] += teamPS.get(partnerNum, 0.)
+                    total[2] += opponentPS / 2
+                    total[3] += rp
+                    total[4] += 2 * winProb
+
+        for teamNum in teams:
+            matchCount, partnerPS, opponentPS, actualRP, expectedRP = totals[teamNum]
+            matchCount = max(matchCount, 1)
+            teams[teamNum]['partnerPS'] = partnerPS / matchCount
+            teams[teamNum]['opponentPS'] = opponentPS / matchCount
+            teams[teamNum]['luck'] = (actualRP - expectedRP) / matchCount
+
+    # Predictions for the unplayed matches, by matchid: {'red': score, 'blue': score, 'redWinProb': 0..1}.  Recalculated
+    #   once per refresh, along with the PowerScores.
+    def getPredictions(self):
+        return self.predictions
+
+    # Work out what the refresh that just finished changed, compared to the last refresh that worked (a failed refresh
+    #   may have left things half updated, so it isn't compared against).  Call once per successful refresh, after
+    #   updateCount has gone up.
+    def updateChanges(self):
+
+        baseline = self.changeBaseline
+        oldTeams = baseline['teams'] if baseline is not None else {}
+        oldPlayed = baseline['played'] if baseline is not None else set()
+
+        played = set(matchid for matchid in self.matches if self.matches[matchid]['played'])
+
+        changedTeams = {}
+        newTeams = {}
+        for teamNum in self.teams:
+            team = self.teams[teamNum]
+            fields = tuple(team.get(field) for field in changeFields)
+            newTeams[teamNum] = fields
+
+            old = oldTeams.get(teamNum)
+            if old == fields:
+                continue
+            if old is None:
+                changedTeams[teamNum] = {'new': True, 'rankDelta': 0, 'powerScoreDelta': 0., 'xDelta': 0}
+            else:
+                oldTeam = dict(zip(changeFields, old))
+                changedTeams[teamNum] = {
+                    'new': False,
+                    # positive means moved up the rankings
+                    'rankDelta': (oldTeam['rank'] or 0) - (team.get('rank') or 0),
+                    'powerScoreDelta': team.get('powerScore', 0.) - (oldTeam['powerScore'] or 0.),
+                    'xDelta': team.get('overallX', 0) - (oldTeam['overallX'] or 0),
+                }
+
+        self.changeBaseline = {'teams': newTeams, 'played': played}
+
+        # replaced all at once, like the predictions
+        self.changes = {
+            'updateCount': self.updateCount,
+            'first': baseline is None,
+            'newMatches': sorted(played - oldPlayed),
+            'teams': changedTeams,
+        }
+
+    # Add the matches scored in the most recent refresh (from the change set) to the score statistics.  Only the new
+    #   matches are looked at, so this costs next to nothing.  It happens after the refresh is finished (it needs the
+    #   change set), so its time is recorded on its own rather than as part of the refresh.
+    def updateScoreStats(self):
+
+        with StageTimer(self.stageTimes, "stats", record=True):
+            # the first refresh (or the first since being unloaded) has every played match as new
+            if self.changes['first']:
+                self.scoreStats = ScoreStats()
+            for matchid in self.changes['newMatches']:
+                self.scoreStats.addMatch(self.matches[matchid])
+
+        # (for the metrics log, with the rest of the refresh's stages)
+        self.refreshMetrics['statsMs'] = round(self.stageTimes.getLast("stats") * 1000, 1)
+
+    def getScoreStats(self) -> ScoreStats:
+        return self.scoreStats
+
+    # What the most recent refresh changed:
+    #   updateCount  the refresh this describes (compare with getUpdateCount)
+    #   first        True for the first refresh, when everything is new
+    #   newMatches   matchids scored since the refresh before
+    #   teams        teamNum -> {'new', 'rankDelta' (positive is up), 'powerScoreDelta', 'xDelta'} for every team whose
+    #                  displayed numbers changed.  Teams that didn't change aren't in here.
+    def getChanges(self):
+        return self.changes
+
     def getMatches(self):
         return self.matches
     
@@ -49,6 +341,58 @@ class ExternalScoring:
     
     def getUpdateStatusMsg(self):
         return self.updateStatusMsg
+
+    # A record of the most recent refresh, for the metrics log: when it happened, every request made (status code, bytes,
+    #   latency), how many matches have been played, how long each stage took, and the error if it failed
+    def getRefreshMetrics(self):
+        return self.refreshMetrics
+
+    # Let go of the teams and matches (see DivisionCache).  The event info stays, since it's small and doesn't change.  The
+    #   next refresh starts from scratch, like the first one did.
+    def unload(self):
+        self.teams = {}
+        self.matches = {}
+        self.predictions = {}
+        self.contributionRows = {}
+        self.contributions = array('d')
+        self.updateCount = 0
+        self.changes = {'updateCount': 0, 'first': True, 'newMatches': [], 'teams': {}}
+        self.changeBaseline = None
+        self.scoreStats = ScoreStats()
+
+    # Everything needed to show this event somewhere else (a web page, another display), as plain JSON-able objects.
+    #   Teams and matches are lists because JSON object keys can only be strings.
+    def getSnapshot(self):
+        return {
+            'season': self.season,
+            'eventCode': self.eventCode,
+            'event': dict(self.event),
+            'updateCount': self.updateCount,
+            'teams': list(self.teams.values()),
+            'matches': list(self.matches.values()),
+        }
+
+    # The other way round: take teams and matches from a snapshot that was calculated somewhere else (see RemoteScoring
+    #   and SharedScoring).  The predictions and schedule metrics aren't in a snapshot, but they're cheap to work out
+    #   from the PowerScores that are.
+    def useSnapshot(self, snapshot):
+
+        teams = {}
+        for team in snapshot['teams']:
+            teams[team['number']] = team
+
+        matches = {}
+        for match in snapshot['matches']:
+            matches[match['matchid']] = match
+
+        self.teams = teams
+        self.matches = matches
+
+        with StageTimer(self.stageTimes, "predict"):
+            self.updatePredictions()
+
+        with StageTimer(self.stageTimes, "schedule"):
+            self.updateScheduleMetrics()
     
 
     def ayncUpdateTeamsMatches(self):
@@ -62,7 +406,6 @@ class ExternalScoring:
                 # Get the external data and calculate PowerScore
                 self.updateTeamsMatches()
                 self.updateStatusMsg = ""
-                self.updateCount = self.updateCount + 1
 
 
             except requests.exceptions.Timeout:
@@ -81,14 +424,50 @@ class ExternalScoring:
     # Get the data from the extenral system ... includes calculating powerscores
     def updateTeamsMatches(self):
 
-        self.updateTeamsMatchesFromFTC()
-
-        # Now update powerscores
-        self.__calculatePowerScore()
+        self.startRefresh()
+        try:
+            self.updateTeamsMatchesFromFTC()
+
+            # Now update powerscores
+            with StageTimer(self.stageTimes, "calc"):
+                self.__calculatePowerScore()
+
+            # ... and predict the matches that haven't been played yet
+            with StageTimer(self.stageTimes, "predict"):
+                self.updatePredictions()
+
+            # ... and how much each team's schedule helped or hurt it
+            with StageTimer(self.stageTimes, "schedule"):
+                self.updateScheduleMetrics()
+        except Exception as x:
+            self.finishRefresh(x)
+            raise
+        self.finishRefresh(None)
+
+        # Anything caching derived data (formatted rows, etc.) can tell new data from old by this count
+        self.updateCount = self.updateCount + 1
+        self.updateChanges()
+        self.updateScoreStats()
+        self.saveToSeasonStore()
+        self.shareSnapshot()
 
         #return (event, teams, matches)
         return
     
+    # Get the event info, retrying until the API can be reached.  This is also our check that the network is up.
+    #   onRetry (if given) is called with the exception each time the API can't be reached.
+    def loadEvent(self, secBetweenRetries = 10, onRetry = None):
+
+        while 1:
+            try:
+                self.updateEvent()
+                return
+
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as x:
+                if onRetry is not None:
+                    onRetry(x)
+                time.sleep(secBetweenRetries)
+
     # get event info (this won't change over the course of an event)
     def updateEvent(self):
 
@@ -98,28 +477,92 @@ class ExternalScoring:
             raise ExternalScoringException(f"Could not find event {self.eventCode}.  Request returned {r.status_code}")
         eventJsonResult = r.json()
 
-        self.event['name'] = eventJsonResult['events'][0]['name']
-        self.event['divisionCode'] = eventJsonResult['events'][0]['divisionCode']
+        self.setEvent(eventJsonResult['events'][0])
+
+    # Use event info from the API (one entry of an /events result) ... for when it was already fetched elsewhere
+    def setEvent(self, eventInfo):
+        self.event = {
+            'name': eventInfo['name'],
+            'divisionCode': eventInfo['divisionCode'],
+            'dateEnd': eventInfo.get('dateEnd'),
+        }
+        self.eventLoaded = True
+
+    # Bookkeeping at the start and end of every refresh, for the stage timings and the metrics log
+    def startRefresh(self):
+        self.refreshStartSec = time.time()
+        self.refreshRequests = []
+
+    def finishRefresh(self, exception):
+
+        stageSeconds = self.stageTimes.finish()
+
+        matchesPlayed = 0
+        for matchid in self.matches:
+            if self.matches[matchid]['played']:
+                matchesPlayed += 1
+
+        self.refreshMetrics = {
+            'time': datetime.fromtimestamp(self.refreshStartSec).isoformat(timespec='milliseconds'),
+            'event': self.eventCode,
+            'refresh': self.updateCount + 1,
+            'requests': self.refreshRequests,
+            'matchesPlayed': matchesPlayed,
+            'matchesScheduled': len(self.matches),
+            'totalMs': round((time.time() - self.refreshStartSec) * 1000, 1),
+            'error': None,
+        }
+        for stage in stageSeconds:
+            self.refreshMetrics[stage + 'Ms'] = round(stageSeconds[stage] * 1000, 1)
+        if exception is not None:
+            self.refreshMetrics['error'] = f"{type(exception).__name__}: {exception}"
+
+    # Remember one request for the metrics log.  r is None if the request never got a response.
+    def recordRequest(self, endpoint, r, seconds, exception = None):
+        request = {'endpoint': endpoint, 'status': None, 'bytes': 0, 'ms': round(seconds * 1000, 1)}
+        if r is not None:
+            request['status'] = r.status_code
+            request['bytes'] = len(r.content)
+        if exception is not None:
+            request['error'] = f"{type(exception).__name__}: {exception}"
+        self.refreshRequests.append(request)
+
+    # requests.get, timed as the "network" stage and recorded for the metrics log under the given endpoint name
+    def timedGet(self, endpoint, url, **kwargs):
+
+        startSec = time.perf_counter()
+        try:
+            with StageTimer(self.stageTimes, "network"):
+                r=requests.get(url, **kwargs)
+        except requests.exceptions.RequestException as x:
+            self.recordRequest(endpoint, None, time.perf_counter() - startSec, x)
+            raise
+        self.recordRequest(endpoint, r, time.perf_counter() - startSec)
+
+        return r
+
+    # One API request, timing the network and the JSON decoding separately
+    def __getJson(self, path):
+
+        r=self.timedGet(path, self.requestURI+self.season+path, headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
+
+        with StageTimer(self.stageTimes, "json"):
+            return r.json()
 
     # Get data from theorangealliance <== USING THIS AS A TEMPLATE FOR CHANGING TO FTC-EVENTS
     def updateTeamsMatchesFromFTC(self):
 
-        r=requests.get(self.requestURI+self.season+'/schedule/'+self.eventCode+"/qual/hybrid", headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
-        matchesJsonResult = r.json()
+        matchesJsonResult = self.__getJson('/schedule/'+self.eventCode+"/qual/hybrid")
 
-        r=requests.get(self.requestURI+self.season+'/scores/'+self.eventCode+"/qual", headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
-        scoresJsonResult = r.json()
+        scoresJsonResult = self.__getJson('/scores/'+self.eventCode+"/qual")
 
-        r=requests.get(self.requestURI+self.season+'/rankings/'+self.eventCode, headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
-        rankingsJsonResult = r.json()
+        rankingsJsonResult = self.__getJson('/rankings/'+self.eventCode)
 
-        r=requests.get(self.requestURI+self.season+'/teams?eventCode='+self.eventCode, headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
-        teamsJsonResult = r.json()
+        teamsJsonResult = self.__getJson('/teams?eventCode='+self.eventCode)
 
         # there could be 2 pages of teams.  There's a better way to do this, but whatever
         if teamsJsonResult['pageTotal'] > 1:
-            r=requests.get(self.requestURI+self.season+'/teams?page=2&eventCode='+self.eventCode, headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=15)
-            teamsJsonResult2 = r.json()
+            teamsJsonResult2 = self.__getJson('/teams?page=2&eventCode='+self.eventCode)
 
         # Assemble all the team info from the teams request
         for team in teamsJsonResult['teams']:
@@ -349,6 +792,14 @@ class ExternalScoring:
                 self.teams[match["alliances"]["red"]["team1"]]['endgAllianceScore'] += adjRedScore/(2.*self.teams[match["alliances"]["red"]["team1"]]['real_matches'])
                 self.teams[match["alliances"]["red"]["team2"]]['endgAllianceScore'] += adjRedScore/(2.*self.teams[match["alliances"]["red"]["team2"]]['real_matches'])
 
+        # Each team's share of each played match, kept from the last round (see getContribution).  One flat array of
+        #   doubles, contributionsPerMatch per match, rather than a dict per match.
+        contributionRows = {}
+        for matchid in self.matches:
+            if self.matches[matchid]['played']:
+                contributionRows[matchid] = contributionsPerMatch * len(contributionRows)
+        contributions = array('d', bytes(8 * contributionsPerMatch * len(contributionRows)))
+
         # Now on to powerScores ...
         # We'll do a 10 round calculation (tends to work fairly well)
         for i in range(1, 10):
@@ -369,6 +820,7 @@ class ExternalScoring:
                 match = self.matches[matchid]
 
                 if self.matches[matchid]['played']:
+                    row = contributionRows[matchid]
 
                     # Now, split up the scores, not on a 50-50 split like we did the first time, but based on the alliance scores for each team that we just calculated
                     # Again, we're doing the division by the number of matches to normalize to the number of matches played
@@ -387,6 +839,9 @@ class ExternalScoring:
                         blue2PS = adjBlueScore * self.teams[match["alliances"]["blue"]["team2"]]['allianceScore']/ ((self.teams[match["alliances"]["blue"]["team1"]]['allianceScore'] + self.teams[match["alliances"]["blue"]["team2"]]['allianceScore']))
                         self.teams[match["alliances"]["blue"]["team1"]]['powerScore'] += blue1PS
                         self.teams[match["alliances"]["blue"]["team2"]]['powerScore'] += blue2PS
+                        if i == 9:
+                            contributions[row + 8] = blue1PS
+                            contributions[row + 12] = blue2PS
                         if self.teams[match["alliances"]["blue"]["team1"]]['allianceScore'] >0:
                             self.teams[match["alliances"]["blue"]["team1"]]['overallX'] += ((blue1PS - self.teams[match["alliances"]["blue"]["team1"]]['allianceScore']) / self.teams[match["alliances"]["blue"]["team1"]]['allianceScore']) ** 2
                         if self.teams[match["alliances"]["blue"]["team2"]]['allianceScore'] >0:
@@ -397,6 +852,9 @@ class ExternalScoring:
                         red2PS = adjRedScore * self.teams[match["alliances"]["red"]["team2"]]['allianceScore']/ ((self.teams[match["alliances"]["red"]["team1"]]['allianceScore'] + self.teams[match["alliances"]["red"]["team2"]]['allianceScore']))
                         self.teams[match["alliances"]["red"]["team1"]]['powerScore'] += red1PS
                         self.teams[match["alliances"]["red"]["team2"]]['powerScore'] += red2PS
+                        if i == 9:
+                            contributions[row + 0] = red1PS
+                            contributions[row + 4] = red2PS
                         if self.teams[match["alliances"]["red"]["team1"]]['allianceScore'] >0:
                             self.teams[match["alliances"]["red"]["team1"]]['overallX'] += ((red1PS - self.teams[match["alliances"]["red"]["team1"]]['allianceScore']) / self.teams[match["alliances"]["red"]["team1"]]['allianceScore']) ** 2
                         if self.teams[match["alliances"]["red"]["team2"]]['allianceScore'] >0:
@@ -416,6 +874,9 @@ class ExternalScoring:
                         blue2PS = adjBlueScore * self.teams[match["alliances"]["blue"]["team2"]]['autoAllianceScore']/ ((self.teams[match["alliances"]["blue"]["team1"]]['autoAllianceScore'] + self.teams[match["alliances"]["blue"]["team2"]]['autoAllianceScore']))
                         self.teams[match["alliances"]["blue"]["team1"]]['autoPowerScore'] += blue1PS
                         self.teams[match["alliances"]["blue"]["team2"]]['autoPowerScore'] += blue2PS
+                        if i == 9:
+                            contributions[row + 9] = blue1PS
+                            contributions[row + 13] = blue2PS
                         if self.teams[match["alliances"]["blue"]["team1"]]['autoAllianceScore'] >0:
                             self.teams[match["alliances"]["blue"]["team1"]]['autoX'] += ((blue1PS - self.teams[match["alliances"]["blue"]["team1"]]['autoAllianceScore']) / self.teams[match["alliances"]["blue"]["team1"]]['autoAllianceScore']) ** 2
                         if self.teams[match["alliances"]["blue"]["team2"]]['autoAllianceScore'] >0:
@@ -426,6 +887,9 @@ class ExternalScoring:
                         red2PS = adjRedScore * self.teams[match["alliances"]["red"]["team2"]]['autoAllianceScore']/ ((self.teams[match["alliances"]["red"]["team1"]]['autoAllianceScore'] + self.teams[match["alliances"]["red"]["team2"]]['autoAllianceScore']))
                         self.teams[match["alliances"]["red"]["team1"]]['autoPowerScore'] += red1PS
                         self.teams[match["alliances"]["red"]["team2"]]['autoPowerScore'] += red2PS
+                        if i == 9:
+                            contributions[row + 1] = red1PS
+                            contributions[row + 5] = red2PS
                         if self.teams[match["alliances"]["red"]["team1"]]['autoAllianceScore'] >0:
                             self.teams[match["alliances"]["red"]["team1"]]['autoX'] += ((red1PS - self.teams[match["alliances"]["red"]["team1"]]['autoAllianceScore']) / self.teams[match["alliances"]["red"]["team1"]]['autoAllianceScore']) ** 2
                         if self.teams[match["alliances"]["red"]["team2"]]['autoAllianceScore'] >0:
@@ -445,6 +909,9 @@ class ExternalScoring:
                         blue2PS = adjBlueScore * self.teams[match["alliances"]["blue"]["team2"]]['teleAllianceScore']/ ((self.teams[match["alliances"]["blue"]["team1"]]['teleAllianceScore'] + self.teams[match["alliances"]["blue"]["team2"]]['teleAllianceScore']))
                         self.teams[match["alliances"]["blue"]["team1"]]['telePowerScore'] += blue1PS
                         self.teams[match["alliances"]["blue"]["team2"]]['telePowerScore'] += blue2PS
+                        if i == 9:
+                            contributions[row + 10] = blue1PS
+                            contributions[row + 14] = blue2PS
                         if self.teams[match["alliances"]["blue"]["team1"]]['teleAllianceScore'] >0:
                             self.teams[match["alliances"]["blue"]["team1"]]['teleX'] += ((blue1PS - self.teams[match["alliances"]["blue"]["team1"]]['teleAllianceScore']) / self.teams[match["alliances"]["blue"]["team1"]]['teleAllianceScore']) ** 2
                         if self.teams[match["alliances"]["blue"]["team2"]]['teleAllianceScore'] >0:
@@ -455,6 +922,9 @@ class ExternalScoring:
                         red2PS = adjRedScore * self.teams[match["alliances"]["red"]["team2"]]['teleAllianceScore']/ ((self.teams[match["alliances"]["red"]["team1"]]['teleAllianceScore'] + self.teams[match["alliances"]["red"]["team2"]]['teleAllianceScore']))
                         self.teams[match["alliances"]["red"]["team1"]]['telePowerScore'] += red1PS
                         self.teams[match["alliances"]["red"]["team2"]]['telePowerScore'] += red2PS
+                        if i == 9:
+                            contributions[row + 2] = red1PS
+                            contributions[row + 6] = red2PS
                         if self.teams[match["alliances"]["red"]["team1"]]['teleAllianceScore'] >0:
                             self.teams[match["alliances"]["red"]["team1"]]['teleX'] += ((red1PS - self.teams[match["alliances"]["red"]["team1"]]['teleAllianceScore']) / self.teams[match["alliances"]["red"]["team1"]]['teleAllianceScore']) ** 2
                         if self.teams[match["alliances"]["red"]["team2"]]['teleAllianceScore'] >0:
@@ -474,6 +944,9 @@ class ExternalScoring:
                         blue2PS = adjBlueScore * self.teams[match["alliances"]["blue"]["team2"]]['endgAllianceScore']/ ((self.teams[match["alliances"]["blue"]["team1"]]['endgAllianceScore'] + self.teams[match["alliances"]["blue"]["team2"]]['endgAllianceScore']))
                         self.teams[match["alliances"]["blue"]["team1"]]['endgPowerScore'] += blue1PS
                         self.teams[match["alliances"]["blue"]["team2"]]['endgPowerScore'] += blue2PS
+                        if i == 9:
+                            contributions[row + 11] = blue1PS
+                            contributions[row + 15] = blue2PS
                         if self.teams[match["alliances"]["blue"]["team1"]]['endgAllianceScore'] >0:
                             self.teams[match["alliances"]["blue"]["team1"]]['endgX'] += ((blue1PS - self.teams[match["alliances"]["blue"]["team1"]]['endgAllianceScore']) / self.teams[match["alliances"]["blue"]["team1"]]['endgAllianceScore']) ** 2
                         if self.teams[match["alliances"]["blue"]["team2"]]['endgAllianceScore'] >0:
@@ -484,6 +957,9 @@ class ExternalScoring:
                         red2PS = adjRedScore * self.teams[match["alliances"]["red"]["team2"]]['endgAllianceScore']/ ((self.teams[match["alliances"]["red"]["team1"]]['endgAllianceScore'] + self.teams[match["alliances"]["red"]["team2"]]['endgAllianceScore']))
                         self.teams[match["alliances"]["red"]["team1"]]['endgPowerScore'] += red1PS
                         self.teams[match["alliances"]["red"]["team2"]]['endgPowerScore'] += red2PS
+                        if i == 9:
+                            contributions[row + 3] = red1PS
+                            contributions[row + 7] = red2PS
                         if self.teams[match["alliances"]["red"]["team1"]]['endgAllianceScore'] >0:
                             self.teams[match["alliances"]["red"]["team1"]]['endgX'] += ((red1PS - self.teams[match["alliances"]["red"]["team1"]]['endgAllianceScore']) / self.teams[match["alliances"]["red"]["team1"]]['endgAllianceScore']) ** 2
                         if self.teams[match["alliances"]["red"]["team2"]]['endgAllianceScore'] >0:
@@ -509,7 +985,10 @@ class ExternalScoring:
                         self.teams[teamid]['teleX'] = int(100 - (0.5 + 100*sqrt(self.teams[teamid]['teleX'] / self.teams[teamid]['real_matches'])))
                         self.teams[teamid]['endgX'] = int(100 - (0.5 + 100*sqrt(self.teams[teamid]['endgX'] / self.teams[teamid]['real_matches'])))
 
-            
+
+        # replaced all at once, like the predictions
+        self.contributionRows = contributionRows
+        self.contributions = contributions
                 
     # all done with the PowerScore calc
     pass
@@ -0,0 +1,59 @@
+#
+# LatencyHistogram
+#
+# Collects latencies (in seconds) and prints them as a text histogram with percentiles, for replay runs and benchmarks.
+#
+
+# upper edge of each bucket, in milliseconds (anything slower goes in the last, open-ended bucket)
+bucketEdgesMs = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+class LatencyHistogram:
+
+    # Constructor
+    def __init__(self, title):
+        self.title = title
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def getCount(self):
+        return len(self.samples)
+
+    # The latency that fraction (0 to 1) of the samples are at or under
+    def getPercentile(self, fraction):
+        if len(self.samples) == 0:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    # The histogram as lines of text, ready to print
+    def format(self, barWidth = 50):
+
+        lines = [f"{self.title}: {len(self.samples)} samples"]
+        if len(self.samples) == 0:
+            return lines
+
+        counts = [0] * (len(bucketEdgesMs) + 1)
+        for seconds in self.samples:
+            ms = seconds * 1000
+            bucket = 0
+            while bucket < len(bucketEdgesMs) and ms > bucketEdgesMs[bucket]:
+                bucket = bucket + 1
+            counts[bucket] = counts[bucket] + 1
+
+        biggest = max(counts)
+        lowMs = 0
+        for bucket in range(len(counts)):
+            if bucket < len(bucketEdgesMs):
+                label = f"{lowMs:>5g} - {bucketEdgesMs[bucket]:<5g} ms"
+                lowMs = bucketEdgesMs[bucket]
+            else:
+                label = f"{lowMs:>5g} +       ms"
+            bar = "#" * int(barWidth * counts[bucket] / biggest + .5) if counts[bucket] > 0 else ""
+            lines.append(f"  {label} {counts[bucket]:>7d} {bar}")
+
+        lines.append("  p50 {:.1f} ms   p90 {:.1f} ms   p99 {:.1f} ms   max {:.1f} ms".format(
+            self.getPercentile(.5) * 1000, self.getPercentile(.9) * 1000, self.getPercentile(.99) * 1000, max(self.samples) * 1000))
+        return lines
@@ -0,0 +1,75 @@
+#
+# MetricsLog
+#
+# Appends one JSON line per refresh of each division (see ExternalScoring.getRefreshMetrics) to a log file, so that after
+#   an event we can look at how the display really behaved: API status codes, bytes and latency per request, compute and
+#   render times, errors.
+#
+# Writes go through a large buffer and are flushed at most every flushSec seconds (and on close), so logging doesn't add
+#   a disk write to every refresh.  When the file gets bigger than maxBytes it's rotated: log.jsonl becomes log.jsonl.1,
+#   log.jsonl.1 becomes log.jsonl.2, and so on, keeping backupCount old files.
+#
+
+import json
+import os
+import threading
+import time
+
+
+class MetricsLog:
+
+    # Constructor
+    def __init__(self, path, maxBytes = 5 * 1024 * 1024, backupCount = 5, flushSec = 60):
+        self.path = path
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.flushSec = flushSec
+
+        # refreshes can finish on several threads at once (publish and server modes)
+        self.lock = threading.Lock()
+
+        self.file = None
+        self.__open()
+
+    def write(self, record):
+
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        # (the limit is in bytes on disk, not characters)
+        lineBytes = len(line.encode("utf-8"))
+
+        with self.lock:
+            if self.size + lineBytes > self.maxBytes and self.size > 0:
+                self.__rotate()
+
+            self.file.write(line)
+            self.size = self.size + lineBytes
+
+            if time.time() - self.lastFlushSec >= self.flushSec:
+                self.file.flush()
+                self.lastFlushSec = time.time()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __open(self):
+        self.file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+        self.size = self.file.tell()
+        self.lastFlushSec = time.time()
+
+    def __rotate(self):
+
+        self.file.close()
+
+        for i in range(self.backupCount - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backupCount > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+        self.__open()
@@ -0,0 +1,160 @@
+import curses
+from CombinedLeaderboard import CombinedLeaderboard
+from PSPanelInterface import *
+
+
+#
+# Panel showing one PowerScore ranking of every team across all of the divisions (see CombinedLeaderboard)
+#
+class PSCombinedPanel:
+
+    def __init__(self, baseWindow: curses.window):
+        self.baseWindow = baseWindow
+
+        self.window = None
+        self.panel = None
+
+        self.visible = False
+
+        self.leaderboard = None
+
+        # position of the highlighted team in the combined list, and the first row on screen
+        self.selectedRow = 0
+        self.topRow = 0
+
+    def isVisible(self):
+        return self.visible
+
+
+    def show(self, leaderboard: CombinedLeaderboard):
+
+        self.leaderboard = leaderboard
+        self.selectedRow = 0
+        self.topRow = 0
+
+        screenHeight, screenWidth = self.baseWindow.getmaxyx()
+
+        # calculate a bunch of dimentions and positions ... as tall as the screen allows
+        windowHeight = screenHeight - 6
+        windowWidth = 120
+        windowTop = screenHeight // 2 - windowHeight // 2
+        windowLeft = screenWidth // 2 - windowWidth // 2
+
+        # set up the window
+        self.window = curses.newwin(windowHeight,windowWidth,windowTop,windowLeft)
+        self.panel = curses.panel.new_panel(self.window)
+        self.panel.top()
+
+        self.visible = True
+
+        self.redraw()
+
+
+    def getRowsPerPage(self):
+        windowHeight, windowWidth = self.window.getmaxyx()
+        return windowHeight - 8
+
+
+    def redraw(self):
+
+        rows = self.leaderboard.getRows()
+
+        windowHeight, windowWidth = self.window.getmaxyx()
+
+        TITLE_y = 1
+        TABLE_HEADING_ROW = 3
+        LIST_START_ROW = 5
+        HELP_y = windowHeight - 2
+
+        POS_x = 2
+        DIVISION_x = 8
+        DIVISION_width = 14
+        TEAM_x = 23
+        NAME_x = 30
+        NAME_width = 30
+        PS_x = 62
+        AUTO_x = 72
+        TELE_x = 80
+        ENDG_x = 88
+        X_x = 97
+        RANK_x = 102
+
+        maxRows = self.getRowsPerPage()
+
+        # keep the selection on the list and on the screen
+        if len(rows) == 0:
+            self.selectedRow = 0
+        elif self.selectedRow >= len(rows):
+            self.selectedRow = len(rows) - 1
+        if self.selectedRow < self.topRow:
+            self.topRow = self.selectedRow
+        elif self.selectedRow >= self.topRow + maxRows:
+            self.topRow = self.selectedRow - maxRows + 1
+
+        # draw the outlines
+        self.window.erase()
+        self.window.box()
+        self.window.addch(2,0,curses.ACS_LTEE)
+        self.window.hline(2,1,curses.ACS_HLINE,windowWidth-2)
+        self.window.addch(2,windowWidth-1,curses.ACS_RTEE)
+
+        numDivisions = len(self.leaderboard.scoringSystems)
+        self.window.addstr(TITLE_y, 3, f"All divisions - {len(rows)} teams ({self.leaderboard.getLoadedCount()} of {numDivisions} divisions loaded)")
+
+        # column headers
+        self.window.addstr(TABLE_HEADING_ROW,POS_x,"   #")
+        self.window.addstr(TABLE_HEADING_ROW,DIVISION_x,"Division")
+        self.window.addstr(TABLE_HEADING_ROW,TEAM_x," Team")
+        self.window.addstr(TABLE_HEADING_ROW,NAME_x,"Name")
+        self.window.addstr(TABLE_HEADING_ROW,PS_x,"Overall")
+        self.window.addstr(TABLE_HEADING_ROW,AUTO_x,"  Auto")
+        self.window.addstr(TABLE_HEADING_ROW,TELE_x,"Teleop")
+        self.window.addstr(TABLE_HEADING_ROW,ENDG_x,"Endgame")
+        self.window.addstr(TABLE_HEADING_ROW,X_x,"Ox")
+        self.window.addstr(TABLE_HEADING_ROW,RANK_x,"Div Rank")
+        self.window.hline(TABLE_HEADING_ROW+1,POS_x,"-",RANK_x+8-POS_x)
+
+        for line in range(maxRows):
+            row = self.topRow + line
+            if row >= len(rows):
+                break
+
+            team = rows[row]
+
+            if row == self.selectedRow:
+                self.window.attron(curses.color_pair(2))
+            self.window.addstr(LIST_START_ROW+line,POS_x,"{:>4d}".format(row+1))
+            self.window.addstr(LIST_START_ROW+line,DIVISION_x,team['eventCode'][:DIVISION_width])
+            self.window.addstr(LIST_START_ROW+line,TEAM_x,"{:>5d}".format(team['number']))
+            self.window.addstr(LIST_START_ROW+line,NAME_x,team['name'][:NAME_width])
+            self.window.addstr(LIST_START_ROW+line,PS_x,"{:>7.2f}".format(team['powerScore']))
+            self.window.addstr(LIST_START_ROW+line,AUTO_x,"{:>6.2f}".format(team['autoPowerScore']))
+            self.window.addstr(LIST_START_ROW+line,TELE_x,"{:>6.2f}".format(team['telePowerScore']))
+            self.window.addstr(LIST_START_ROW+line,ENDG_x,"{:>6.2f}".format(team['endgPowerScore']))
+            self.window.addstr(LIST_START_ROW+line,X_x,"{:>2d}".format(team['overallX']))
+            self.window.addstr(LIST_START_ROW+line,RANK_x,"{:>8d}".format(team['rank']))
+            self.window.attroff(curses.color_pair(2))
+
+        self.window.addstr(HELP_y, 3, "up/down/page up/page down/home/end: scroll   esc: close")
+
+    def changeSelectedRow(self, delta):
+        self.selectedRow = max(0, self.selectedRow + delta)
+        self.redraw()
+
+    def pageSelectedRow(self, pages):
+        self.changeSelectedRow(pages * self.getRowsPerPage())
+
+    def setSelectedRowFirst(self):
+        self.selectedRow = 0
+        self.redraw()
+
+    def setSelectedRowLast(self):
+        self.selectedRow = len(self.leaderboard.getRows())
+        self.redraw()
+
+    def hide(self):
+        self.panel.hide()
+        self.panel = None
+        self.window = None
+        self.visible = False
+
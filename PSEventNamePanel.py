@@ -2,6 +2,7 @@ import curses
 from PSPanelInterface import *
 
 from ExternalScoring import ExternalScoring
+from ScoreStats import components, percentiles
 
 
 # 
@@ -17,8 +18,13 @@ class PSEventNamePanel(PSPanelInterface):
         # This goes on lines 3-5, 96 chars in from the left side
         super().__init__(2, 96, 1, screenWidth - 96)
 
+        # the line under the name shows the event's score percentiles, or (after m) the averages
+        self.showAverages = False
+
         self.setVisible(True)
     
+    def toggleAverages(self):
+        self.showAverages = not self.showAverages
 
     def redraw(self, scoringSystem: ExternalScoring):
 
@@ -26,3 +32,21 @@ class PSEventNamePanel(PSPanelInterface):
         self.window.addstr(0, 0, " " * 96)
         self.window.addstr(0, 0, scoringSystem.event['name'])
 
+        # ... and what a good score is here, so far (see ScoreStats)
+        scoreStats = scoringSystem.getScoreStats()
+        line = ""
+        if scoreStats.getCount() > 0:
+            names = {'total': 'total', 'auto': 'auto', 'teleop': 'tele', 'endg': 'endg'}
+            line = f"Scores ({scoreStats.getCount()}) " + ("avg+-sd" if self.showAverages else "p50/75/90")
+            for component in components:
+                stats = scoreStats.get(component)
+                if stats.getCount() == 0:
+                    # (a part of the score the API hasn't filled in for any match yet)
+                    line += f"  {names[component]} -"
+                elif self.showAverages:
+                    line += f"  {names[component]} {stats.getMean():.0f}+-{stats.getStdDev() or 0:.0f}"
+                else:
+                    line += f"  {names[component]} " + "/".join(f"{stats.getPercentile(p):.0f}" for p in percentiles)
+
+        # (the bottom right corner can't be written to, so one short of the width)
+        self.window.addstr(1, 0, line.ljust(95)[0:95])
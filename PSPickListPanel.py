@@ -0,0 +1,167 @@
+import curses
+from ExternalScoring import ExternalScoring
+from PickList import PickList
+from PSPanelInterface import *
+
+
+#
+# Panel for alliance selection: the best available partners for a captain (see PickList).  Teams can be marked as
+#   picked right here, and the list re-ranks immediately.
+#
+class PSPickListPanel:
+
+    def __init__(self, baseWindow: curses.window):
+        self.baseWindow = baseWindow
+
+        self.window = None
+        self.panel = None
+
+        self.visible = False
+
+        self.captain = 0
+        self.scoringSystem = None
+        self.pickList = None
+
+        # position of the selected team in the ranking, and the first ranking row on screen
+        self.selectedRow = 0
+        self.topRow = 0
+
+    def isVisible(self):
+        return self.visible
+
+
+    def show(self, captain: int, scoringSystem: ExternalScoring, pickList: PickList):
+
+        self.captain = captain
+        self.scoringSystem = scoringSystem
+        self.pickList = pickList
+        self.selectedRow = 0
+        self.topRow = 0
+
+        screenHeight, screenWidth = self.baseWindow.getmaxyx()
+
+        # calculate a bunch of dimentions and positions ... as tall as the screen allows
+        windowHeight = screenHeight - 6
+        windowWidth = 100
+        windowTop = screenHeight // 2 - windowHeight // 2
+        windowLeft = screenWidth // 2 - windowWidth // 2
+
+        # set up the window
+        self.window = curses.newwin(windowHeight,windowWidth,windowTop,windowLeft)
+        self.panel = curses.panel.new_panel(self.window)
+        self.panel.top()
+
+        self.visible = True
+
+        self.redraw()
+
+
+    def redraw(self):
+
+        teams = self.scoringSystem.getTeams()
+        ranking = self.pickList.getRanking(self.captain)
+
+        windowHeight, windowWidth = self.window.getmaxyx()
+
+        TITLE_y = 1
+        TABLE_HEADING_ROW = 3
+        LIST_START_ROW = 5
+        PICKED_y = windowHeight - 3
+        HELP_y = windowHeight - 2
+
+        POS_x = 2
+        TEAM_x = 6
+        NAME_x = 12
+        NAME_width = 30
+        PAIR_x = 44
+        AUTO_x = 54
+        TELE_x = 62
+        ENDG_x = 70
+        X_x = 79
+        RANK_x = 87
+
+        maxRows = PICKED_y - 1 - LIST_START_ROW
+
+        # keep the selection on the list and on the screen
+        if len(ranking) == 0:
+            self.selectedRow = 0
+        elif self.selectedRow >= len(ranking):
+            self.selectedRow = len(ranking) - 1
+        if self.selectedRow < self.topRow:
+            self.topRow = self.selectedRow
+        elif self.selectedRow >= self.topRow + maxRows:
+            self.topRow = self.selectedRow - maxRows + 1
+
+        # draw the outlines
+        self.window.erase()
+        self.window.box()
+        self.window.addch(2,0,curses.ACS_LTEE)
+        self.window.hline(2,1,curses.ACS_HLINE,windowWidth-2)
+        self.window.addch(2,windowWidth-1,curses.ACS_RTEE)
+
+        # Captain
+        captainName = ""
+        if self.captain in teams:
+            captainName = teams[self.captain]['name']
+        self.window.addstr(TITLE_y, 3, f"Best partners for {self.captain} {captainName}"[:windowWidth-6])
+
+        # column headers
+        self.window.addstr(TABLE_HEADING_ROW,POS_x,"  #")
+        self.window.addstr(TABLE_HEADING_ROW,TEAM_x," Team")
+        self.window.addstr(TABLE_HEADING_ROW,NAME_x,"Name")
+        self.window.addstr(TABLE_HEADING_ROW,PAIR_x,"   Pair")
+        self.window.addstr(TABLE_HEADING_ROW,AUTO_x,"  Auto")
+        self.window.addstr(TABLE_HEADING_ROW,TELE_x," Teleop")
+        self.window.addstr(TABLE_HEADING_ROW,ENDG_x,"Endgame")
+        self.window.addstr(TABLE_HEADING_ROW,X_x,"Ox")
+        self.window.addstr(TABLE_HEADING_ROW,RANK_x,"Rank")
+        self.window.hline(TABLE_HEADING_ROW+1,POS_x,"-",RANK_x+4-POS_x)
+
+        for line in range(maxRows):
+            row = self.topRow + line
+            if row >= len(ranking):
+                break
+
+            teamNum, pairScore = ranking[row]
+            team = teams[teamNum]
+
+            if row == self.selectedRow:
+                self.window.attron(curses.color_pair(2))
+            self.window.addstr(LIST_START_ROW+line,POS_x,"{:>3d}".format(row+1))
+            self.window.addstr(LIST_START_ROW+line,TEAM_x,"{:>5d}".format(teamNum))
+            self.window.addstr(LIST_START_ROW+line,NAME_x,team['name'][:NAME_width])
+            self.window.addstr(LIST_START_ROW+line,PAIR_x,"{:>7.1f}".format(pairScore))
+            self.window.addstr(LIST_START_ROW+line,AUTO_x,"{:>6.1f}".format(team['autoPowerScore']))
+            self.window.addstr(LIST_START_ROW+line,TELE_x,"{:>6.1f}".format(team['telePowerScore']))
+            self.window.addstr(LIST_START_ROW+line,ENDG_x,"{:>6.1f}".format(team['endgPowerScore']))
+            self.window.addstr(LIST_START_ROW+line,X_x,"{:>2d}".format(team['overallX']))
+            self.window.addstr(LIST_START_ROW+line,RANK_x,"{:>4d}".format(team['rank']))
+            self.window.attroff(curses.color_pair(2))
+
+        # who's gone already
+        picked = ", ".join(str(teamNum) for teamNum in self.pickList.getPicked())
+        self.window.addstr(PICKED_y, 3, f"Picked: {picked}"[:windowWidth-6])
+
+        self.window.addstr(HELP_y, 3, "up/down: select   x: mark picked   u: undo last pick   esc: close")
+
+    def changeSelectedRow(self, delta):
+        self.selectedRow = max(0, self.selectedRow + delta)
+        self.redraw()
+
+    # Mark the selected team as picked.  It drops off the list and everything below moves up.
+    def pickSelected(self):
+        ranking = self.pickList.getRanking(self.captain)
+        if self.selectedRow < len(ranking):
+            self.pickList.setPicked(ranking[self.selectedRow][0])
+        self.redraw()
+
+    def undoPick(self):
+        self.pickList.undoPicked()
+        self.redraw()
+
+    def hide(self):
+        self.panel.hide()
+        self.panel = None
+        self.window = None
+        self.visible = False
+
@@ -2,6 +2,7 @@ import curses
 from PSPanelInterface import *
 
 from ExternalScoring import ExternalScoring
+from StageTimes import StageTimer
 
 
 # 
@@ -70,36 +71,151 @@ class PSScoresPanel(PSPanelInterface):
         self.matches_col = self.windowWidth - 9
         self.matches_width = 7
 
+        # The schedule columns (average partner and opponent PowerScore, and luck) can take the place of the location
+        #   columns ... same spots, so the rest of the table doesn't move
+        self.showScheduleColumns = False
+        self.partnerPS_col = self.city_col
+        self.opponentPS_col = self.state_col
+        self.luck_col = self.country_col
+
         self.sortColumn = 1
         self.sortColumn_count = 6
 
+        # highlightTeamRow is a position in the sorted team list, starting at 1 (0 means nothing is highlighted).
+        #   Only maxTeamRows teams fit on the screen, so the table is a window onto the list starting at scrollTop.
         self.highlightTeamRow = 0
         self.highlightTeamNumber = 0
         self.maxTeamRows = self.windowHeight - 2
+        self.scrollTop = 0
+        self.teamCount = 0
+
+        # True while kiosk mode is paging through the list (see showPage) rather than following a highlight
+        self.paging = False
+
+        # Pre-formatted rows (by team number) and sort orders (by sort column) for the current data.  positionCache is
+        #   the other way round from sortedCache: team number -> where it is in the sort order.
+        self.cachedScoringSystem = None
+        self.cachedUpdateCount = -1
+        self.rowCache = {}
+        self.sortedCache = {}
+        self.positionCache = {}
+
+        # Teams that moved in the latest refresh: teamNum -> (color pair for the Overall cell, color pair for the Rank cell),
+        #   0 for no color.  Green is up, red is down.
+        self.moverColors = {}
+
+        # Shadow copy of what is on screen: line -> (text, highlighted, mover colors)
+        self.shownRows = {}
+        self.shownSortColumn = -1
+        self.titlesDrawn = False
 
 
     def clear(self):
         self.window.clear()
 
+        # window.clear() blanks everything, so the shadow copy no longer matches the screen
+        self.shownRows = {}
+        self.shownSortColumn = -1
+        self.titlesDrawn = False
+
     def changeSortColumn(self, delta):
         self.sortColumn = (self.sortColumn + delta) % self.sortColumn_count
 
+    def setSortColumn(self, sortColumn):
+        self.sortColumn = sortColumn % self.sortColumn_count
+
+    # Swap between the location columns and the schedule columns.  Every row changes, so the cache is thrown out.
+    def toggleScheduleColumns(self):
+        self.showScheduleColumns = not self.showScheduleColumns
+        self.cachedScoringSystem = None
+        self.titlesDrawn = False
+
     def changeHighlightTeamRow(self, delta):
-        self.highlightTeamRow = (self.highlightTeamRow + delta) % self.maxTeamRows
+        self.paging = False
+        self.highlightTeamRow = (self.highlightTeamRow + delta) % (self.teamCount + 1)
+
+    # page up/down moves by a screen full of teams, stopping at the ends of the list rather than wrapping
+    def pageHighlightTeamRow(self, pages):
+        if self.teamCount == 0:
+            return
+        self.paging = False
+        row = self.highlightTeamRow + pages * self.maxTeamRows
+        self.highlightTeamRow = min(max(row, 1), self.teamCount)
+
+    # home/end
+    def setHighlightTeamRowFirst(self):
+        self.paging = False
+        if self.teamCount > 0:
+            self.highlightTeamRow = 1
+
+    def setHighlightTeamRowLast(self):
+        self.paging = False
+        if self.teamCount > 0:
+            self.highlightTeamRow = self.teamCount
+
+    # Show a screen full of teams without any highlight (used by kiosk mode to page through the list)
+    def showPage(self, page):
+        self.highlightTeamRow = 0
+        self.scrollTop = page * self.maxTeamRows
+        self.paging = True
+
+    def getPageCount(self, scoringSystem: ExternalScoring):
+        return max(1, (len(scoringSystem.getTeams()) + self.maxTeamRows - 1) // self.maxTeamRows)
+
+    # Move the viewport just far enough that the highlighted team is on the screen
+    def scrollToHighlight(self):
+
+        # Kiosk pages never overlap: the last one just shows whatever teams are left over
+        if self.paging:
+            lastPageTop = max(0, self.teamCount - 1) // self.maxTeamRows * self.maxTeamRows
+            self.scrollTop = min(self.scrollTop, lastPageTop)
+            return
+
+        if self.highlightTeamRow > 0:
+            if self.highlightTeamRow - 1 < self.scrollTop:
+                self.scrollTop = self.highlightTeamRow - 1
+            elif self.highlightTeamRow > self.scrollTop + self.maxTeamRows:
+                self.scrollTop = self.highlightTeamRow - self.maxTeamRows
+
+        self.scrollTop = max(0, min(self.scrollTop, self.teamCount - self.maxTeamRows))
+
+    # Highlight a team wherever it is in the current sort order (for the team search), scrolling to it if need be.
+    #   Returns False if the team isn't in the table.
+    def setHighlightTeam(self, scoringSystem: ExternalScoring, teamNum):
+
+        self.updateRowCache(scoringSystem)
+
+        if self.sortColumn not in self.positionCache:
+            s = self.getSortedTeams(scoringSystem.getTeams())
+            self.positionCache[self.sortColumn] = {sortedTeamNum: i for i, sortedTeamNum in enumerate(s)}
+
+        position = self.positionCache[self.sortColumn].get(teamNum)
+        if position is None:
+            return False
+
+        self.highlightTeamRow = position + 1
+        self.paging = False
+        return True
 
     def getHighlightTeamNum(self):
         return self.highlightTeamNumber
             
     def redraw(self, scoringSystem: ExternalScoring):
         
-        self.drawColumnTitles()
-        self.drawSortUnderline()
-        self.drawTable(scoringSystem)
+        with StageTimer(scoringSystem.stageTimes, "draw", record=True):
+            self.drawColumnTitles()
+            self.drawSortUnderline()
+            self.drawTable(scoringSystem)
 
 
     def drawSortUnderline(self):
 
-        self.window.addstr(1,0, " " * self.windowWidth)
+        # The underline only changes when the sort column does
+        if self.shownSortColumn == self.sortColumn:
+            return
+        self.shownSortColumn = self.sortColumn
+
+        self.window.addstr(1,0, " " * (self.windowWidth - 1))
         if self.sortColumn == 0:
             self.window.addstr(1,self.teamNumber_col, "+" * self.teamUnderline_width)
         elif self.sortColumn == 1:
@@ -115,10 +231,22 @@ class PSScoresPanel(PSPanelInterface):
 
 
     def drawColumnTitles(self):
+
+        # The titles never change, so they only need to be written once (or again after a clear)
+        if self.titlesDrawn:
+            return
+        self.titlesDrawn = True
+
+        self.window.addstr(0,0, " " * (self.windowWidth - 1))
         self.window.addstr(0,self.teamNumber_col,"TEAM")
-        self.window.addstr(0,self.city_col,"City")
-        self.window.addstr(0,self.state_col,"State/Prov")
-        self.window.addstr(0,self.country_col,"Country")
+        if self.showScheduleColumns:
+            self.window.addstr(0,self.partnerPS_col,"Partner PS")
+            self.window.addstr(0,self.opponentPS_col,"Opp PS")
+            self.window.addstr(0,self.luck_col,"Luck (RP)")
+        else:
+            self.window.addstr(0,self.city_col,"City")
+            self.window.addstr(0,self.state_col,"State/Prov")
+            self.window.addstr(0,self.country_col,"Country")
         self.window.addstr(0,self.overallPS_col,"Overall")
         self.window.addstr(0,self.autoPS_col,"   Auto")
         self.window.addstr(0,self.teleopPS_col," Teleop")
@@ -131,16 +259,105 @@ class PSScoresPanel(PSPanelInterface):
         self.window.addstr(0,self.matches_col,"Matches")
 
 
-    def drawTable(self, scoringSystem: ExternalScoring):
+    # Build the full text of one row of the table.  Each field is placed at its column, and the row is padded out so that
+    #   writing it also blanks whatever was on that line before
+    def formatTeamRow(self, teamNum, team):
+
+        fields = [
+            (self.teamNumber_col, "{:>5}".format(teamNum)),
+            (self.teamName_col, team["name"][0:self.teamName_width]),
+        ]
+
+        if self.showScheduleColumns:
+            fields += [
+                (self.partnerPS_col, "{:10.2f}".format(team.get("partnerPS", 0.))),
+                (self.opponentPS_col, "{:6.2f}".format(team.get("opponentPS", 0.))),
+                (self.luck_col, "{:+9.2f}".format(team.get("luck", 0.))),
+            ]
+        else:
+            fields += [
+                (self.city_col, team["city"][0:self.city_width]),
+                (self.state_col, team["state"][0:self.state_width]),
+                (self.country_col, team["country"][0:self.country_width]),
+            ]
+
+        fields += [
+            (self.overallPS_col, "{:7.2f}".format(team["powerScore"])),
+            (self.autoPS_col, "{:7.2f}".format(team["autoPowerScore"])),
+            (self.teleopPS_col, "{:7.2f}".format(team["telePowerScore"])),
+            (self.endgamePS_col, "{:7.2f}".format(team["endgPowerScore"])),
+            (self.x_col, "{:>2d}/{:>2d}/{:>2d}/{:>2d}".format(team["overallX"],team["autoX"],team["teleX"],team["endgX"])),
+            (self.rank_col, "{:>3}".format(team["rank"])),
+            (self.rp_col, "{:5.2f}".format(team["rp"])),
+            (self.tbp_col, "{:6.2f}".format(team["tbp"])),
+            (self.highest_col, "{:>7d}".format(int(team["highest"]))),
+            (self.matches_col, "{:>7}".format(team["real_matches"])),
+        ]
+
+        row = ""
+        for col, text in fields:
+            row = row.ljust(col) + text
+
+        return row.ljust(self.windowWidth - 1)[0:self.windowWidth - 1]
+
+
+    # Called when the scoring data may have changed.  Rows are only re-formatted (and re-sorted) when the scoring system
+    #   has new data, not on every redraw.  If we're exactly one refresh behind, the change set says which teams changed,
+    #   and only their rows are re-formatted.
+    def updateRowCache(self, scoringSystem: ExternalScoring):
+
+        updateCount = scoringSystem.getUpdateCount()
+        if (scoringSystem is self.cachedScoringSystem) and (updateCount == self.cachedUpdateCount):
+            return
 
         teams = scoringSystem.getTeams()
-        self.highlightTeamNumber = 0
-
-        # Ensure that we've cleared out any possible old data
-        for i in range(2,self.windowHeight-2):
-            self.window.addstr(i,0," "*(self.windowWidth-1))
-        
-        line = 1
+        changes = scoringSystem.getChanges()
+
+        # (the change set is replaced just after the count goes up, so make sure it's for this refresh)
+        incremental = (scoringSystem is self.cachedScoringSystem) and (self.cachedUpdateCount == updateCount - 1) and \
+            (changes['updateCount'] == updateCount) and not changes['first']
+
+        self.cachedScoringSystem = scoringSystem
+        self.cachedUpdateCount = updateCount
+
+        if incremental:
+            for teamNum in changes['teams']:
+                self.rowCache[teamNum] = self.formatTeamRow(teamNum, teams[teamNum])
+            # nothing moved, so the sort orders still hold
+            if len(changes['teams']) > 0:
+                self.sortedCache = {}
+                self.positionCache = {}
+
+        # a team dropped out (or we skipped a refresh) ... start over
+        if not incremental or len(self.rowCache) != len(teams):
+            self.rowCache = {}
+            for teamNum in teams:
+                self.rowCache[teamNum] = self.formatTeamRow(teamNum, teams[teamNum])
+            self.sortedCache = {}
+            self.positionCache = {}
+
+        self.moverColors = {}
+        if changes['updateCount'] == updateCount and not changes['first']:
+            for teamNum in changes['teams']:
+                change = changes['teams'][teamNum]
+                psColor = 0
+                if change['powerScoreDelta'] >= .005:
+                    psColor = 4
+                elif change['powerScoreDelta'] <= -.005:
+                    psColor = 3
+                rankColor = 0
+                if change['rankDelta'] > 0:
+                    rankColor = 4
+                elif change['rankDelta'] < 0:
+                    rankColor = 3
+                if psColor != 0 or rankColor != 0:
+                    self.moverColors[teamNum] = (psColor, rankColor)
+
+
+    def getSortedTeams(self, teams):
+
+        if self.sortColumn in self.sortedCache:
+            return self.sortedCache[self.sortColumn]
 
         #construct the sorted list
         s = []
@@ -157,37 +374,57 @@ class PSScoresPanel(PSPanelInterface):
         elif self.sortColumn == 5:
             s = sorted(teams, key = lambda r: teams[r]["rank"], reverse=False)
 
+        self.sortedCache[self.sortColumn] = s
+        return s
+
+
+    def drawTable(self, scoringSystem: ExternalScoring):
+
+        self.updateRowCache(scoringSystem)
+
+        teams = scoringSystem.getTeams()
+        s = self.getSortedTeams(teams)
+        self.highlightTeamNumber = 0
+        self.teamCount = len(s)
+
         if self.highlightTeamRow > len(teams):
             self.highlightTeamRow = 0
 
-        for teamNum in s:
-            team = teams[teamNum]
-            line+=1
+        self.scrollToHighlight()
 
-            if line < self.windowHeight:
+        blankRow = " " * (self.windowWidth - 1)
 
-                if (line - 1) == self.highlightTeamRow:
-                    self.window.attron(curses.color_pair(2))
-                    self.highlightTeamNumber = teamNum
+        # Work out what each line should show, then only write the lines that differ from what is already on screen.
+        #   Only the visible slice of the sorted list is looked at, so this costs the same for 20 teams or 200.
+        for line in range(2, self.windowHeight):
 
-                self.window.addstr(line,self.teamNumber_col,"{:>5}".format(teamNum))
-                self.window.addstr(line,self.teamName_col,team["name"][0:self.teamName_width])
-                self.window.addstr(line,self.city_col,team["city"][0:self.city_width])
-                self.window.addstr(line,self.state_col,team["state"][0:self.state_width])
-                self.window.addstr(line,self.country_col,team["country"][0:self.country_width])
-                self.window.addstr(line,self.overallPS_col,"{:7.2f}".format(team["powerScore"]))
-                self.window.addstr(line,self.autoPS_col,"{:7.2f}".format(team["autoPowerScore"]))
-                self.window.addstr(line,self.teleopPS_col,"{:7.2f}".format(team["telePowerScore"]))
-                self.window.addstr(line,self.endgamePS_col,"{:7.2f}".format(team["endgPowerScore"]))
-                self.window.addstr(line,self.x_col,"{:>2d}/{:>2d}/{:>2d}/{:>2d}".format(team["overallX"],team["autoX"],team["teleX"],team["endgX"]))
-                self.window.addstr(line,self.rank_col,"{:>3}".format(team["rank"]))
-                self.window.addstr(line,self.rp_col,"{:5.2f}".format(team["rp"]))
-                self.window.addstr(line,self.tbp_col,"{:6.2f}".format(team["tbp"]))
-                self.window.addstr(line,self.highest_col,"{:>7d}".format(int(team["highest"])))
-                self.window.addstr(line,self.matches_col,"{:>7}".format(team["real_matches"]))
+            text = blankRow
+            highlighted = False
+            colors = (0, 0)
 
-                self.window.attroff(curses.color_pair(2))
+            teamIndex = self.scrollTop + line - 2
+            if teamIndex < len(s):
+                teamNum = s[teamIndex]
+                text = self.rowCache[teamNum]
+                colors = self.moverColors.get(teamNum, (0, 0))
+
+                if (teamIndex + 1) == self.highlightTeamRow:
+                    highlighted = True
+                    self.highlightTeamNumber = teamNum
 
+            if self.shownRows.get(line) == (text, highlighted, colors):
+                continue
 
+            if highlighted:
+                self.window.addstr(line, 0, text, curses.color_pair(2))
+            else:
+                self.window.addstr(line, 0, text)
 
+                # movers: color just the Overall and Rank numbers (the highlight wins on the selected row)
+                psColor, rankColor = colors
+                if psColor != 0:
+                    self.window.addstr(line, self.overallPS_col, text[self.overallPS_col:self.overallPS_col + self.overallPS_width], curses.color_pair(psColor))
+                if rankColor != 0:
+                    self.window.addstr(line, self.rank_col, text[self.rank_col:self.rank_col + self.rank_width], curses.color_pair(rankColor))
 
+            self.shownRows[line] = (text, highlighted, colors)
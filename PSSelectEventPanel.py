@@ -17,13 +17,17 @@ class PSSelectEventPanel(PSPanelInterface):
 
         self.selectedIndex = 0
 
-        # this goes on the middle of the page
+        # With more events than fit on the screen, the list scrolls.  firstIndex is the event at the top of the list.
         numEvents = len(self.scoringSystems)
-        
-        top = screenHeight // 2 - numEvents // 2 - 2
+        self.rows = max(1, min(numEvents, screenHeight - 12))
+        self.firstIndex = 0
+
+        # this goes on the middle of the page
+        height = max(8, self.rows + 4)
+        top = screenHeight // 2 - height // 2
         left = screenWidth // 2 - 50
         width = 120
-        super().__init__(8, width, top, left)
+        super().__init__(height, width, top, left)
         #self.window.box()
         #self.window.addstr(0,width // 2 - 8, " Select Event ")
         self.clearBox()
@@ -36,6 +40,11 @@ class PSSelectEventPanel(PSPanelInterface):
         numEvents = len(self.scoringSystems)
         self.selectedIndex = (delta + self.selectedIndex) % numEvents
 
+    # page up/down: a screenful at a time, stopping at the ends rather than wrapping around
+    def pageSelectedIndex(self, delta):
+        numEvents = len(self.scoringSystems)
+        self.selectedIndex = max(0, min(numEvents - 1, self.selectedIndex + delta * self.rows))
+
     def setSelectedIndex(self,idx):
         self.selectedIndex = idx
 
@@ -53,18 +62,27 @@ class PSSelectEventPanel(PSPanelInterface):
         self.clearBox()
 
         numEvents = len(self.scoringSystems)
+        height, width = self.window.getmaxyx()
+
+        # scroll just far enough to keep the selected event in the list
+        if self.selectedIndex < self.firstIndex:
+            self.firstIndex = self.selectedIndex
+        elif self.selectedIndex >= self.firstIndex + self.rows:
+            self.firstIndex = self.selectedIndex - self.rows + 1
 
-        teamIndex = 0
-        for scoringSystem in self.scoringSystems:
-            line = teamIndex + 2
+        for eventIndex in range(self.firstIndex, min(numEvents, self.firstIndex + self.rows)):
+            line = eventIndex - self.firstIndex + 2
 
-            if teamIndex == self.selectedIndex:
+            if eventIndex == self.selectedIndex:
                 self.window.attron(curses.color_pair(2))
-            self.window.addstr(line, 10, scoringSystem.event['name'])
+            self.window.addstr(line, 10, self.scoringSystems[eventIndex].event['name'][0:width - 20])
             self.window.attroff(curses.color_pair(2))
 
-            teamIndex = teamIndex + 1
-
-
-        #self.window.touchwin()
-        #self.window.refresh()
\ No newline at end of file
+        # say when there's more than what's showing
+        if self.firstIndex > 0:
+            self.window.addstr(1, 10, "^ more")
+        if self.firstIndex + self.rows < numEvents:
+            self.window.addstr(height - 2, 10, "v more")
+        if numEvents > self.rows:
+            position = f" {self.selectedIndex + 1} of {numEvents} "
+            self.window.addstr(height - 1, width - len(position) - 4, position)
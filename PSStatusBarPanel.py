@@ -17,9 +17,41 @@ class PSStatusBarPanel(PSPanelInterface):
         super().__init__(2, screenWidth, screenHeight - 2, 0)
 
         self.setVisible(True)
+
+        # the last message, so it can be put back after a prompt (messages that arrive during a prompt wait until then)
+        self.message = ""
+        self.prompting = False
     
 
+    # Like the other panels, these only draw into the window.  It gets to the screen with the next
+    #   update_panels()/doupdate().
     def redraw(self, message):
         
+        self.message = message
+        if self.prompting:
+            return
         self.window.addstr(1, 0, message)
-        self.window.refresh()
\ No newline at end of file
+
+    # A prompt (like the team search) takes over the left half of the status line until clearPrompt() puts the last
+    #   message back
+    def redrawPrompt(self, prompt):
+
+        height, width = self.window.getmaxyx()
+        promptWidth = width // 2 - 1
+
+        self.prompting = True
+        self.window.addstr(1, 0, prompt[:promptWidth].ljust(promptWidth))
+
+    def clearPrompt(self):
+
+        self.redrawPrompt("")
+        self.prompting = False
+        self.redraw(self.message)
+
+    # Timing overlay, on the right hand end of the status line.  Pass "" to clear it.
+    def redrawTimings(self, timings):
+
+        height, width = self.window.getmaxyx()
+        overlayWidth = width // 2
+
+        self.window.addstr(1, width - overlayWidth - 1, timings[-overlayWidth:].rjust(overlayWidth))
@@ -0,0 +1,134 @@
+import curses
+from ExternalScoring import ExternalScoring
+from SeasonStore import SeasonStore
+from PSPanelInterface import *
+
+
+#
+# Panel to show a team's whole season from the SeasonStore: every event it has been to, and every match it played
+#
+class PSTeamHistoryPanel:
+
+    def __init__(self, baseWindow: curses.window):
+        self.baseWindow = baseWindow
+
+        self.window = None
+        self.panel = None
+
+        self.visible = False
+
+        # everything to show, one string (and color pair) per line, and the first line on screen
+        self.lines = []
+        self.topLine = 0
+
+    def isVisible(self):
+        return self.visible
+
+
+    def show(self, teamNumber: int, scoringSystem: ExternalScoring, seasonStore: SeasonStore):
+
+        screenHeight, screenWidth = self.baseWindow.getmaxyx()
+
+        teamEvents = seasonStore.getTeamEvents(scoringSystem.season, teamNumber)
+        teamMatches = seasonStore.getTeamMatches(scoringSystem.season, teamNumber)
+        teamRating = seasonStore.getTeamRating(scoringSystem.season, teamNumber)
+
+        teamName = ""
+        if len(teamEvents) > 0:
+            teamName = teamEvents[-1]['name']
+
+        self.title = f"{teamNumber} {teamName} - {scoringSystem.season} season"
+
+        # Build every line up front ... scrolling just picks which ones are drawn
+        self.lines = []
+        self.lines.append(("Event            Rank     RP    TBP  |     PS      A      T      E     Ox", 0))
+        self.lines.append(("-" * 82, 0))
+        for teamEvent in teamEvents:
+            self.lines.append(("{:<14.14s} {:>6d} {:>6.2f} {:>6.1f}  |  {:>5.1f}  {:>5.1f}  {:>5.1f}  {:>5.1f}    {:>3d}".format(
+                teamEvent['eventCode'], teamEvent['rank'], teamEvent['rp'], teamEvent['tbp'], teamEvent['powerScore'],
+                teamEvent['autoPowerScore'], teamEvent['telePowerScore'], teamEvent['endgPowerScore'], teamEvent['overallX']), 0))
+
+        # the whole season at once, if the ratings have been worked out (see SeasonRatings)
+        if teamRating is not None:
+            self.lines.append(("{:<14s} {:>6s} {:>6s} {:>6s}  |  {:>5.1f}  {:>5.1f}  {:>5.1f}  {:>5.1f}".format(
+                "Season rating", "", "", "", teamRating['rating'], teamRating['autoRating'], teamRating['teleRating'],
+                teamRating['endgRating']), 0))
+
+        self.lines.append(("", 0))
+        self.lines.append(("Event             M  Partner  Opponents       Score           A     T     E", 0))
+        self.lines.append(("-" * 82, 0))
+        for match in teamMatches:
+            opponents = f"{match['opponent1']}/{match['opponent2']}"
+            if match['played']:
+                result = "Tie"
+                if match['score'] > match['opponentScore']:
+                    result = "Win"
+                elif match['score'] < match['opponentScore']:
+                    result = "Loss"
+                score = "{:d} - {:d} {}".format(match['score'], match['opponentScore'], result)
+                components = "{:>5d} {:>5d} {:>5d}".format(match['auto'], match['teleop'], match['endg'])
+            else:
+                score = "not played"
+                components = ""
+
+            # the team's alliance color, like everywhere else
+            color = 3 if match['alliance'] == 'red' else 0
+            self.lines.append(("{:<14.14s} {:>4d}  {:>7d}  {:<14s}  {:<15s} {}".format(
+                match['eventCode'], match['matchid'], match['partner'], opponents, score, components), color))
+
+        if len(teamMatches) == 0:
+            self.lines.append(("No matches stored for this team yet", 0))
+
+        # calculate a bunch of dimentions and positions
+        windowHeight = min(screenHeight - 6, len(self.lines) + 6)
+        windowWidth = 90
+        windowTop = screenHeight // 2 - windowHeight // 2
+        windowLeft = screenWidth // 2 - windowWidth // 2
+
+        # set up the window
+        self.window = curses.newwin(windowHeight,windowWidth,windowTop,windowLeft)
+        self.panel = curses.panel.new_panel(self.window)
+        self.panel.top()
+
+        self.topLine = 0
+        self.visible = True
+
+        self.redraw()
+
+
+    def redraw(self):
+
+        windowHeight, windowWidth = self.window.getmaxyx()
+
+        LIST_START_ROW = 4
+        maxLines = windowHeight - LIST_START_ROW - 1
+
+        self.topLine = max(0, min(self.topLine, len(self.lines) - maxLines))
+
+        # draw the outlines
+        self.window.erase()
+        self.window.box()
+        self.window.addch(2,0,curses.ACS_LTEE)
+        self.window.hline(2,1,curses.ACS_HLINE,windowWidth-2)
+        self.window.addch(2,windowWidth-1,curses.ACS_RTEE)
+
+        self.window.addstr(1, 3, self.title[:windowWidth-6])
+
+        for i in range(maxLines):
+            if self.topLine + i >= len(self.lines):
+                break
+            text, color = self.lines[self.topLine + i]
+            self.window.attron(curses.color_pair(color))
+            self.window.addstr(LIST_START_ROW+i, 3, text[:windowWidth-6])
+            self.window.attroff(curses.color_pair(color))
+
+    def scroll(self, delta):
+        self.topLine = self.topLine + delta
+        self.redraw()
+
+    def hide(self):
+        self.panel.hide()
+        self.panel = None
+        self.window = None
+        self.visible = False
+
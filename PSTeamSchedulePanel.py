@@ -2,6 +2,10 @@ import curses
 from ExternalScoring import ExternalScoring
 from PSPanelInterface import *
 
+# A match is an outlier (and colored) when the team's estimated contribution is this many standard deviations away from
+#   its PowerScore.  The standard deviation comes from X, the same way as for predictions.
+outlierSigmas = 2
+
 
 # 
 # Panel to show the schedule (and results or predicted results) for a team.
@@ -24,6 +28,7 @@ class PSTeamSchedulePanel:
 
         teams = scoringSystem.getTeams()
         matches = scoringSystem.getMatches()
+        predictions = scoringSystem.getPredictions()
 
         screenHeight, screenWidth = self.baseWindow.getmaxyx()
 
@@ -89,7 +94,7 @@ class PSTeamSchedulePanel:
         self.window.addstr(TABLE_HEADING_ROW+1,REDALLIANCE_x,"-"*REDALLIANCE_width)
         self.window.addstr(TABLE_HEADING_ROW,BLUEALLIANCE_x,"Blue Alliance")
         self.window.addstr(TABLE_HEADING_ROW+1,BLUEALLIANCE_x,"-"*BLUEALLIANCE_width)
-        self.window.addstr(TABLE_HEADING_ROW,SCORE_x,"Score")
+        self.window.addstr(TABLE_HEADING_ROW,SCORE_x,"Score / est. PS  A/T/E")
         self.window.addstr(TABLE_HEADING_ROW+1,SCORE_x,"-"*SCORE_width)
 
         matchRow = 0
@@ -147,23 +152,41 @@ class PSTeamSchedulePanel:
                         result = "Win"
 
                     self.window.addstr(MATCHLIST_START_ROW+3*matchRow,SCORE_x,"{:d} - {:d} ({})".format(redScore,blueScore, result))
+
+                    # what the PowerScore calculation says this team scored this match: overall, then auto/teleop/endgame.
+                    #   Green for a match well above its usual, red for well below.
+                    contribution = scoringSystem.getContribution(matchid, teamNumber)
+                    if contribution is not None:
+                        team = teams[teamNumber]
+                        sd = team['powerScore'] * max(0., (100 - team['overallX']) / 100.)
+                        color = 0
+                        if contribution[0] > team['powerScore'] + outlierSigmas * sd:
+                            color = 4
+                        elif contribution[0] < team['powerScore'] - outlierSigmas * sd:
+                            color = 3
+                        self.window.addstr(MATCHLIST_START_ROW+3*matchRow+1,SCORE_x,"est. {:.1f}  {:.0f}/{:.0f}/{:.0f}".format(*contribution)[:SCORE_width],curses.color_pair(color))
                 else:
-                    if showPrediction:
-                        redScore = int(teams[redAlliance['team1']]['powerScore'] + teams[redAlliance['team2']]['powerScore'] + .5)
-                        blueScore = int(teams[blueAlliance['team1']]['powerScore'] + teams[blueAlliance['team2']]['powerScore'] + .5)
+                    if showPrediction and matchid in predictions:
+                        # predictions are worked out once per refresh (see ExternalScoring.updatePredictions)
+                        prediction = predictions[matchid]
+                        redScore = prediction['red']
+                        blueScore = prediction['blue']
+
+                        # chance of a win for this team's alliance
+                        winProb = prediction['redWinProb']
+                        if not teamOnRedAlliance:
+                            winProb = 1 - winProb
 
                         result = "Tie"
-                        if (teamOnRedAlliance and redScore > blueScore):
+                        if winProb > .5:
                             result = "Win"
-                        elif (teamOnRedAlliance and redScore < blueScore):
+                        elif winProb < .5:
                             result = "Loss"
-                        if ((not teamOnRedAlliance) and redScore > blueScore):
-                            result = "Loss"
-                        if ((not teamOnRedAlliance) and redScore < blueScore):
-                            result = "Win"
 
                         self.window.addstr(MATCHLIST_START_ROW+3*matchRow,SCORE_x,"{:d} - {:d}".format(redScore,blueScore))
-                        self.window.addstr(MATCHLIST_START_ROW+3*matchRow+1,SCORE_x,"(predicted {})".format(result))
+                        # nothing is certain until it's played ... show 1% to 99%
+                        winPct = min(99, max(1, int(100*winProb + .5)))
+                        self.window.addstr(MATCHLIST_START_ROW+3*matchRow+1,SCORE_x,"(predicted {} {:d}%)".format(result, winPct))
                     pass
 
                 matchRow = matchRow + 1
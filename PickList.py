@@ -0,0 +1,119 @@
+#
+# PickList
+#
+# Alliance selection helper.  For a captain, ranks every other team as a partner by how well the two would score
+#   together, and drops teams from the ranking as they get picked.
+#
+# Scores for every pair of teams are worked out at once (a full table, one row per team) the first time they're needed
+#   after a refresh.  Marking a team picked doesn't recalculate anything ... picked teams are just skipped when the
+#   ranking is read, so the list updates right away.
+#
+# How a pair is scored, for each of auto, teleop, and endgame:
+#   - the stronger team counts in full, the weaker one at overlapFactor.  Two robots that are good at the same thing get
+#     in each other's way (and share the same game elements), so a partner that is strong where the captain is weak is
+#     worth more than one that duplicates the captain.
+# Then the pair loses riskFactor times its combined standard deviation (see ExternalScoring.getTeamVariance), so
+#   consistent teams rank ahead of streaky ones with the same average.
+#
+
+from math import sqrt
+from ExternalScoring import ExternalScoring, getTeamVariance
+
+overlapFactor = 0.8
+riskFactor = 0.5
+
+
+class PickList:
+
+    # Constructor
+    def __init__(self, scoringSystem: ExternalScoring):
+        self.scoringSystem = scoringSystem
+
+        # the pair table, and the data it was built from (see updatePairScores)
+        self.teamNumbers = []
+        self.teamIndex = {}
+        self.pairScores = []
+        self.builtFrom = None
+
+        # captain -> every other team, best partner first.  Cleared whenever the pair table is rebuilt.
+        self.orderCache = {}
+
+        # teams already on an alliance, in the order they were picked
+        self.picked = []
+
+    # Build the table of scores for every pair of teams, if the data has changed since the last time
+    def updatePairScores(self):
+
+        builtFrom = (self.scoringSystem.getTeams(), self.scoringSystem.getUpdateCount())
+        if self.builtFrom is not None and self.builtFrom[0] is builtFrom[0] and self.builtFrom[1] == builtFrom[1]:
+            return
+
+        teams = self.scoringSystem.getTeams()
+        teamNumbers = list(teams)
+
+        # one list per stat, all in the same team order
+        auto = [teams[teamNum].get('autoPowerScore', 0.) for teamNum in teamNumbers]
+        tele = [teams[teamNum].get('telePowerScore', 0.) for teamNum in teamNumbers]
+        endg = [teams[teamNum].get('endgPowerScore', 0.) for teamNum in teamNumbers]
+        variance = [getTeamVariance(teams[teamNum]) for teamNum in teamNumbers]
+
+        # row i is team i paired with every team (the table is symmetric, but a whole row at a time is simpler and
+        #   still only takes a few milliseconds for a big division)
+        pairScores = []
+        for i in range(len(teamNumbers)):
+            a = auto[i]
+            t = tele[i]
+            e = endg[i]
+            v = variance[i]
+            pairScores.append([
+                max(a, a2) + overlapFactor * min(a, a2)
+                + max(t, t2) + overlapFactor * min(t, t2)
+                + max(e, e2) + overlapFactor * min(e, e2)
+                - riskFactor * sqrt(v + v2)
+                for a2, t2, e2, v2 in zip(auto, tele, endg, variance)
+            ])
+
+        self.teamNumbers = teamNumbers
+        self.teamIndex = {teamNum: i for i, teamNum in enumerate(teamNumbers)}
+        self.pairScores = pairScores
+        self.orderCache = {}
+        self.builtFrom = builtFrom
+
+    # Every available partner for the captain, best first, as (teamNumber, pairScore)
+    def getRanking(self, captain):
+
+        self.updatePairScores()
+
+        if captain not in self.teamIndex:
+            return []
+
+        row = self.pairScores[self.teamIndex[captain]]
+
+        order = self.orderCache.get(captain)
+        if order is None:
+            order = sorted(range(len(row)), key=lambda j: row[j], reverse=True)
+            self.orderCache[captain] = order
+
+        picked = set(self.picked)
+        return [(self.teamNumbers[j], row[j]) for j in order if self.teamNumbers[j] != captain and self.teamNumbers[j] not in picked]
+
+    # The pair's score for a captain and one partner
+    def getPairScore(self, captain, partner):
+        self.updatePairScores()
+        return self.pairScores[self.teamIndex[captain]][self.teamIndex[partner]]
+
+    def setPicked(self, teamNum):
+        if teamNum not in self.picked:
+            self.picked.append(teamNum)
+
+    # Take back the most recent pick (returns the team, or 0 if nothing has been picked)
+    def undoPicked(self):
+        if len(self.picked) == 0:
+            return 0
+        return self.picked.pop()
+
+    def isPicked(self, teamNum):
+        return teamNum in self.picked
+
+    def getPicked(self):
+        return self.picked
@@ -0,0 +1,80 @@
+#
+# RemoteScoring
+#
+# Thin-client version of ExternalScoring.  Instead of calling the FTC API and calculating PowerScores itself, it gets
+#   finished snapshots from a SnapshotServer.  The panels can't tell the difference - teams, matches, and event are
+#   the same dictionaries either way.
+#
+
+import time
+import requests
+from ExternalScoring import ExternalScoring, ExternalScoringException
+from SnapshotServer import longPollSec
+from StageTimes import StageTimer
+
+
+class RemoteScoring(ExternalScoring):
+
+    # Constructor
+    def __init__(self, serverURL, eventCode):
+        self.serverURL = serverURL.rstrip("/")
+        self.snapshotVersion = 0
+
+        super().__init__("", eventCode, "")
+
+        # the server tells us when there's new data (see waitForChange)
+        self.pushUpdates = True
+
+    # get event info from the server
+    def updateEvent(self):
+
+        r=requests.get(self.serverURL+'/event/'+self.eventCode, timeout=15)
+
+        if r.status_code!=200:
+            raise ExternalScoringException(f"Server at {self.serverURL} is not serving event {self.eventCode}.  Request returned {r.status_code}")
+        eventJsonResult = r.json()
+
+        self.season = eventJsonResult['season']
+        self.event = eventJsonResult['event']
+        self.eventLoaded = True
+
+    # Get the latest snapshot.  PowerScores have already been calculated by the server.
+    def updateTeamsMatches(self):
+
+        self.startRefresh()
+        try:
+            r=self.timedGet('/snapshot/'+self.eventCode, self.serverURL+'/snapshot/'+self.eventCode, timeout=longPollSec + 15)
+
+            if r.status_code!=200:
+                # treated like any other trouble reaching the data ... the display will try again later
+                raise requests.exceptions.ConnectionError(f"Server returned {r.status_code}")
+
+            with StageTimer(self.stageTimes, "json"):
+                snapshot = r.json()
+        except Exception as x:
+            self.finishRefresh(x)
+            raise
+
+        self.useSnapshot(snapshot)
+        self.snapshotVersion = snapshot['version']
+
+        self.finishRefresh(None)
+        self.updateCount = self.updateCount + 1
+        self.updateChanges()
+        self.updateScoreStats()
+        self.saveToSeasonStore()
+        self.shareSnapshot()
+
+    # Blocks (on a long poll) until the server has a newer snapshot than the one we have, or the poll times out.
+    #   Returns True if there's new data to get.  Meant to be run on a background thread.
+    def waitForChange(self):
+
+        try:
+            r=requests.get(self.serverURL+'/version/'+self.eventCode+'?since='+str(self.snapshotVersion), timeout=longPollSec + 15)
+            # (not just greater than ... the server may have restarted and be counting from 1 again)
+            return r.json()['version'] != self.snapshotVersion
+
+        except (requests.exceptions.RequestException, ValueError):
+            # server is down or restarting ... don't hammer it
+            time.sleep(5)
+            return False
@@ -0,0 +1,96 @@
+#
+# ReplayScoring
+#
+# Replays an event from a SeasonStore (recorded with --store, or pulled in with --backfill) as if it were happening
+#   live.  It starts with no matches played; each call to releaseNextMatch() makes one more match "played", and the next
+#   refresh sees it.  Everything after the fetch - the PowerScore calculation, predictions, and drawing - is the real
+#   code, so a whole day of qualification matches can be pushed through the display in a minute.
+#
+# Rankings (rank, RP, TBP) are the event's final archived values; they aren't replayed.
+#
+
+from ExternalScoring import ExternalScoring, ExternalScoringException
+from SeasonStore import SeasonStore
+
+
+class ReplayScoring(ExternalScoring):
+
+    # Constructor
+    def __init__(self, seasonStore: SeasonStore, season, eventCode):
+        super().__init__(season, eventCode, "")
+
+        event, teams, alliances = seasonStore.getEventArchive(season, eventCode)
+        if event is None:
+            raise ExternalScoringException(f"Event {eventCode} ({season}) is not in {seasonStore.path}.  Record it with --store, or use --backfill.")
+
+        self.setEvent(event)
+        self.archivedTeams = teams
+
+        # matchid -> {'red': row, 'blue': row}, and the matches with scores, in the order they'll be released
+        self.archivedMatches = {}
+        for alliance in alliances:
+            self.archivedMatches.setdefault(alliance['matchid'], {})[alliance['alliance']] = alliance
+        self.playedMatchIds = [matchid for matchid in sorted(self.archivedMatches) if self.archivedMatches[matchid]['red']['played']]
+
+        self.releasedCount = 0
+
+    # Make one more match played.  Returns False if they've all been released.
+    def releaseNextMatch(self):
+        if self.releasedCount >= len(self.playedMatchIds):
+            return False
+        self.releasedCount = self.releasedCount + 1
+        return True
+
+    def getReleasedCount(self):
+        return self.releasedCount
+
+    def getMatchCount(self):
+        return len(self.playedMatchIds)
+
+    # Stands in for the FTC API: builds teams and matches from the archive, with only the released matches played
+    def updateTeamsMatchesFromFTC(self):
+
+        teams = {}
+        for archivedTeam in self.archivedTeams:
+            teamNum = archivedTeam['number']
+            team = {}
+            team['number'] = teamNum
+            team['name'] = archivedTeam['name'] or ""
+            team['school'] = ''
+            team['city'] = archivedTeam['city']
+            team['state'] = archivedTeam['state']
+            team['country'] = archivedTeam['country']
+            team['rank'] = archivedTeam['rank']
+            team['rp'] = archivedTeam['rp']
+            team['tbp'] = archivedTeam['tbp']
+            team['highest'] = archivedTeam['highest']
+            team['matches'] = archivedTeam['matches']
+            team['real_matches'] = 0
+            for key in ('allianceScore', 'autoAllianceScore', 'teleAllianceScore', 'endgAllianceScore',
+                        'powerScore', 'autoPowerScore', 'telePowerScore', 'endgPowerScore',
+                        'overallX', 'autoX', 'teleX', 'endgX'):
+                team[key] = 0
+            teams[teamNum] = team
+
+        released = set(self.playedMatchIds[:self.releasedCount])
+
+        matches = {}
+        for matchid in sorted(self.archivedMatches):
+            archived = self.archivedMatches[matchid]
+
+            match = {'matchid': matchid, 'played': matchid in released, 'alliances': {}}
+            for color in ('red', 'blue'):
+                match['alliances'][color] = {'team1': archived[color]['team1'], 'team2': archived[color]['team2']}
+                if match['played']:
+                    for key in ('total', 'auto', 'teleop', 'endg', 'pen'):
+                        match['alliances'][color][key] = archived[color][key]
+
+            if match['played']:
+                for color in ('red', 'blue'):
+                    teams[archived[color]['team1']]['real_matches'] += 1
+                    teams[archived[color]['team2']]['real_matches'] += 1
+
+            matches[matchid] = match
+
+        self.teams = teams
+        self.matches = matches
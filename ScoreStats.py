@@ -0,0 +1,142 @@
+#
+# ScoreStats
+#
+# What's a good score at this event?  Running statistics of every alliance score so far - overall, auto, teleop, and
+#   endgame - kept up as each match is scored: mean and variance (Welford's method), and the median, 75th, and 90th
+#   percentiles.
+#
+# Each new match is added on its own, so a refresh only costs as much as the matches that were scored since the last
+#   one.  Memory is fixed no matter how many matches there are: the percentiles are estimated with the P-squared
+#   algorithm (Jain and Chlamtac, 1985), which keeps five markers per percentile instead of every score.  The estimates
+#   are exact for the first five scores and stay within a point or two after that.
+#
+# Scores are only ever added.  A match that gets re-scored later keeps its first score in here (the event's numbers
+#   barely move either way).
+#
+
+# the alliance score fields, and the percentiles kept for each
+components = ('total', 'auto', 'teleop', 'endg')
+percentiles = (.5, .75, .9)
+
+
+# One percentile of a stream of numbers, in fixed memory (P-squared)
+class P2Quantile:
+
+    # Constructor.  p is the fraction, like .9 for the 90th percentile.
+    def __init__(self, p):
+        self.p = p
+
+        # the first five numbers are just kept; after that, five markers: their heights, their positions (counts), and
+        #   where each should ideally be
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        # which cell x falls in, stretching the ends if it's a new low or high
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k = k + 1
+
+        positions = self.positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # nudge the middle markers toward where they should be, with a parabolic guess at the new height (or a straight
+        #   line if the parabola would put it out of order)
+        for i in (1, 2, 3):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+                    (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i]) +
+                    (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    # The estimate, or None before anything has been added
+    def get(self):
+        heights = self.heights
+        if len(heights) == 0:
+            return None
+        if len(heights) < 5 or len(heights) == 5 and self.positions[4] == 5:
+            # still exact: the nearest rank
+            return heights[min(len(heights) - 1, int(self.p * len(heights)))]
+        return heights[2]
+
+
+# Count, mean, variance, and percentiles of a stream of numbers
+class RunningStats:
+
+    # Constructor
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.quantiles = {p: P2Quantile(p) for p in percentiles}
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        for quantile in self.quantiles.values():
+            quantile.add(x)
+
+    def getCount(self):
+        return self.count
+
+    def getMean(self):
+        return self.mean if self.count > 0 else None
+
+    def getVariance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def getStdDev(self):
+        variance = self.getVariance()
+        return variance ** .5 if variance is not None else None
+
+    def getPercentile(self, p):
+        return self.quantiles[p].get()
+
+
+# The statistics for every score component at an event
+class ScoreStats:
+
+    # Constructor
+    def __init__(self):
+        self.stats = {component: RunningStats() for component in components}
+
+    # Add both alliances' scores from a played match
+    def addMatch(self, match):
+        for color in ('red', 'blue'):
+            alliance = match['alliances'][color]
+            for component in components:
+                if alliance.get(component) is not None:
+                    self.stats[component].add(alliance[component])
+
+    def get(self, component) -> RunningStats:
+        return self.stats[component]
+
+    # How many alliance scores are in
+    def getCount(self):
+        return self.stats['total'].getCount()
@@ -0,0 +1,187 @@
+#
+# ScoresPublisher
+#
+# Headless "publish" mode.  Instead of drawing to a terminal, each division's teams and match schedule are written to a
+#   directory as JSON, along with a static HTML page that reloads itself.  Point any number of browsers or signage players
+#   at the directory (or a web server serving it) and the FTC API is still only polled once per division.
+#
+# Files written to the output directory:
+#   index.html            links to each division
+#   <eventCode>.json      event, teams (sorted by PowerScore), and matches for one division
+#   <eventCode>.html      the same data as a page
+#
+# Every file is written to a temporary file first and then renamed over the old one, so readers never see half a file.
+#
+
+from datetime import datetime
+import html
+import json
+import os
+import tempfile
+import threading
+import time
+import traceback
+import requests
+from ExternalScoring import ExternalScoring
+from MetricsLog import MetricsLog
+
+
+class ScoresPublisher:
+
+    # Constructor
+    def __init__(self, outputDir, scoringSystems: list[ExternalScoring], secBetweenUpdates, secBetweenPageReloads = 60, metricsLog: MetricsLog = None):
+        self.outputDir = outputDir
+        self.scoringSystems = scoringSystems
+        self.secBetweenUpdates = secBetweenUpdates
+        self.metricsLog = metricsLog
+        self.secBetweenPageReloads = secBetweenPageReloads
+
+        os.makedirs(self.outputDir, exist_ok=True)
+
+    # Runs one refresh loop per division, forever (or until ctrl-c)
+    def run(self):
+
+        self.writeIndex()
+
+        threads = []
+        for scoringSystem in self.scoringSystems:
+            thread = threading.Thread(target=self.__refreshLoop, args=(scoringSystem,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        try:
+            while 1:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+    def __refreshLoop(self, scoringSystem: ExternalScoring):
+
+        while 1:
+            try:
+                # Get the external data and calculate PowerScore
+                scoringSystem.updateTeamsMatches()
+                self.publish(scoringSystem)
+                print(f"{scoringSystem.eventCode}: published at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+            except requests.exceptions.Timeout:
+                # Handle a timeout on the URL
+                print(f"{scoringSystem.eventCode}: Timeout at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+            except requests.exceptions.ConnectionError:
+                # Handle any other generic connection error
+                print(f"{scoringSystem.eventCode}: ConnectionError at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+            except Exception as x:
+                # Anything else (an error page instead of JSON, odd data, a full disk) ... say so and keep the old files
+                #   until the next try works, rather than quietly ending this division's loop
+                print(f"{scoringSystem.eventCode}: {type(x).__name__} at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S")+f": {x}")
+                traceback.print_exc()
+
+            if self.metricsLog is not None:
+                self.metricsLog.write(scoringSystem.getRefreshMetrics())
+
+            time.sleep(self.secBetweenUpdates)
+
+    # Write the JSON and HTML for one division
+    def publish(self, scoringSystem: ExternalScoring):
+
+        snapshot = scoringSystem.getSnapshot()
+        snapshot['published'] = datetime.now().isoformat(timespec='seconds')
+        snapshot['teams'] = sorted(snapshot['teams'], key = lambda r: r["powerScore"], reverse=True)
+        snapshot['matches'] = sorted(snapshot['matches'], key = lambda r: r["matchid"])
+
+        self.writeFile(f"{scoringSystem.eventCode}.json", json.dumps(snapshot))
+        self.writeFile(f"{scoringSystem.eventCode}.html", self.formatDivisionPage(snapshot))
+
+    def writeIndex(self):
+
+        links = ""
+        for scoringSystem in self.scoringSystems:
+            links += f'<li><a href="{html.escape(scoringSystem.eventCode)}.html">{html.escape(scoringSystem.event["name"])}</a></li>\n'
+
+        page = self.formatPage("PowerScore", f"<h1>PowerScore</h1>\n<ul>\n{links}</ul>\n", reload = False)
+        self.writeFile("index.html", page)
+
+    # Write to a temp file in the same directory, then rename it into place (rename is atomic on the same filesystem)
+    def writeFile(self, fileName, text):
+
+        fd, tempPath = tempfile.mkstemp(dir=self.outputDir, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.chmod(tempPath, 0o644)
+            os.replace(tempPath, os.path.join(self.outputDir, fileName))
+        except Exception:
+            os.unlink(tempPath)
+            raise
+
+    def formatPage(self, title, body, reload = True):
+
+        refresh = ""
+        if reload:
+            refresh = f'<meta http-equiv="refresh" content="{self.secBetweenPageReloads}">\n'
+
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n" + refresh +
+            f"<title>{html.escape(title)}</title>\n"
+            "<style>\n"
+            "body { background: #000; color: #ddd; font-family: monospace; }\n"
+            "h1, h2 { color: #adff00; }\n"
+            "a { color: #adff00; }\n"
+            "table { border-collapse: collapse; }\n"
+            "th, td { padding: 2px 8px; text-align: right; }\n"
+            "th { border-bottom: 1px solid #adff00; }\n"
+            "td.text, th.text { text-align: left; }\n"
+            "</style>\n</head>\n<body>\n" + body + "</body>\n</html>\n"
+        )
+
+    def formatDivisionPage(self, snapshot):
+
+        name = snapshot['event']['name']
+
+        body = f"<h1>{html.escape(name)}</h1>\n"
+        body += f"<p>Last Update: {html.escape(snapshot['published'])}</p>\n"
+
+        # the PowerScore table, same columns as PSScoresPanel
+        body += "<h2>PowerScore</h2>\n<table>\n<tr>"
+        body += '<th>Team</th><th class="text">Name</th><th class="text">City</th><th class="text">State/Prov</th><th class="text">Country</th>'
+        body += "<th>Overall</th><th>Auto</th><th>Teleop</th><th>Endgame</th><th>Ox/Ax/Tx/Ex</th>"
+        body += "<th>Rank</th><th>RP</th><th>TBP</th><th>Highest</th><th>Matches</th></tr>\n"
+
+        for team in snapshot['teams']:
+            body += "<tr>"
+            body += f"<td>{team['number']}</td>"
+            body += f'<td class="text">{html.escape(team["name"])}</td>'
+            body += f'<td class="text">{html.escape(team["city"] or "")}</td>'
+            body += f'<td class="text">{html.escape(team["state"] or "")}</td>'
+            body += f'<td class="text">{html.escape(team["country"] or "")}</td>'
+            body += "<td>{:.2f}</td><td>{:.2f}</td><td>{:.2f}</td><td>{:.2f}</td>".format(team["powerScore"],team["autoPowerScore"],team["telePowerScore"],team["endgPowerScore"])
+            body += "<td>{:d}/{:d}/{:d}/{:d}</td>".format(team["overallX"],team["autoX"],team["teleX"],team["endgX"])
+            body += "<td>{}</td><td>{:.2f}</td><td>{:.2f}</td><td>{:d}</td><td>{}</td>".format(team["rank"],team["rp"],team["tbp"],int(team["highest"]),team["real_matches"])
+            body += "</tr>\n"
+
+        body += "</table>\n"
+
+        # and the match schedule
+        body += "<h2>Qualification Matches</h2>\n<table>\n<tr>"
+        body += '<th>M</th><th class="text">Red Alliance</th><th class="text">Blue Alliance</th><th>Score</th></tr>\n'
+
+        for match in snapshot['matches']:
+            red = match['alliances']['red']
+            blue = match['alliances']['blue']
+
+            score = ""
+            if match['played']:
+                score = "{:d} - {:d}".format(red['total'], blue['total'])
+
+            body += "<tr>"
+            body += f"<td>{match['matchid']}</td>"
+            body += f'<td class="text">{red["team1"]} {red["team2"]}</td>'
+            body += f'<td class="text">{blue["team1"]} {blue["team2"]}</td>'
+            body += f"<td>{score}</td>"
+            body += "</tr>\n"
+
+        body += "</table>\n"
+
+        return self.formatPage(name, body)
@@ -0,0 +1,187 @@
+#
+# SeasonBackfill
+#
+# Downloads every event of a season into the SeasonStore, for scouting before a championship.
+#
+# The season's event list comes from the FTC API, then each event's schedule, scores, rankings, and teams are fetched
+#   (and PowerScores calculated) just like a normal refresh, with at most maxConcurrent events in flight at once.
+#
+# Only the season's competition events are fetched (see competitionEventTypes) - not scrimmages, off-season events,
+#   kickoffs and workshops - unless allEvents is set.
+#
+# Progress is checkpointed in the store as each event finishes, so an interrupted backfill (ctrl-c, a network outage,
+#   a reboot) picks up where it stopped: events already done are skipped, and failed ones are tried again.  An event
+#   is only done once it's over.  One that hasn't happened yet (or is still going) is saved as far as it has got but
+#   left pending, so every run fetches it again until it's finished.
+#
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+import threading
+import time
+import traceback
+import requests
+from ExternalScoring import ExternalScoring
+from MetricsLog import MetricsLog
+from SeasonStore import SeasonStore
+
+# network trouble on one event is retried this many times, waiting a little longer each time
+retriesPerEvent = 3
+secBetweenRetries = 10
+
+# the kinds of event (the API's typeName) that count for scouting: every event where the season's matches are played
+competitionEventTypes = ('League Meet', 'Qualifier', 'League Tournament', 'Super Qualifier', 'Championship',
+                         'FIRST Championship', 'Premier Event')
+
+
+class SeasonBackfill:
+
+    # Constructor
+    def __init__(self, season, auth, seasonStore: SeasonStore, maxConcurrent = 4, metricsLog: MetricsLog = None, allEvents = False):
+        self.season = season
+        self.auth = auth
+        self.seasonStore = seasonStore
+        self.maxConcurrent = maxConcurrent
+        self.metricsLog = metricsLog
+        self.allEvents = allEvents
+        self.requestURI = "http://ftc-api.firstinspires.org/v2.0/"
+
+        # progress, updated from the worker threads
+        self.lock = threading.Lock()
+        self.doneCount = 0
+        self.failedCount = 0
+        self.pendingCount = 0
+        self.bytesReceived = 0
+
+    # Every event in the season, as the API lists them (competition events only, unless allEvents)
+    def getSeasonEvents(self):
+
+        r=requests.get(self.requestURI+self.season+'/events', headers={'Content-Type': 'application/json', 'X-Application-Origin': 'PowerScore', 'Authorization': 'Basic '+self.auth},  timeout=60)
+
+        if r.status_code!=200:
+            raise requests.exceptions.ConnectionError(f"Could not list the events for {self.season}.  Request returned {r.status_code}")
+
+        events = r.json()['events']
+        if self.allEvents:
+            return events
+        # (an event without a typeName is kept ... there's no telling what it is)
+        return [event for event in events if event.get('typeName') is None or event['typeName'] in competitionEventTypes]
+
+    # Backfill the whole season.  Returns when every event has been tried (or on ctrl-c).
+    def run(self):
+
+        events = self.getSeasonEvents()
+
+        # resume: skip anything a previous run finished
+        statuses = self.seasonStore.getBackfillStatus(self.season)
+        todo = [event for event in events if statuses.get(event['code']) != 'done']
+
+        print(f"{self.season}: {len(events)} events, {len(events) - len(todo)} already done, {len(todo)} to fetch ({self.maxConcurrent} at a time)")
+        if len(todo) == 0:
+            return
+
+        self.startSec = time.time()
+        self.total = len(todo)
+
+        executor = ThreadPoolExecutor(max_workers=self.maxConcurrent)
+        try:
+            futures = [executor.submit(self.backfillEvent, event) for event in todo]
+            for future in as_completed(futures):
+                eventCode, error, over = future.result()
+                self.reportProgress(eventCode, error, over)
+
+        except KeyboardInterrupt:
+            print()
+            print("Stopped.  Run the same command again to pick up where this left off.")
+            executor.shutdown(wait=True, cancel_futures=True)
+            return
+
+        executor.shutdown()
+
+        elapsed = time.time() - self.startSec
+        print(f"{self.season}: {self.doneCount} events done, {self.pendingCount} not over yet, {self.failedCount} failed, in {timedelta(seconds=int(elapsed))}")
+        if self.failedCount > 0:
+            print("Run the same command again to retry the failed events.")
+        if self.pendingCount > 0:
+            print("Events that aren't over yet are fetched again every time it runs.")
+
+    # Is there nothing more to come for this event?  Its end date has gone by, or (if the API didn't give one) it has
+    #   matches scored.
+    def isEventOver(self, eventInfo, scoringSystem: ExternalScoring):
+        dateEnd = eventInfo.get('dateEnd')
+        if dateEnd:
+            try:
+                return datetime.fromisoformat(dateEnd).date() < date.today()
+            except ValueError:
+                pass
+        matches = scoringSystem.getMatches()
+        return any(matches[matchid]['played'] for matchid in matches)
+
+    # Fetch one event, save it, and checkpoint it.  Returns (eventCode, error message or "", whether it's over).  Runs
+    #   on a worker thread.
+    def backfillEvent(self, eventInfo):
+
+        eventCode = eventInfo['code']
+        scoringSystem = ExternalScoring(self.season, eventCode, self.auth)
+        scoringSystem.setEvent(eventInfo)
+        scoringSystem.setSeasonStore(self.seasonStore)
+
+        error = ""
+        for attempt in range(retriesPerEvent + 1):
+            try:
+                scoringSystem.updateTeamsMatches()
+                # (a refresh doesn't fail when only saving it does ... but here saving it is the whole point)
+                error = scoringSystem.getRefreshMetrics().get('storeError') or ""
+                break
+
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as x:
+                error = f"{type(x).__name__}: {x}"
+                if attempt < retriesPerEvent:
+                    time.sleep(secBetweenRetries * (attempt + 1))
+
+            except Exception as x:
+                # Bad or unexpected data for this event ... note it and move on to the others
+                error = f"{type(x).__name__}: {x}"
+                traceback.print_exc()
+                break
+
+        if self.metricsLog is not None:
+            self.metricsLog.write(scoringSystem.getRefreshMetrics())
+
+        receivedBytes = sum(request['bytes'] for request in scoringSystem.getRefreshMetrics().get('requests', []))
+
+        over = error == "" and self.isEventOver(eventInfo, scoringSystem)
+        if error != "":
+            self.seasonStore.setBackfillStatus(self.season, eventCode, 'failed', error)
+        elif over:
+            self.seasonStore.setBackfillStatus(self.season, eventCode, 'done')
+        else:
+            self.seasonStore.setBackfillStatus(self.season, eventCode, 'pending')
+
+        with self.lock:
+            self.bytesReceived = self.bytesReceived + receivedBytes
+            if error != "":
+                self.failedCount = self.failedCount + 1
+            elif over:
+                self.doneCount = self.doneCount + 1
+            else:
+                self.pendingCount = self.pendingCount + 1
+
+        return (eventCode, error, over)
+
+    # One line per finished event: how far along, how fast, and how long until it's done
+    def reportProgress(self, eventCode, error, over):
+
+        with self.lock:
+            finished = self.doneCount + self.failedCount + self.pendingCount
+            bytesReceived = self.bytesReceived
+
+        elapsed = max(time.time() - self.startSec, 0.001)
+        eventsPerMin = finished * 60 / elapsed
+        remaining = self.total - finished
+        eta = timedelta(seconds=int(remaining * elapsed / finished))
+
+        status = "done" if over else "saved, not over yet (will be fetched again)"
+        if error != "":
+            status = f"FAILED ({error})"
+        print(f"[{finished}/{self.total}] {eventCode} {status}   {eventsPerMin:.1f} events/min, {bytesReceived / elapsed / 1024:.0f} KB/s, ETA {eta}")
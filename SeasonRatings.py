@@ -0,0 +1,152 @@
+#
+# SeasonRatings
+#
+# One rating per team across a whole season of events in the SeasonStore, for scouting teams that have never met.
+#   A team's rating is what it adds to its alliance's score in a typical match (like OPR): the numbers that best fit
+#   every played alliance of the season, in the least squares sense, as rating(team1) + rating(team2) = score.  It's
+#   worked out for the overall score (less penalties, like PowerScore) and for auto, teleop, and endgame.
+#
+# A season is thousands of teams and tens of thousands of matches - far too many for the per-event calculation or a
+#   dense matrix.  But each alliance only involves two teams, so the normal equations are very sparse: for each team,
+#
+#   (matches + ridge) * rating(team)  +  the sum of rating(partner) over every match  =  the sum of its alliance scores
+#
+# These are solved with conjugate gradient, scaled by the diagonal (matches + ridge).  Only the partner lists and a
+#   handful of vectors are kept; every step is one pass over them.  A small ridge keeps teams that always play
+#   together (or barely played) from making the system singular.
+#
+# The ratings are saved in the store, and the next run starts from them (a warm start), so re-rating after a weekend
+#   of new events only takes a few steps.  Teams with no rating yet start at half their average alliance score.
+#
+
+import time
+from SeasonStore import SeasonStore
+
+# the four ratings worked out, the columns they're stored in, and how each comes from an alliance row of
+#   SeasonStore.getSeasonAlliances: (team1, team2, total, pen, auto, teleop, endg)
+ratingKeys = ('rating', 'autoRating', 'teleRating', 'endgRating')
+scoreFns = (lambda row: row[2] - (row[3] or 0),
+            lambda row: row[4] or 0,
+            lambda row: row[5] or 0,
+            lambda row: row[6] or 0)
+
+# pulls each rating a little toward zero (in matches' worth), so the system always has a single answer
+ridge = .01
+
+# stop once the residual is this small compared to the right hand side, or after this many steps
+tolerance = 1e-6
+maxIterations = 500
+
+
+class SeasonRatings:
+
+    # Constructor
+    def __init__(self, seasonStore: SeasonStore, season):
+        self.seasonStore = seasonStore
+        self.season = str(season)
+
+        # what the last solve did (see getSummary)
+        self.summary = {}
+
+    # Rate every team from every played match in the store, and save the ratings.  Returns the summary.
+    def solve(self):
+
+        startSec = time.perf_counter()
+
+        alliances = self.seasonStore.getSeasonAlliances(self.season)
+        previous = self.seasonStore.getRatings(self.season)
+
+        # (an alliance with the same team twice is bad data, not a match)
+        alliances = [row for row in alliances if row[0] != row[1]]
+
+        teamNums = sorted(set(row[0] for row in alliances) | set(row[1] for row in alliances))
+        teamIndex = {teamNum: i for i, teamNum in enumerate(teamNums)}
+        n = len(teamNums)
+
+        # The sparse structure: each team's partners, once per match together, and its number of matches
+        partners = [[] for i in range(n)]
+        for row in alliances:
+            i1 = teamIndex[row[0]]
+            i2 = teamIndex[row[1]]
+            partners[i1].append(i2)
+            partners[i2].append(i1)
+        partners = [tuple(p) for p in partners]
+        matches = [len(p) for p in partners]
+        diagonal = [count + ridge for count in matches]
+
+        loadSec = time.perf_counter() - startSec
+
+        solution = []
+        iterations = []
+        for key, scoreFn in zip(ratingKeys, scoreFns):
+
+            # right hand side: the sum of each team's alliance scores
+            rhs = [0.] * n
+            for row in alliances:
+                score = scoreFn(row)
+                rhs[teamIndex[row[0]]] += score
+                rhs[teamIndex[row[1]]] += score
+
+            x = []
+            for i in range(n):
+                if teamNums[i] in previous and previous[teamNums[i]][key] is not None:
+                    x.append(previous[teamNums[i]][key])
+                else:
+                    x.append(rhs[i] / (2 * matches[i]))
+
+            x, steps = self.__conjugateGradient(partners, diagonal, rhs, x)
+            solution.append(x)
+            iterations.append(steps)
+
+        ratings = [(teamNums[i], solution[0][i], solution[1][i], solution[2][i], solution[3][i], matches[i]) for i in range(n)]
+        self.seasonStore.saveRatings(self.season, ratings)
+
+        self.summary = {
+            'season': self.season,
+            'teams': n,
+            'alliances': len(alliances),
+            'warmStart': len(previous) > 0,
+            'iterations': dict(zip(ratingKeys, iterations)),
+            'loadSec': loadSec,
+            'totalSec': time.perf_counter() - startSec,
+        }
+        return self.summary
+
+    def getSummary(self):
+        return self.summary
+
+    # The normal matrix times v: each team's (matches + ridge) * v, plus v of each partner
+    @staticmethod
+    def __multiply(partners, diagonal, v):
+        get = v.__getitem__
+        return [d * vi + sum(map(get, p)) for d, vi, p in zip(diagonal, v, partners)]
+
+    # Jacobi-preconditioned conjugate gradient, starting from x.  Returns (x, steps taken).
+    def __conjugateGradient(self, partners, diagonal, rhs, x):
+
+        rhsNorm = sum(b * b for b in rhs) ** .5
+        if rhsNorm == 0:
+            return ([0.] * len(rhs), 0)
+
+        r = [b - ax for b, ax in zip(rhs, self.__multiply(partners, diagonal, x))]
+        z = [ri / d for ri, d in zip(r, diagonal)]
+        p = list(z)
+        rz = sum(ri * zi for ri, zi in zip(r, z))
+
+        steps = 0
+        while steps < maxIterations and sum(ri * ri for ri in r) ** .5 > tolerance * rhsNorm:
+
+            ap = self.__multiply(partners, diagonal, p)
+            alpha = rz / sum(pi * api for pi, api in zip(p, ap))
+            x = [xi + alpha * pi for xi, pi in zip(x, p)]
+            r = [ri - alpha * api for ri, api in zip(r, ap)]
+
+            z = [ri / d for ri, d in zip(r, diagonal)]
+            rzNext = sum(ri * zi for ri, zi in zip(r, z))
+            beta = rzNext / rz
+            rz = rzNext
+            p = [zi + beta * pi for zi, pi in zip(z, p)]
+
+            steps = steps + 1
+
+        return (x, steps)
@@ -0,0 +1,295 @@
+#
+# SeasonStore
+#
+# Keeps everything we've downloaded (events, teams, matches, and each alliance's scores) in a local SQLite file, so it
+#   outlives the program and a team can be followed from event to event through a season.
+#
+# Each refresh of an event is written as one batch, in one transaction.  Rows are upserted, so writing the same event
+#   over and over just keeps it current.
+#
+# Tables:
+#   events       season, eventCode, name, divisionCode, and the day it ends (dateEnd, as the API gives it)
+#   eventTeams   a team at an event: name and location, ranking, and PowerScores as of the last refresh
+#   alliances    one row per alliance per match: the two teams and the scores (total, auto, teleop, endgame, penalty)
+#   backfill     how far a season backfill has got (see SeasonBackfill): 'done', 'pending', or 'failed' for each event
+#   ratings      each team's rating over the whole season (see SeasonRatings), overall and auto/teleop/endgame
+#
+# The alliances table has an index on each team column, so "every match team N played this season" is a couple of
+#   index lookups rather than a scan of the whole season.
+#
+
+import sqlite3
+import threading
+import time
+from ExternalScoring import ExternalScoring
+
+
+class SeasonStore:
+
+    # Constructor
+    def __init__(self, path):
+        self.path = path
+
+        # refreshes can finish on several threads at once (publish and server modes, the combined leaderboard)
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+
+        # WAL lets the display read while a refresh is being written
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+
+        self.__createTables()
+
+    def __createTables(self):
+        with self.lock, self.db:
+            self.db.executescript('''
+                CREATE TABLE IF NOT EXISTS events (
+                    season TEXT NOT NULL,
+                    eventCode TEXT NOT NULL,
+                    name TEXT,
+                    divisionCode TEXT,
+                    updated REAL,
+                    dateEnd TEXT,
+                    PRIMARY KEY (season, eventCode)
+                );
+
+                CREATE TABLE IF NOT EXISTS eventTeams (
+                    season TEXT NOT NULL,
+                    eventCode TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    name TEXT,
+                    city TEXT,
+                    state TEXT,
+                    country TEXT,
+                    rank INTEGER,
+                    rp REAL,
+                    tbp REAL,
+                    highest REAL,
+                    matches INTEGER,
+                    powerScore REAL,
+                    autoPowerScore REAL,
+                    telePowerScore REAL,
+                    endgPowerScore REAL,
+                    overallX INTEGER,
+                    autoX INTEGER,
+                    teleX INTEGER,
+                    endgX INTEGER,
+                    PRIMARY KEY (season, eventCode, number)
+                );
+                CREATE INDEX IF NOT EXISTS eventTeamsNumber ON eventTeams (season, number);
+
+                CREATE TABLE IF NOT EXISTS alliances (
+                    season TEXT NOT NULL,
+                    eventCode TEXT NOT NULL,
+                    matchid INTEGER NOT NULL,
+                    alliance TEXT NOT NULL,
+                    team1 INTEGER,
+                    team2 INTEGER,
+                    played INTEGER,
+                    total INTEGER,
+                    auto INTEGER,
+                    teleop INTEGER,
+                    endg INTEGER,
+                    pen INTEGER,
+                    PRIMARY KEY (season, eventCode, matchid, alliance)
+                );
+                CREATE INDEX IF NOT EXISTS alliancesTeam1 ON alliances (season, team1);
+                CREATE INDEX IF NOT EXISTS alliancesTeam2 ON alliances (season, team2);
+
+                CREATE TABLE IF NOT EXISTS ratings (
+                    season TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    rating REAL,
+                    autoRating REAL,
+                    teleRating REAL,
+                    endgRating REAL,
+                    matches INTEGER,
+                    updated REAL,
+                    PRIMARY KEY (season, number)
+                );
+
+                CREATE TABLE IF NOT EXISTS backfill (
+                    season TEXT NOT NULL,
+                    eventCode TEXT NOT NULL,
+                    status TEXT,
+                    error TEXT,
+                    finished REAL,
+                    PRIMARY KEY (season, eventCode)
+                );
+            ''')
+
+            # (stores made before the event dates were kept get the column added)
+            columns = [row['name'] for row in self.db.execute("PRAGMA table_info(events)")]
+            if 'dateEnd' not in columns:
+                self.db.execute("ALTER TABLE events ADD COLUMN dateEnd TEXT")
+
+    # Write everything from an event's latest refresh, in one transaction
+    def saveEvent(self, scoringSystem: ExternalScoring):
+
+        season = str(scoringSystem.season)
+        eventCode = scoringSystem.eventCode
+        event = scoringSystem.getEvent()
+        teams = scoringSystem.getTeams()
+        matches = scoringSystem.getMatches()
+
+        # build all the rows first, so the lock is only held for the writing
+        teamRows = []
+        for teamNum in teams:
+            team = teams[teamNum]
+            teamRows.append((season, eventCode, teamNum, team['name'], team['city'], team['state'], team['country'],
+                team['rank'], team['rp'], team['tbp'], team['highest'], team['matches'],
+                team['powerScore'], team['autoPowerScore'], team['telePowerScore'], team['endgPowerScore'],
+                team['overallX'], team['autoX'], team['teleX'], team['endgX']))
+
+        allianceRows = []
+        for matchid in matches:
+            match = matches[matchid]
+            for color in ('red', 'blue'):
+                alliance = match['alliances'][color]
+                allianceRows.append((season, eventCode, matchid, color, alliance['team1'], alliance['team2'],
+                    int(match['played']), alliance.get('total'), alliance.get('auto'), alliance.get('teleop'),
+                    alliance.get('endg'), alliance.get('pen')))
+
+        with self.lock, self.db:
+            self.db.execute('''
+                INSERT INTO events (season, eventCode, name, divisionCode, updated, dateEnd) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (season, eventCode) DO UPDATE SET
+                    name=excluded.name, divisionCode=excluded.divisionCode, updated=excluded.updated,
+                    dateEnd=excluded.dateEnd
+            ''', (season, eventCode, event['name'], event.get('divisionCode'), time.time(), event.get('dateEnd')))
+
+            self.db.executemany('''
+                INSERT INTO eventTeams VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (season, eventCode, number) DO UPDATE SET
+                    name=excluded.name, city=excluded.city, state=excluded.state, country=excluded.country,
+                    rank=excluded.rank, rp=excluded.rp, tbp=excluded.tbp, highest=excluded.highest,
+                    matches=excluded.matches, powerScore=excluded.powerScore, autoPowerScore=excluded.autoPowerScore,
+                    telePowerScore=excluded.telePowerScore, endgPowerScore=excluded.endgPowerScore,
+                    overallX=excluded.overallX, autoX=excluded.autoX, teleX=excluded.teleX, endgX=excluded.endgX
+            ''', teamRows)
+
+            self.db.executemany('''
+                INSERT INTO alliances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (season, eventCode, matchid, alliance) DO UPDATE SET
+                    team1=excluded.team1, team2=excluded.team2, played=excluded.played, total=excluded.total,
+                    auto=excluded.auto, teleop=excluded.teleop, endg=excluded.endg, pen=excluded.pen
+            ''', allianceRows)
+
+    # Every match team teamNum is in this season, in event then match order.  Each is a dict: eventCode, eventName,
+    #   matchid, played, alliance ('red' or 'blue'), partner, opponent1, opponent2, and the scores for the team's
+    #   alliance (score, auto, teleop, endg) and the other one (opponentScore).
+    def getTeamMatches(self, season, teamNum):
+
+        # one index lookup per team column, then the other alliance in the same match by primary key
+        query = '''
+            SELECT a.eventCode, e.name AS eventName, a.matchid, a.played, a.alliance,
+                CASE WHEN a.team1 = :team THEN a.team2 ELSE a.team1 END AS partner,
+                o.team1 AS opponent1, o.team2 AS opponent2,
+                a.total AS score, a.auto, a.teleop, a.endg, o.total AS opponentScore
+            FROM (
+                SELECT * FROM alliances WHERE season = :season AND team1 = :team
+                UNION ALL
+                SELECT * FROM alliances WHERE season = :season AND team2 = :team AND team1 != :team
+            ) a
+            JOIN alliances o ON o.season = a.season AND o.eventCode = a.eventCode AND o.matchid = a.matchid AND o.alliance != a.alliance
+            LEFT JOIN events e ON e.season = a.season AND e.eventCode = a.eventCode
+            ORDER BY a.eventCode, a.matchid
+        '''
+
+        with self.lock:
+            rows = self.db.execute(query, {'season': str(season), 'team': teamNum}).fetchall()
+        return [dict(row) for row in rows]
+
+    # A team at every event it has been to this season: ranking and PowerScores, as dicts
+    def getTeamEvents(self, season, teamNum):
+        query = '''
+            SELECT t.*, e.name AS eventName FROM eventTeams t
+            LEFT JOIN events e ON e.season = t.season AND e.eventCode = t.eventCode
+            WHERE t.season = ? AND t.number = ?
+            ORDER BY t.eventCode
+        '''
+        with self.lock:
+            rows = self.db.execute(query, (str(season), teamNum)).fetchall()
+        return [dict(row) for row in rows]
+
+    # Everything stored for one event, for replaying it (see ReplayScoring).  The event (or None if it isn't stored),
+    #   its teams, and its alliances in match order, all as dicts.
+    def getEventArchive(self, season, eventCode):
+        with self.lock:
+            event = self.db.execute("SELECT * FROM events WHERE season = ? AND eventCode = ?", (str(season), eventCode)).fetchone()
+            teams = self.db.execute("SELECT * FROM eventTeams WHERE season = ? AND eventCode = ? ORDER BY number", (str(season), eventCode)).fetchall()
+            alliances = self.db.execute("SELECT * FROM alliances WHERE season = ? AND eventCode = ? ORDER BY matchid, alliance", (str(season), eventCode)).fetchall()
+        if event is None:
+            return (None, [], [])
+        return (dict(event), [dict(row) for row in teams], [dict(row) for row in alliances])
+
+    # All the events stored for a season, as dicts
+    def getEvents(self, season):
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM events WHERE season = ? ORDER BY eventCode", (str(season),)).fetchall()
+        return [dict(row) for row in rows]
+
+    # Every played alliance of the season, for SeasonRatings.  Plain tuples rather than dicts (there can be a hundred
+    #   thousand of them): (team1, team2, total, pen, auto, teleop, endg).
+    def getSeasonAlliances(self, season):
+        query = '''
+            SELECT team1, team2, total, pen, auto, teleop, endg FROM alliances
+            WHERE season = ? AND played = 1 AND team1 IS NOT NULL AND team2 IS NOT NULL AND total IS NOT NULL
+        '''
+        with self.lock:
+            rows = self.db.execute(query, (str(season),)).fetchall()
+        return [tuple(row) for row in rows]
+
+    # Season ratings (see SeasonRatings): replace them all with the latest, a list of (number, rating, autoRating,
+    #   teleRating, endgRating, matches)
+    def saveRatings(self, season, ratings):
+        updated = time.time()
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM ratings WHERE season = ?", (str(season),))
+            self.db.executemany("INSERT INTO ratings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(str(season),) + tuple(rating) + (updated,) for rating in ratings])
+
+    # Every team's season rating, as dicts by team number
+    def getRatings(self, season):
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM ratings WHERE season = ?", (str(season),)).fetchall()
+        return {row['number']: dict(row) for row in rows}
+
+    # One team's season rating as a dict, or None if it doesn't have one
+    def getTeamRating(self, season, teamNum):
+        with self.lock:
+            row = self.db.execute("SELECT * FROM ratings WHERE season = ? AND number = ?", (str(season), teamNum)).fetchone()
+        return dict(row) if row is not None else None
+
+    # The count best teams (of those with at least minMatches) by overall season rating, with the name each had at its
+    #   latest event (by end date; events saved before dates were kept come last)
+    def getTopRatings(self, season, count, minMatches = 0):
+        query = '''
+            SELECT r.*, (SELECT t.name FROM eventTeams t JOIN events e ON e.season = t.season AND e.eventCode = t.eventCode
+                         WHERE t.season = r.season AND t.number = r.number
+                         ORDER BY e.dateEnd DESC, t.eventCode DESC LIMIT 1) AS name
+            FROM ratings r WHERE r.season = ? AND r.matches >= ? ORDER BY r.rating DESC LIMIT ?
+        '''
+        with self.lock:
+            rows = self.db.execute(query, (str(season), minMatches, count)).fetchall()
+        return [dict(row) for row in rows]
+
+    # Backfill checkpoints: record how an event went, and get the status of every event tried so far this season
+    def setBackfillStatus(self, season, eventCode, status, error = ""):
+        with self.lock, self.db:
+            self.db.execute('''
+                INSERT INTO backfill (season, eventCode, status, error, finished) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (season, eventCode) DO UPDATE SET
+                    status=excluded.status, error=excluded.error, finished=excluded.finished
+            ''', (str(season), eventCode, status, error, time.time()))
+
+    def getBackfillStatus(self, season):
+        with self.lock:
+            rows = self.db.execute("SELECT eventCode, status FROM backfill WHERE season = ?", (str(season),)).fetchall()
+        return {row['eventCode']: row['status'] for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,78 @@
+#
+# SharedScoring
+#
+# The other end of a SharedSnapshot.  A display process started with --use-shared gets each division's finished snapshot
+#   from the process that was started with --share on the same machine, instead of from the FTC API.  Like
+#   RemoteScoring, the panels can't tell the difference.
+#
+# Checking for new data is just looking at the snapshot's sequence number in the mapped file, so waitForChange polls it
+#   often; the snapshot is only decoded when the number has changed.
+#
+
+import time
+import requests
+from ExternalScoring import ExternalScoring
+from SharedSnapshot import SharedSnapshotReader, getSharedSnapshotPath
+from StageTimes import StageTimer
+
+# how often waitForChange looks at the sequence number, and how long it waits in all before giving up for now
+secBetweenSequenceChecks = .25
+secPerWait = 25
+
+
+class SharedScoring(ExternalScoring):
+
+    # Constructor
+    def __init__(self, season, eventCode):
+        super().__init__(season, eventCode, "")
+
+        self.reader = SharedSnapshotReader(getSharedSnapshotPath(season, eventCode))
+        self.sequence = 0
+
+        # the sequence number tells us when there's new data (see waitForChange)
+        self.pushUpdates = True
+
+    # get event info from the snapshot
+    def updateEvent(self):
+
+        sequence, snapshot = self.reader.read()
+        if snapshot is None:
+            # nobody has shared this event yet ... same as the network not being up
+            raise requests.exceptions.ConnectionError(f"Nothing shared for {self.eventCode} yet.  Is the display with --share running?")
+
+        self.event = snapshot['event']
+        self.eventLoaded = True
+
+    # Get the latest snapshot.  PowerScores have already been calculated by the sharing process.
+    def updateTeamsMatches(self):
+
+        self.startRefresh()
+        try:
+            with StageTimer(self.stageTimes, "json"):
+                sequence, snapshot = self.reader.read()
+            if snapshot is None:
+                raise requests.exceptions.ConnectionError(f"Nothing shared for {self.eventCode} yet")
+        except Exception as x:
+            self.finishRefresh(x)
+            raise
+
+        self.useSnapshot(snapshot)
+        self.sequence = sequence
+
+        self.finishRefresh(None)
+        self.updateCount = self.updateCount + 1
+        self.updateChanges()
+        self.updateScoreStats()
+        self.saveToSeasonStore()
+
+    # Blocks until a newer snapshot has been shared, or secPerWait goes by.  Returns True if there's new data to get.
+    #   Meant to be run on a background thread.
+    def waitForChange(self):
+
+        endSec = time.time() + secPerWait
+        while time.time() < endSec:
+            # (not just greater than ... the sharing process may have started over)
+            if self.reader.getSequence() != self.sequence:
+                return True
+            time.sleep(secBetweenSequenceChecks)
+        return False
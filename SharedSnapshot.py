@@ -0,0 +1,201 @@
+#
+# SharedSnapshot
+#
+# Hands a division's snapshot (ExternalScoring.getSnapshot()) from one display process to others on the same machine,
+#   for a Pi driving two screens with one pitDisplay.py per screen.  One process fetches and calculates and writes the
+#   snapshot into a memory-mapped file; the others map the same file read-only and pick it up from there - no network,
+#   and nothing is decoded until the data has actually changed.
+#
+# The file lives in /dev/shm (memory, not the SD card) when there is one.  It's a fixed header and then the snapshot as
+#   JSON:
+#
+#   magic      8 bytes  b"PSSNAP1\0"
+#   sequence   uint64   odd while a write is under way, even otherwise.  Goes up by 2 for every new snapshot.
+#   length     uint64   bytes of JSON
+#   capacity   uint64   room for JSON after the header
+#   moved      uint64   1 once the writer has moved to a bigger file (readers map the new one)
+#   crc        uint32   CRC-32 of the JSON
+#
+# This is a seqlock: a reader notes the sequence, copies the JSON, and checks that the sequence hasn't changed (and the
+#   CRC matches) - if it has, the writer was in the middle of a write, so it just tries again.  Readers never block the
+#   writer.  Checking for new data is reading 8 bytes of the mapping.
+#
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+magic = b"PSSNAP1\0"
+header = struct.Struct("<8sQQQQI")
+headerSize = 64
+
+# the smallest file made, and how much room to leave for the snapshot to grow as the event goes on
+minCapacity = 1024 * 1024
+growthFactor = 2
+
+# a reader gives up on a read that keeps getting interrupted by writes after this many tries (and tries again later)
+readAttempts = 100
+
+
+class SharedSnapshotException(Exception):
+
+    def __init__(self, message):
+        self.message = f"{message}"
+        super().__init__(self.message)
+
+
+# Where a division's snapshot is kept
+def getSharedSnapshotPath(season, eventCode):
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"powerscore-{season}-{eventCode}.snapshot")
+
+
+class SharedSnapshotWriter:
+
+    # Constructor
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.map = None
+
+        # Carry on with a file left by an earlier run (a restarted publisher), so readers that already have it mapped
+        #   keep working
+        try:
+            self.file = open(path, "r+b")
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            fileMagic, sequence, length, capacity, moved, crc = header.unpack_from(self.map, 0)
+            if fileMagic != magic or moved != 0 or len(self.map) != headerSize + capacity:
+                self.__close()
+        except (OSError, ValueError, struct.error):
+            self.__close()
+
+        if self.map is None:
+            self.__create(minCapacity, 0)
+
+    def __close(self):
+        if self.map is not None:
+            self.map.close()
+        if self.file is not None:
+            self.file.close()
+        self.map = None
+        self.file = None
+
+    # A new, empty file at path with room for capacity bytes, swapped in all at once
+    def __create(self, capacity, sequence):
+
+        newPath = self.path + ".new"
+        with open(newPath, "wb") as f:
+            f.truncate(headerSize + capacity)
+        os.chmod(newPath, 0o644)
+
+        newFile = open(newPath, "r+b")
+        newMap = mmap.mmap(newFile.fileno(), 0)
+        header.pack_into(newMap, 0, magic, sequence, 0, capacity, 0, 0)
+        os.replace(newPath, self.path)
+
+        # anybody still on the old file moves over to the new one
+        if self.map is not None:
+            struct.pack_into("<Q", self.map, 32, 1)
+        self.__close()
+
+        self.file = newFile
+        self.map = newMap
+
+    # Publish a snapshot (a dict, from ExternalScoring.getSnapshot)
+    def write(self, snapshot):
+
+        data = json.dumps(snapshot).encode("utf-8")
+
+        with self.lock:
+            fileMagic, sequence, length, capacity, moved, crc = header.unpack_from(self.map, 0)
+
+            # (a writer that died half way through leaves it odd)
+            sequence = sequence | 1
+
+            if len(data) > capacity:
+                # (the new file starts out odd too, so nobody reads it before it has something in it)
+                capacity = max(minCapacity, growthFactor * len(data))
+                self.__create(capacity, sequence)
+
+            # odd: readers will know not to trust what they copy
+            struct.pack_into("<Q", self.map, 8, sequence)
+            self.map[headerSize:headerSize + len(data)] = data
+            header.pack_into(self.map, 0, magic, sequence, len(data), capacity, 0, zlib.crc32(data))
+            # even again: done
+            struct.pack_into("<Q", self.map, 8, sequence + 1)
+
+    def close(self):
+        with self.lock:
+            self.__close()
+
+
+class SharedSnapshotReader:
+
+    # Constructor
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.map = None
+
+    # Map the file, if there is one yet.  Returns False if there isn't.
+    def __open(self):
+
+        if self.map is not None:
+            # the writer moved to a bigger file
+            if struct.unpack_from("<Q", self.map, 32)[0] == 0:
+                return True
+            self.close()
+
+        try:
+            self.file = open(self.path, "rb")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.close()
+            return False
+
+        if len(self.map) < headerSize or self.map[0:8] != magic:
+            self.close()
+            return False
+        return True
+
+    # The sequence number of the snapshot that's there now (0 if there's nothing yet).  Cheap enough to call all the time.
+    def getSequence(self):
+        if not self.__open():
+            return 0
+        return struct.unpack_from("<Q", self.map, 8)[0] & ~1
+
+    # The snapshot that's there now, as (sequence, dict), or (0, None) if nothing has been written yet
+    def read(self):
+
+        if not self.__open():
+            return (0, None)
+
+        for attempt in range(readAttempts):
+            fileMagic, sequence, length, capacity, moved, crc = header.unpack_from(self.map, 0)
+            if sequence == 0:
+                return (0, None)
+            if sequence & 1 == 0 and moved == 0:
+                data = self.map[headerSize:headerSize + length]
+                if struct.unpack_from("<Q", self.map, 8)[0] == sequence and zlib.crc32(data) == crc:
+                    return (sequence, json.loads(data))
+            if moved != 0 and not self.__open():
+                # the writer moved on, but the new file isn't there (yet) ... nothing to read for now
+                return (0, None)
+            # the writer is at it ... give it a moment
+            time.sleep(.001)
+
+        raise SharedSnapshotException(f"{self.path} kept changing while it was being read")
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        if self.file is not None:
+            self.file.close()
+        self.map = None
+        self.file = None
@@ -0,0 +1,190 @@
+#
+# SnapshotServer
+#
+# Server mode.  One process owns the ExternalScoring objects, polls the FTC API, and calculates PowerScores.  Any number of
+#   pit displays (see RemoteScoring) get the results from it over HTTP, so the load on the FTC API doesn't grow with the
+#   number of screens.
+#
+# Each division has a version number that only goes up when its data actually changes.  The JSON for the current version
+#   is built once and handed to every client as-is.
+#
+#   GET /events                         the divisions being served: [{eventCode, name, version}]
+#   GET /event/<eventCode>              season and event info for one division
+#   GET /snapshot/<eventCode>           the current snapshot (ExternalScoring.getSnapshot() plus "version")
+#   GET /version/<eventCode>?since=N    long poll: returns {"version": ...} as soon as the version is newer than N, or
+#                                       after longPollSec with the same version if nothing changed
+#
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import traceback
+from urllib.parse import urlparse, parse_qs
+import requests
+from ExternalScoring import ExternalScoring
+from MetricsLog import MetricsLog
+
+longPollSec = 25
+
+
+class SnapshotServer:
+
+    # Constructor
+    def __init__(self, port, scoringSystems: list[ExternalScoring], secBetweenUpdates, metricsLog: MetricsLog = None):
+        self.port = port
+        self.scoringSystems = scoringSystems
+        self.secBetweenUpdates = secBetweenUpdates
+        self.metricsLog = metricsLog
+
+        # everything below is guarded by the condition's lock.  Waiting on it is how long polls wait for new data.
+        self.changed = threading.Condition()
+        self.versions = {}
+        self.snapshots = {}
+        for scoringSystem in scoringSystems:
+            self.versions[scoringSystem.eventCode] = 0
+            self.snapshots[scoringSystem.eventCode] = None
+
+    # Runs one refresh loop per division and serves HTTP, forever (or until ctrl-c)
+    def run(self):
+
+        for scoringSystem in self.scoringSystems:
+            thread = threading.Thread(target=self.__refreshLoop, args=(scoringSystem,), daemon=True)
+            thread.start()
+
+        server = ThreadingHTTPServer(("", self.port), self.__makeHandler())
+        server.daemon_threads = True
+        print(f"Serving PowerScore snapshots on port {self.port}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+        server.server_close()
+
+    def __refreshLoop(self, scoringSystem: ExternalScoring):
+
+        while 1:
+            try:
+                # Get the external data and calculate PowerScore
+                scoringSystem.updateTeamsMatches()
+                self.setSnapshot(scoringSystem)
+
+            except requests.exceptions.Timeout:
+                # Handle a timeout on the URL
+                print(f"{scoringSystem.eventCode}: Timeout at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+            except requests.exceptions.ConnectionError:
+                # Handle any other generic connection error
+                print(f"{scoringSystem.eventCode}: ConnectionError at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+            except Exception as x:
+                # If this thread ended, the division's version would never go up again and every display long polling
+                #   it would sit on old data without knowing.  The last good snapshot stays up while we try again.
+                print(f"{scoringSystem.eventCode}: {type(x).__name__} at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S")+f": {x}")
+                traceback.print_exc()
+
+            if self.metricsLog is not None:
+                self.metricsLog.write(scoringSystem.getRefreshMetrics())
+
+            time.sleep(self.secBetweenUpdates)
+
+    # Store a new snapshot for a division, and wake up anybody waiting on it - but only if something really changed
+    def setSnapshot(self, scoringSystem: ExternalScoring):
+
+        snapshot = scoringSystem.getSnapshot()
+
+        # updateCount goes up on every refresh, so leave it out when deciding whether anything changed
+        del snapshot['updateCount']
+        content = json.dumps(snapshot, sort_keys=True)
+
+        with self.changed:
+            current = self.snapshots[scoringSystem.eventCode]
+            if current is not None and current['content'] == content:
+                return
+
+            version = self.versions[scoringSystem.eventCode] + 1
+            snapshot['version'] = version
+
+            self.versions[scoringSystem.eventCode] = version
+            self.snapshots[scoringSystem.eventCode] = {
+                'content': content,
+                'body': json.dumps(snapshot).encode("utf-8"),
+            }
+            self.changed.notify_all()
+
+        print(f"{scoringSystem.eventCode}: version {version} at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+    # Wait until a division's version is newer than since (or the time runs out).  Returns the current version.
+    def waitForVersion(self, eventCode, since, timeoutSec):
+        with self.changed:
+            self.changed.wait_for(lambda: self.versions[eventCode] > since, timeout=timeoutSec)
+            return self.versions[eventCode]
+
+    def __makeHandler(self):
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p != ""]
+
+                if parts == ["events"]:
+                    events = []
+                    for scoringSystem in server.scoringSystems:
+                        events.append({'eventCode': scoringSystem.eventCode, 'name': scoringSystem.event['name'], 'version': server.versions[scoringSystem.eventCode]})
+                    self.sendJson(json.dumps(events).encode("utf-8"))
+                    return
+
+                if len(parts) != 2 or parts[1] not in server.versions:
+                    self.send_error(404)
+                    return
+
+                eventCode = parts[1]
+
+                if parts[0] == "event":
+                    for scoringSystem in server.scoringSystems:
+                        if scoringSystem.eventCode == eventCode:
+                            self.sendJson(json.dumps({'season': scoringSystem.season, 'eventCode': eventCode, 'event': scoringSystem.event}).encode("utf-8"))
+                    return
+
+                if parts[0] == "snapshot":
+                    # Before the first refresh finishes there's nothing to send, so wait for it
+                    server.waitForVersion(eventCode, 0, longPollSec)
+                    with server.changed:
+                        snapshot = server.snapshots[eventCode]
+                    if snapshot is None:
+                        self.send_error(503, "No data yet")
+                        return
+                    self.sendJson(snapshot['body'])
+                    return
+
+                if parts[0] == "version":
+                    try:
+                        since = int(parse_qs(url.query).get("since", ["0"])[0])
+                    except ValueError:
+                        self.send_error(400, "since must be a number")
+                        return
+                    version = server.waitForVersion(eventCode, since, longPollSec)
+                    self.sendJson(json.dumps({'version': version}).encode("utf-8"))
+                    return
+
+                self.send_error(404)
+
+            def sendJson(self, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # keep the console quiet ... one line per request from a dozen screens is a lot
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
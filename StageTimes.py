@@ -0,0 +1,81 @@
+#
+# StageTimes
+#
+# Keeps track of how long each stage of a refresh takes (network, JSON decode, PowerScore calculation, match predictions,
+#   schedule metrics, score statistics, drawing), so we can see where the time goes on a slow Raspberry Pi.  For each stage we keep the last time and a rolling average.
+#
+
+from collections import deque
+import time
+
+
+class StageTimes:
+
+    # The stages, in the order they happen during a refresh
+    stageNames = ["network", "json", "calc", "predict", "schedule", "stats", "draw"]
+
+    # Constructor
+    def __init__(self, historyLength = 20):
+        self.history = {}
+        for stage in self.stageNames:
+            self.history[stage] = deque(maxlen=historyLength)
+
+        # time spent so far in the refresh that is under way (a refresh makes several network requests)
+        self.pending = {}
+
+    # Add time to a stage of the refresh that is under way
+    def add(self, stage, seconds):
+        self.pending[stage] = self.pending.get(stage, 0.) + seconds
+
+    # The refresh is done ... its totals become the "last" time for each stage.  Returns those totals.
+    def finish(self):
+        totals = self.pending
+        for stage in totals:
+            self.history[stage].append(totals[stage])
+        self.pending = {}
+        return totals
+
+    # Record a stage that happens all at once (like drawing)
+    def record(self, stage, seconds):
+        self.history[stage].append(seconds)
+
+    def getLast(self, stage):
+        if len(self.history[stage]) == 0:
+            return None
+        return self.history[stage][-1]
+
+    def getAverage(self, stage):
+        if len(self.history[stage]) == 0:
+            return None
+        return sum(self.history[stage]) / len(self.history[stage])
+
+    # One line for the status bar, like "network 412ms (398)  json 12ms (9) ..."  The average is in the parentheses.
+    def format(self):
+        text = ""
+        for stage in self.stageNames:
+            last = self.getLast(stage)
+            if last is None:
+                continue
+            text += "{} {:.0f}ms ({:.0f})  ".format(stage, last * 1000, self.getAverage(stage) * 1000)
+        return text.strip()
+
+
+# Small helper so a stage can be timed with a "with" block
+class StageTimer:
+
+    def __init__(self, stageTimes: StageTimes, stage, record = False):
+        self.stageTimes = stageTimes
+        self.stage = stage
+        self.recordNow = record
+
+    def __enter__(self):
+        self.startSec = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.startSec
+        if self.recordNow:
+            self.stageTimes.record(self.stage, seconds)
+        else:
+            self.stageTimes.add(self.stage, seconds)
+        return False
@@ -0,0 +1,114 @@
+#
+# SyntheticScoring
+#
+# A made-up event, for benchmarking and trying out the display without an auth.key or a network.  Teams get a random
+#   (but repeatable, from the seed) strength in auto, teleop, and endgame, a schedule is drawn up, and the first
+#   playedFraction of it is scored from those strengths plus some noise.  Rankings come from the scored matches.
+#
+# Like ReplayScoring, only the fetch is replaced.  The PowerScore calculation, predictions, and drawing are the real code.
+#
+
+import random
+from ExternalScoring import ExternalScoring
+
+
+class SyntheticScoring(ExternalScoring):
+
+    # Constructor
+    def __init__(self, eventCode, teamCount = 40, playedFraction = .6, seed = 3409):
+        super().__init__("synthetic", eventCode, "")
+
+        self.teamCount = teamCount
+        self.playedFraction = playedFraction
+        self.seed = seed
+
+    # Nothing to fetch ... the name is made up too
+    def updateEvent(self):
+        self.setEvent({'name': f"Synthetic event {self.eventCode}", 'divisionCode': None})
+
+    # Stands in for the FTC API: builds the teams and matches from the seed
+    def updateTeamsMatchesFromFTC(self):
+
+        rnd = random.Random(f"{self.seed}/{self.eventCode}")
+
+        teamNumbers = sorted(rnd.sample(range(100, 30000), self.teamCount))
+        strengths = {}
+
+        teams = {}
+        for teamNum in teamNumbers:
+            team = {}
+            team['number'] = teamNum
+            team['name'] = f"Synthetic Robotics {teamNum}"
+            team['school'] = ''
+            team['city'] = rnd.choice(["Kansas City", "Overland Park", "Lawrence", "St. Louis", "Springfield", "Wichita"])
+            team['state'] = rnd.choice(["KS", "MO"])
+            team['country'] = "USA"
+            team['rank'] = 0
+            team['rp'] = 0.
+            team['tbp'] = 0.
+            team['highest'] = 0
+            team['matches'] = 0
+            team['real_matches'] = 0
+            for key in ('allianceScore', 'autoAllianceScore', 'teleAllianceScore', 'endgAllianceScore',
+                        'powerScore', 'autoPowerScore', 'telePowerScore', 'endgPowerScore',
+                        'overallX', 'autoX', 'teleX', 'endgX'):
+                team[key] = 0
+            teams[teamNum] = team
+
+            strengths[teamNum] = (rnd.uniform(5, 30), rnd.uniform(20, 90), rnd.uniform(5, 35))
+
+        # 5 matches a team, 4 teams a match
+        matchCount = self.teamCount * 5 // 4
+        playedCount = int(matchCount * self.playedFraction)
+
+        matches = {}
+        for matchid in range(1, matchCount + 1):
+            red1, red2, blue1, blue2 = rnd.sample(teamNumbers, 4)
+            match = {'matchid': matchid, 'played': matchid <= playedCount, 'alliances': {}}
+            match['alliances']['red'] = {'team1': red1, 'team2': red2}
+            match['alliances']['blue'] = {'team1': blue1, 'team2': blue2}
+
+            for color in ('red', 'blue'):
+                alliance = match['alliances'][color]
+                teams[alliance['team1']]['matches'] += 1
+                teams[alliance['team2']]['matches'] += 1
+
+                if match['played']:
+                    pair = (strengths[alliance['team1']], strengths[alliance['team2']])
+                    alliance['auto'] = int((pair[0][0] + pair[1][0]) * rnd.uniform(.7, 1.3))
+                    alliance['teleop'] = int((pair[0][1] + pair[1][1]) * rnd.uniform(.7, 1.3))
+                    alliance['endg'] = int((pair[0][2] + pair[1][2]) * rnd.uniform(.7, 1.3))
+                    alliance['pen'] = rnd.choice([0, 0, 0, 10])
+                    teams[alliance['team1']]['real_matches'] += 1
+                    teams[alliance['team2']]['real_matches'] += 1
+
+            if match['played']:
+                # penalties are points for the other alliance
+                red = match['alliances']['red']
+                blue = match['alliances']['blue']
+                red['total'] = red['auto'] + red['teleop'] + red['endg'] + blue['pen']
+                blue['total'] = blue['auto'] + blue['teleop'] + blue['endg'] + red['pen']
+
+                for color, other in (('red', 'blue'), ('blue', 'red')):
+                    alliance = match['alliances'][color]
+                    won = 2 if alliance['total'] > match['alliances'][other]['total'] else 0
+                    for teamNum in (alliance['team1'], alliance['team2']):
+                        teams[teamNum]['rp'] += won
+                        teams[teamNum]['tbp'] += match['alliances'][other]['total'] - match['alliances'][other]['pen']
+                        teams[teamNum]['highest'] = max(teams[teamNum]['highest'], alliance['total'])
+
+            matches[matchid] = match
+
+        # the API gives averages ... so do we
+        for teamNum in teams:
+            team = teams[teamNum]
+            if team['real_matches'] > 0:
+                team['rp'] = team['rp'] / team['real_matches']
+                team['tbp'] = team['tbp'] / team['real_matches']
+
+        ranked = sorted(teamNumbers, key = lambda teamNum: (-teams[teamNum]['rp'], -teams[teamNum]['tbp'], teamNum))
+        for rank, teamNum in enumerate(ranked):
+            teams[teamNum]['rank'] = rank + 1
+
+        self.teams = teams
+        self.matches = matches
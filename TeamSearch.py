@@ -0,0 +1,78 @@
+#
+# TeamSearch
+#
+# Type-ahead search for the scores table: finds the team whose number, or name, starts with what has been typed so far.
+#
+# Two sorted indexes are built once per refresh (see updateIndex), so each key press is a binary search rather than a
+#   walk through every team:
+#   numbers   every team number as text, so "34" finds 3409
+#   names     every word of every team name onward, lower case, so "astro" finds both "Astromechs" and "KC Astromechs"
+#
+
+from bisect import bisect_left
+from ExternalScoring import ExternalScoring
+
+
+class TeamSearch:
+
+    # Constructor
+    def __init__(self, scoringSystem: ExternalScoring):
+        self.scoringSystem = scoringSystem
+
+        # parallel lists: the sorted keys, and the team each one belongs to
+        self.numberKeys = []
+        self.numberTeams = []
+        self.nameKeys = []
+        self.nameTeams = []
+
+        # the data the indexes were built from
+        self.builtFrom = None
+
+    # Rebuild the indexes, if the data has changed since the last time
+    def updateIndex(self):
+
+        builtFrom = (self.scoringSystem.getTeams(), self.scoringSystem.getUpdateCount())
+        if self.builtFrom is not None and self.builtFrom[0] is builtFrom[0] and self.builtFrom[1] == builtFrom[1]:
+            return
+
+        teams = self.scoringSystem.getTeams()
+
+        numbers = sorted((str(teamNum), teamNum) for teamNum in teams)
+
+        names = []
+        for teamNum in teams:
+            name = (teams[teamNum].get('name') or "").lower()
+            for i in range(len(name)):
+                if name[i] != " " and (i == 0 or name[i - 1] == " "):
+                    names.append((name[i:], teamNum))
+        names.sort()
+
+        self.numberKeys = [key for key, teamNum in numbers]
+        self.numberTeams = [teamNum for key, teamNum in numbers]
+        self.nameKeys = [key for key, teamNum in names]
+        self.nameTeams = [teamNum for key, teamNum in names]
+        self.builtFrom = builtFrom
+
+    # The first of keys (sorted) that starts with prefix, as a team number, or None
+    def __findPrefix(self, keys, keyTeams, prefix):
+        i = bisect_left(keys, prefix)
+        if i < len(keys) and keys[i].startswith(prefix):
+            return keyTeams[i]
+        return None
+
+    # The team that best matches what was typed, or None.  Digits are looked for in the team numbers first (an exact
+    #   number sorts ahead of the longer ones it starts), then anything is looked for in the names.
+    def find(self, query):
+
+        self.updateIndex()
+
+        query = query.strip().lower()
+        if query == "":
+            return None
+
+        if query.isdigit():
+            teamNum = self.__findPrefix(self.numberKeys, self.numberTeams, query)
+            if teamNum is not None:
+                return teamNum
+
+        return self.__findPrefix(self.nameKeys, self.nameTeams, query)
@@ -0,0 +1,88 @@
+#
+# UpdateWorker
+#
+# Runs slow jobs (network fetches, PowerScore calculations) on background threads so the UI loop never has to poll.
+#
+# When a job finishes, its result is queued and a byte is written to a wakeup pipe.  The UI loop includes the read end of
+#   that pipe in its select() call, so it sleeps until there's either a key press or a finished job to deal with.
+#
+
+import os
+import queue
+import threading
+
+
+class UpdateWorker:
+
+    # Constructor
+    def __init__(self):
+        self.wakeupRead, self.wakeupWrite = os.pipe()
+        os.set_blocking(self.wakeupRead, False)
+        os.set_blocking(self.wakeupWrite, False)
+
+        self.completed = queue.Queue()
+        self.busy = {}
+
+    # The file descriptor to select() on.  It becomes readable when a job completes.
+    def getWakeupFd(self):
+        return self.wakeupRead
+
+    def isBusy(self, name = None):
+        if name is None:
+            return len(self.busy) > 0
+        return name in self.busy
+
+    # Start fn(*args) on a background thread.  Only one job with a given name can run at a time; returns False if one is
+    #   already running.
+    def start(self, name, fn, *args):
+
+        if name in self.busy:
+            return False
+
+        thread = threading.Thread(target=self.__run, args=(name, fn, args), daemon=True)
+        self.busy[name] = thread
+        thread.start()
+        return True
+
+    # Wake up the UI loop without a job finishing (e.g. some other thread has something for it)
+    def wakeup(self):
+        try:
+            os.write(self.wakeupWrite, b"!")
+        except BlockingIOError:
+            # the pipe is full, which means a wakeup is already pending
+            pass
+
+    # Returns a list of (name, result, exception) for every job that has finished since the last call.  Must be called
+    #   from the UI thread.
+    def getCompleted(self):
+
+        # drain the wakeup pipe
+        try:
+            while os.read(self.wakeupRead, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        results = []
+        while True:
+            try:
+                name, result, exception = self.completed.get_nowait()
+            except queue.Empty:
+                break
+            self.busy.pop(name, None)
+            results.append((name, result, exception))
+
+        return results
+
+    def __run(self, name, fn, args):
+
+        result = None
+        exception = None
+        try:
+            result = fn(*args)
+        except Exception as x:
+            # handed back to the UI thread, which decides what to do with it
+            exception = x
+
+        self.completed.put((name, result, exception))
+        self.wakeup()
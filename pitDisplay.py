@@ -29,9 +29,46 @@ Sample Usages:
 
      python3 pitDisplay.py 2022 USMOKSCMP 
      
-(2) Multiple divisions.  Up to 4 divisions are supported.
+(2) Multiple divisions, or all the events at a regional hub.  List as many as you like, or put them in a file (one
+    event code per line).  With a lot of events, only the ones viewed recently are kept in memory (--max-loaded).
 
     python3 pitDisplay.py 2022 USMOKSCMP USMOKSSTLNLT USMOKSKCWLT USMOKSKCELT
+    python3 pitDisplay.py --events-file hub.txt 2022
+
+(3) Kiosk mode for an unattended pit screen.  Cycles through the divisions, sort columns, and pages of teams.
+
+    python3 pitDisplay.py --kiosk --kiosk-seconds 20 2022 USMOKSSTLNLT USMOKSKCWLT
+
+(4) Publish mode.  No screen; the PowerScores and schedules are written to a directory as JSON and HTML pages for
+    browsers or signage players.
+
+    python3 pitDisplay.py --publish /var/www/html/powerscore 2022 USMOKSSTLNLT USMOKSKCWLT
+
+(5) One server, many displays.  One machine fetches and calculates, and serves the results on a port.  Every pit display
+    then gets its data from that server instead of the FTC API, and updates as soon as the server has new data.
+
+    python3 pitDisplay.py --serve 8080 2022 USMOKSSTLNLT USMOKSKCWLT                       (the server)
+    python3 pitDisplay.py --server http://10.0.0.5:8080 2022 USMOKSSTLNLT USMOKSKCWLT      (each display)
+
+(6) Backfill a whole season into a season store (for scouting before a championship).  Interrupt it any time; running it
+    again picks up where it stopped.
+
+    python3 pitDisplay.py --backfill --store season2022.db 2022
+
+(7) Replay an event from a season store at high speed (a 9 hour day in a minute by default) and report how long each
+    step took to get to the screen.
+
+    python3 pitDisplay.py --replay USMOKSCMP --store season2022.db 2022
+
+    Or rate every team over the whole season in the store (every match of every event at once) and list the best.
+
+    python3 pitDisplay.py --ratings --store season2022.db 2022
+
+(8) Two screens on one Raspberry Pi.  The first display fetches and calculates and shares what it has in memory; the
+    second one picks it up from there instead of going to the FTC API itself.
+
+    python3 pitDisplay.py --share 2022 USMOKSSTLNLT USMOKSKCWLT                            (first screen)
+    python3 pitDisplay.py --use-shared 2022 USMOKSKCWLT USMOKSSTLNLT                       (second screen)
 
 ----------
 
@@ -60,22 +97,75 @@ SOFTWARE.
 '''
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import cProfile
 import curses
-from datetime import datetime
+from datetime import datetime, timedelta
+import select
+import sys
 import time
+from CombinedLeaderboard import CombinedLeaderboard
+from DivisionCache import DivisionCache
 from ExternalScoring import *
+from LatencyHistogram import LatencyHistogram
+from MetricsLog import MetricsLog
 from PSEventNamePanel import *
+from PickList import PickList
+from PSCombinedPanel import PSCombinedPanel
 from PSLoadingPanel import PSLoadingPanel
+from PSPickListPanel import PSPickListPanel
 from PSScoresPanel import PSScoresPanel
 from PSSelectEventPanel import PSSelectEventPanel
 from PSStatusBarPanel import PSStatusBarPanel
+from PSTeamHistoryPanel import PSTeamHistoryPanel
 from PSTeamSchedulePanel import PSTeamSchedulePanel
+from RemoteScoring import RemoteScoring
+from ReplayScoring import ReplayScoring
+from ScoresPublisher import ScoresPublisher
+from SeasonBackfill import SeasonBackfill
+from SeasonRatings import SeasonRatings, ratingKeys
+from SeasonStore import SeasonStore
+from SharedScoring import SharedScoring
+from SharedSnapshot import SharedSnapshotWriter, getSharedSnapshotPath
+from SnapshotServer import SnapshotServer
+from TeamSearch import TeamSearch
+from UpdateWorker import UpdateWorker
 
 minstdscrHeight = 30
-minstdscrWidth = 132
+# (the scores table needs 151 columns before the team name gets any room at all)
+minstdscrWidth = 160
 
 secBetweenAutoUpdates = 300   # in seconds
 
+# If a division has never loaded (most likely the network isn't up yet), try again this soon rather than waiting for
+#   the next automatic update
+secBetweenStartupRetries = 10   # in seconds
+
+# With more events than this, only the ones viewed most recently keep their data in memory (see DivisionCache)
+maxLoadedDivisions = 8
+
+# The screen is drawn at most this many times a second.  Everything that happens in between (every key that was waiting,
+#   finished updates) goes out together in the next frame.
+maxFramesPerSec = 30
+
+# Keys that only move something around.  A run of the same one (an arrow key being held down) is handled as one move
+#   by the total: down, up, page down, page up.
+coalescedKeys = (258, 259, 338, 339)
+# ... and these, with home, end, and the left and right arrows, don't need the scores panel to be caught up first
+movementKeys = coalescedKeys + (262, 360, 260, 261)
+
+# Kiosk mode shows each of these sort columns (see PSScoresPanel) for every division: overall, auto, teleop, endgame, rank
+kioskSortColumns = [1, 2, 3, 4, 5]
+secPerKioskView = 15   # in seconds
+
+# --ratings only lists teams that have played this many matches (a team with one great match isn't really the best)
+minMatchesRated = 5
+
+# Replay mode: how long a simulated qualification day is, and how much faster than real time it's replayed.  At 540x a
+#   9 hour day takes a minute.
+hoursPerReplayDay = 9
+replaySpeed = 540
+
 class stdscrSizeException(Exception):
 
     def __init__(self, stdscrWidth, stdscrHeight):
@@ -138,7 +228,39 @@ def drawBaseScreen(stdscr: curses.window):
     pass
 
 
-def ui_main(stdscr: curses.window, scoringSystems: list[ExternalScoring]):
+# Start loading the event info for every division at once, on the worker.  The screen comes up right away showing event
+#   codes, and the names are filled in as they arrive (the jobs are named "event0", "event1", ...)
+def startEventLoads(worker: UpdateWorker, scoringSystems: list[ExternalScoring]):
+    for i in range(len(scoringSystems)):
+        worker.start(f"event{i}", scoringSystems[i].loadEvent, secBetweenStartupRetries)
+
+# Every key that is waiting, as (key, times).  Runs of the same coalescedKeys are folded into one entry.
+def readKeys(stdscr: curses.window):
+
+    keys = []
+    while True:
+        keyevent = stdscr.getch()
+        if keyevent == -1:
+            break
+        if len(keys) > 0 and keyevent in coalescedKeys and keys[-1][0] == keyevent:
+            keys[-1][1] = keys[-1][1] + 1
+        else:
+            keys.append([keyevent, 1])
+    return keys
+
+# Write the record of a division's last refresh to the metrics log (if there is one), with how long drawing it took
+def logRefresh(metricsLog: MetricsLog, scoringSystem: ExternalScoring, drawn):
+
+    if metricsLog is None:
+        return
+
+    record = dict(scoringSystem.getRefreshMetrics())
+    if drawn:
+        record['drawMs'] = round(scoringSystem.stageTimes.getLast("draw") * 1000, 1)
+    metricsLog.write(record)
+
+
+def ui_main(stdscr: curses.window, scoringSystems: list[ExternalScoring], profiler: cProfile.Profile = None, profileCycles = 0, profileFile = "", metricsLog: MetricsLog = None, seasonStore: SeasonStore = None, refreshAllDivisions = False, maxLoaded = maxLoadedDivisions):
 
     scoringSystemIndex = 0
 
@@ -168,180 +290,817 @@ def ui_main(stdscr: curses.window, scoringSystems: list[ExternalScoring]):
 
     psTeamSchedulePanel = PSTeamSchedulePanel(stdscr)
 
+    # alliance selection: one pick list per division, so picks are remembered when switching divisions
+    psPickListPanel = PSPickListPanel(stdscr)
+    pickLists = [PickList(scoringSystem) for scoringSystem in scoringSystems]
+
+    # every team from every division in one ranking
+    psCombinedPanel = PSCombinedPanel(stdscr)
+    combinedLeaderboard = CombinedLeaderboard(scoringSystems)
+
+    # a team's whole season, from the season store (only if there is one)
+    psTeamHistoryPanel = PSTeamHistoryPanel(stdscr)
+
+    # type-ahead team search: one index per division.  searchQuery is what has been typed, or None when not searching.
+    teamSearches = [TeamSearch(scoringSystem) for scoringSystem in scoringSystems]
+    searchQuery = None
+
+    # only the most recently viewed divisions keep their data.  (Not when sharing ... the other displays may be showing
+    #   any of them.)
+    divisionCache = DivisionCache(scoringSystems, 0 if refreshAllDivisions else maxLoaded)
+    divisionCache.use(scoringSystemIndex, lambda i: False)
+
+    # A division was unloaded: let go of everything else built from its data, too
+    def forgetDivision(divisionIndex):
+        combinedLeaderboard.dropDivision(divisionIndex)
+        teamSearches[divisionIndex] = TeamSearch(scoringSystems[divisionIndex])
+
+    # Is the scores table showing with nothing open over it?  (It stays "visible" under the other panels, but keys
+    #   shouldn't move things around on it where nobody can see.)
+    def scoresInFront():
+        return psScoresPanel.isVisible() and not (psTeamSchedulePanel.isVisible() or psPickListPanel.isVisible() or psCombinedPanel.isVisible() or psTeamHistoryPanel.isVisible())
+
     curses.panel.update_panels()
     curses.doupdate()
     
+    # Slow work (fetching and calculating) happens on a background thread so the loop can sleep in select()
+    worker = UpdateWorker()
+
+    # A long list of events is loaded as each one is picked.  Otherwise it's all of them at once, so the names are there
+    #   for the select event list.
+    if divisionCache.isLimited():
+        worker.start(f"event{scoringSystemIndex}", scoringSystems[scoringSystemIndex].loadEvent, secBetweenStartupRetries)
+    else:
+        startEventLoads(worker, scoringSystems)
+
     # Set updateRequested to true to force an immediate update
     updateRequested = True
 
     nextUpdateTimeSec = int(time.time()) + secBetweenAutoUpdates
 
-    # Main run loop
-    while 1:
-        # Non-blocking (becuase of nodelay)
-        keyevent = stdscr.getch()
-
-        # q to quit
-        if keyevent == ord("q"):
-            # quit and break out of the main loop
-            break
+    quitRequested = False
+
+    # t toggles the per-stage timing overlay on the status bar
+    showTimings = False
+    shownTimings = ""
+
+    # With --profile, the first profileCycles refreshes (fetch and calculate on the worker, then the redraw) are run
+    #   under profiler, and the stats are written to profileFile.  (main writes whatever was collected if we quit before
+    #   then.)
+    profiledCycles = 0
+
+    # While the combined leaderboard is up, the other divisions are refreshed too (the one on screen is refreshed as
+    #   usual).  These run on the worker as "division0", "division1", ...  With refreshAllDivisions (sharing the
+    #   snapshots with other displays) they always are, since the other screens may be showing them.
+    nextDivisionRefreshSec = 0
+
+    def startDivisionRefreshes(staleOnly):
+        for i in range(len(scoringSystems)):
+            if i == scoringSystemIndex or worker.isBusy(f"division{i}") or not divisionCache.isResident(i):
+                continue
+            if staleOnly and scoringSystems[i].getUpdateCount() > 0:
+                continue
+            worker.start(f"division{i}", scoringSystems[i].updateTeamsMatches)
+
+    # Is the data for the division on screen being replaced right now?  Its teams and matches are rebuilt in place on the
+    #   worker, by its update or (just after it's picked) by a background refresh still finishing for the combined
+    #   leaderboard.  Until it's done, keys wait and the scores table isn't redrawn, so nothing reads half-built teams.
+    def isDataBusy():
+        return worker.isBusy("update") or worker.isBusy(f"division{scoringSystemIndex}")
+
+    # Frames: key presses and finished jobs just say what needs drawing (frameDirty, and redrawScores for the scores
+    #   panel, the expensive one).  It's drawn and sent to the screen all at once, at most maxFramesPerSec times a
+    #   second, at the top of the loop.
+    frameDirty = False
+    redrawScores = False
+    nextFrameSec = 0
+
+    # keys read while the data was free, but left for later because the division changed to one that isn't (see below)
+    heldKeys = []
 
-        # r to force a data refresh
-        if keyevent == ord("r"):
-            updateRequested = True
-
-        # esc key to pop back and select a different event
-        if keyevent == 27:
-            if ( (not psSelectEventPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) ):
-                # not showing the select event or the team schedule ... show the select event
-                psSelectEventPanel.setVisible(True)
-                psSelectEventPanel.setSelectedIndex(scoringSystemIndex)
-                psSelectEventPanel.redraw()
-                psScoresPanel.setVisible(False)
-                pass
-            elif(psSelectEventPanel.isVisible()):
-                 # the user hit escape when the seletion panel was visible (meaning they're not changing the event)
-                 psSelectEventPanel.setVisible(False)
-                 psScoresPanel.setVisible(True)
-                 pass
-            elif(psTeamSchedulePanel.isVisible()):
-                psTeamSchedulePanel.hide()
+    # Main run loop
+    while not quitRequested:
 
+        if (frameDirty or redrawScores and not isDataBusy()) and time.time() >= nextFrameSec:
+            if redrawScores and not isDataBusy():
+                psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
+                redrawScores = False
             curses.panel.update_panels()
             curses.doupdate()
+            frameDirty = False
+            nextFrameSec = time.time() + 1 / maxFramesPerSec
 
+         # Do we need to do an update?  Only update if the psScoresPanel is visible.  Might not be if we're
+         #   selecting a different event
+        if updateRequested and psScoresPanel.isVisible() and not worker.isBusy("update") and not worker.isBusy(f"division{scoringSystemIndex}"):
 
-        # enter key pressed ... decide what if anything to do
-        if keyevent == 10:
+            # Tell the user we're updating
+            psLoadingPanel.setVisible(True)
 
-            if psSelectEventPanel.isVisible():
-                # Select event is visible ... change to the selected event
-                psSelectEventPanel.setVisible(False)
-                scoringSystemIndex = psSelectEventPanel.getSelectedIndex()
-                eventNamePanel.redraw(scoringSystems[scoringSystemIndex])
-                psScoresPanel.clear()
-                psScoresPanel.setVisible(True)
-                updateRequested = True
-            elif ( (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) ):
-                # OK to show the team schedule
-                if (psScoresPanel.getHighlightTeamNum() != 0):
-                    # but only if a team is really selected
-                    psTeamSchedulePanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex])
-                    pass
+            # Tell the screen it is now ok to refresh
+            frameDirty = True
 
-                pass
+            # Get the external data and calculate PowerScore.  The result is handled below when the worker finishes.
+            if profiler is not None:
+                worker.start("update", profiler.runcall, scoringSystems[scoringSystemIndex].updateTeamsMatches)
+            else:
+                worker.start("update", scoringSystems[scoringSystemIndex].updateTeamsMatches)
 
-            curses.panel.update_panels()
-            curses.doupdate()
+            updateRequested = False
 
-        # super secret way to see a team display with prediction turned on
-        if keyevent == ord('p'):
+        # If the data is pushed to us (from a PowerScore server), wait in the background to be told there's something new
+        if scoringSystems[scoringSystemIndex].pushUpdates and not worker.isBusy("watch"):
+            watchIndex = scoringSystemIndex
+            worker.start("watch", scoringSystems[scoringSystemIndex].waitForChange)
 
-            if ( (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) ):
-                # OK to show the team schedule
-                if (psScoresPanel.getHighlightTeamNum() != 0):
-                    # but only if a team is really selected
-                    psTeamSchedulePanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex], True)
-                    pass
+        # Sleep until there is a key press, the update finishes, or it's time for the next automatic update.
+        #   While an update is running, key presses are left waiting in the input queue (just as they were when the
+        #   update blocked this loop), so nothing gets redrawn from data that is in the middle of being replaced.
+        waitFds = [worker.getWakeupFd()]
+        if not isDataBusy():
+            waitFds.append(sys.stdin.fileno())
 
-                pass
+        timeoutSec = None
+        if not updateRequested and not worker.isBusy("update"):
+            timeoutSec = max(0, nextUpdateTimeSec - time.time())
+            if psCombinedPanel.isVisible() or refreshAllDivisions:
+                timeoutSec = max(0, min(nextUpdateTimeSec, nextDivisionRefreshSec) - time.time())
 
-            curses.panel.update_panels()
-            curses.doupdate()
+        # ... or it's time for a frame that had to wait
+        if frameDirty or redrawScores and not isDataBusy():
+            frameTimeoutSec = max(0, nextFrameSec - time.time())
+            timeoutSec = frameTimeoutSec if timeoutSec is None else min(timeoutSec, frameTimeoutSec)
 
-        # down arrow
-        if keyevent == 258:
-            if psScoresPanel.isVisible():
-                psScoresPanel.changeHighlightTeamRow(1)
-                psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
-            if psSelectEventPanel.isVisible():
-                psSelectEventPanel.changeSelectedIndex(1)
-                psSelectEventPanel.redraw()
-            curses.panel.update_panels()
-            curses.doupdate()
+        select.select(waitFds, [], [], timeoutSec)
 
-        # up arrow
-        if keyevent == 259:
-            if psScoresPanel.isVisible():
-                psScoresPanel.changeHighlightTeamRow(-1)
-                psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
-            if psSelectEventPanel.isVisible():
-                psSelectEventPanel.changeSelectedIndex(-1)
-                psSelectEventPanel.redraw()
-            curses.panel.update_panels()
-            curses.doupdate()
+        # Deal with anything the worker has finished
+        for name, result, exception in worker.getCompleted():
 
-        # left arrow
-        if keyevent == 260:
-            if psScoresPanel.isVisible():
-                psScoresPanel.changeSortColumn(-1)
-                psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
-            curses.panel.update_panels()
-            curses.doupdate()
+            if name == "update":
+
+                if exception is None:
+                    # Update the data on the page
+                    if profiler is not None:
+                        profiler.runcall(psScoresPanel.redraw, scoringSystems[scoringSystemIndex])
+                    else:
+                        psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
+
+                    # the partner rankings come from the new PowerScores too
+                    if psPickListPanel.isVisible():
+                        psPickListPanel.redraw()
+
+                    # only this division is re-sorted for the combined leaderboard
+                    if combinedLeaderboard.updateDivision(scoringSystemIndex) and psCombinedPanel.isVisible():
+                        psCombinedPanel.redraw()
+
+                    # the score percentiles under the event name have new matches in them
+                    eventNamePanel.redraw(scoringSystems[scoringSystemIndex])
+
+                    statusBar.redraw("Last Update: "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+
+                    logRefresh(metricsLog, scoringSystems[scoringSystemIndex], True)
+
+                    if profiler is not None:
+                        profiledCycles = profiledCycles + 1
+                        if profiledCycles >= profileCycles:
+                            profiler.dump_stats(profileFile)
+                            profiler = None
 
-        # right arrow
-        if keyevent == 261:
-            if psScoresPanel.isVisible():
-                psScoresPanel.changeSortColumn(1)
+                elif isinstance(exception, requests.exceptions.Timeout):
+                    # Handle a timeout on the URL
+                    statusBar.redraw("Timeout at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+                    logRefresh(metricsLog, scoringSystems[scoringSystemIndex], False)
+
+                elif isinstance(exception, requests.exceptions.ConnectionError):
+                    # Handle any other generic connection error
+                    statusBar.redraw("ConnectionError at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+                    logRefresh(metricsLog, scoringSystems[scoringSystemIndex], False)
+
+                else:
+                    logRefresh(metricsLog, scoringSystems[scoringSystemIndex], False)
+                    raise exception
+
+                psLoadingPanel.setVisible(False)
+
+                nextUpdateTimeSec= time.time() + secBetweenAutoUpdates
+
+                # Nothing has ever loaded for this division (the network probably isn't up yet) ... try again soon
+                if exception is not None and scoringSystems[scoringSystemIndex].getUpdateCount() == 0:
+                    nextUpdateTimeSec = time.time() + secBetweenStartupRetries
+
+                # Tell the screen it is now ok to refresh
+                frameDirty = True
+
+            if name.startswith("event"):
+                # The event info for one of the divisions has arrived.  A bad event code ends the program, the same as
+                #   it always has.
+                if exception is not None:
+                    raise exception
+
+                eventNamePanel.redraw(scoringSystems[scoringSystemIndex])
+                if psSelectEventPanel.isVisible():
+                    psSelectEventPanel.redraw()
+
+                frameDirty = True
+
+            if name.startswith("division"):
+                # Another division refreshed for the combined leaderboard.  Network trouble just means that division
+                #   shows its older data (or isn't in the list yet); it's tried again with the next update.
+                divisionIndex = int(name[len("division"):])
+                if exception is None:
+                    logRefresh(metricsLog, scoringSystems[divisionIndex], False)
+                    if combinedLeaderboard.updateDivision(divisionIndex) and psCombinedPanel.isVisible():
+                        psCombinedPanel.redraw()
+                        frameDirty = True
+                elif isinstance(exception, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                    logRefresh(metricsLog, scoringSystems[divisionIndex], False)
+                else:
+                    logRefresh(metricsLog, scoringSystems[divisionIndex], False)
+                    raise exception
+
+            if name == "watch":
+                # new data on the server for the event we're showing?  Go get it.
+                if exception is None and result and watchIndex == scoringSystemIndex:
+                    updateRequested = True
+
+        # Handle every key that is waiting, all at once (see readKeys).  repeat is how many times in a row it was pressed.
+        pendingKeys = []
+        if not isDataBusy():
+            pendingKeys = heldKeys + readKeys(stdscr)
+            heldKeys = []
+        for keyIndex, (keyevent, repeat) in enumerate(pendingKeys):
+
+            # Just picked a division that's still refreshing in the background?  The rest of the keys wait for it.
+            if isDataBusy():
+                heldKeys = pendingKeys[keyIndex:]
+                break
+
+            # Other keys may need what the scores panel works out as it draws (like which team is highlighted), so catch
+            #   it up first.  This only draws it in memory; the screen gets it with the next frame.  (Starting or typing a
+            #   search doesn't need it.)
+            searchKey = (searchQuery is not None and (32 <= keyevent <= 126 or keyevent in (8, 127, curses.KEY_BACKSPACE))) or \
+                (searchQuery is None and (keyevent == ord('/') or ord('0') <= keyevent <= ord('9')))
+            if redrawScores and keyevent not in movementKeys and not searchKey:
                 psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
-            curses.panel.update_panels()
-            curses.doupdate()
+                redrawScores = False
+
+            # / (or just typing a team number) starts a team search on the scores table
+            if searchQuery is None and (keyevent == ord('/') or ord('0') <= keyevent <= ord('9')):
+                if ( psScoresPanel.isVisible() and (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    searchQuery = ""
+                    if keyevent == ord('/'):
+                        statusBar.redrawPrompt("Find team (number or name): ")
+                        frameDirty = True
+                        continue
+
+            # While searching, letters and digits go to the search rather than being commands.  Each one jumps the
+            #   highlight to the first team that matches.  Enter or esc finishes; any other key finishes and then does
+            #   what it normally does.
+            if searchQuery is not None:
+                if 32 <= keyevent <= 126 or keyevent in (8, 127, curses.KEY_BACKSPACE):
+                    if 32 <= keyevent <= 126:
+                        searchQuery = searchQuery + chr(keyevent)
+                    else:
+                        searchQuery = searchQuery[:-1]
+
+                    teamNum = teamSearches[scoringSystemIndex].find(searchQuery)
+                    if teamNum is not None:
+                        psScoresPanel.setHighlightTeam(scoringSystems[scoringSystemIndex], teamNum)
+                        redrawScores = True
+                        statusBar.redrawPrompt(f"Find team (number or name): {searchQuery}")
+                    else:
+                        statusBar.redrawPrompt(f"Find team (number or name): {searchQuery}   (no match)")
+                    frameDirty = True
+                    continue
+
+                searchQuery = None
+                statusBar.clearPrompt()
+                frameDirty = True
+
+                # enter or esc just finishes the search
+                if keyevent in (10, 27):
+                    continue
+
+            # q to quit
+            if keyevent == ord("q"):
+                # quit and break out of the main loop
+                quitRequested = True
+                break
+
+            # r to force a data refresh
+            if keyevent == ord("r"):
+                updateRequested = True
+
+            # t to show/hide how long each stage of a refresh takes
+            if keyevent == ord("t"):
+                showTimings = not showTimings
+                if not showTimings:
+                    statusBar.redrawTimings("")
+                    shownTimings = ""
+                    frameDirty = True
+
+            # m swaps the score percentiles under the event name for the means (and back)
+            if keyevent == ord('m'):
+                eventNamePanel.toggleAverages()
+                eventNamePanel.redraw(scoringSystems[scoringSystemIndex])
+                frameDirty = True
+
+            # s swaps the location columns for strength of schedule (partner and opponent PowerScore) and luck
+            if keyevent == ord('s'):
+                if psScoresPanel.isVisible():
+                    psScoresPanel.toggleScheduleColumns()
+                    redrawScores = True
+                frameDirty = True
+
+            # esc key to pop back and select a different event
+            if keyevent == 27:
+                if psPickListPanel.isVisible():
+                    psPickListPanel.hide()
+                elif psCombinedPanel.isVisible():
+                    psCombinedPanel.hide()
+                elif psTeamHistoryPanel.isVisible():
+                    psTeamHistoryPanel.hide()
+                elif ( (not psSelectEventPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) ):
+                    # not showing the select event or the team schedule ... show the select event
+                    psSelectEventPanel.setVisible(True)
+                    psSelectEventPanel.setSelectedIndex(scoringSystemIndex)
+                    psSelectEventPanel.redraw()
+                    psScoresPanel.setVisible(False)
+                    pass
+                elif(psSelectEventPanel.isVisible()):
+                     # the user hit escape when the seletion panel was visible (meaning they're not changing the event)
+                     psSelectEventPanel.setVisible(False)
+                     psScoresPanel.setVisible(True)
+                     pass
+                elif(psTeamSchedulePanel.isVisible()):
+                    psTeamSchedulePanel.hide()
+
+                frameDirty = True
+
+
+            # enter key pressed ... decide what if anything to do
+            if keyevent == 10:
+
+                if psSelectEventPanel.isVisible():
+                    # Select event is visible ... change to the selected event
+                    psSelectEventPanel.setVisible(False)
+                    scoringSystemIndex = psSelectEventPanel.getSelectedIndex()
+                    if not scoringSystems[scoringSystemIndex].isEventLoaded():
+                        worker.start(f"event{scoringSystemIndex}", scoringSystems[scoringSystemIndex].loadEvent, secBetweenStartupRetries)
+                    for divisionIndex in divisionCache.use(scoringSystemIndex, lambda i: worker.isBusy(f"division{i}")):
+                        forgetDivision(divisionIndex)
+                    eventNamePanel.redraw(scoringSystems[scoringSystemIndex])
+                    psScoresPanel.clear()
+                    psScoresPanel.setVisible(True)
+                    updateRequested = True
+                elif ( (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    # OK to show the team schedule
+                    if (psScoresPanel.getHighlightTeamNum() != 0):
+                        # but only if a team is really selected
+                        psTeamSchedulePanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex])
+                        pass
+
+                    pass
+
+                frameDirty = True
+
+            # super secret way to see a team display with prediction turned on
+            if keyevent == ord('p'):
+
+                if ( (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    # OK to show the team schedule
+                    if (psScoresPanel.getHighlightTeamNum() != 0):
+                        # but only if a team is really selected
+                        psTeamSchedulePanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex], True)
+                        pass
+
+                    pass
+
+                frameDirty = True
+
+            # a for alliance selection ... the best partners for the highlighted team, as captain
+            if keyevent == ord('a'):
+
+                if ( psScoresPanel.isVisible() and (not psLoadingPanel.isVisible()) and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    if (psScoresPanel.getHighlightTeamNum() != 0):
+                        psPickListPanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex],pickLists[scoringSystemIndex])
+
+                frameDirty = True
+
+            # c for the combined leaderboard of every division
+            if keyevent == ord('c'):
+
+                if ( psScoresPanel.isVisible() and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    combinedLeaderboard.updateDivision(scoringSystemIndex)
+                    psCombinedPanel.show(combinedLeaderboard)
+                    startDivisionRefreshes(True)
+                    nextDivisionRefreshSec = time.time() + secBetweenAutoUpdates
+
+                frameDirty = True
+
+            # h for the highlighted team's history across the season's events
+            if keyevent == ord('h'):
+
+                if ( seasonStore is not None and psScoresPanel.isVisible() and (not psTeamSchedulePanel.isVisible()) and (not psPickListPanel.isVisible()) and (not psCombinedPanel.isVisible()) and (not psTeamHistoryPanel.isVisible()) ):
+                    if (psScoresPanel.getHighlightTeamNum() != 0):
+                        psTeamHistoryPanel.show(psScoresPanel.getHighlightTeamNum(),scoringSystems[scoringSystemIndex],seasonStore)
+
+                frameDirty = True
+
+            # x marks the selected team on the pick list as picked, u takes back the last pick
+            if keyevent == ord('x'):
+                if psPickListPanel.isVisible():
+                    psPickListPanel.pickSelected()
+                frameDirty = True
+
+            if keyevent == ord('u'):
+                if psPickListPanel.isVisible():
+                    psPickListPanel.undoPick()
+                frameDirty = True
+
+            # down arrow
+            if keyevent == 258:
+                if psPickListPanel.isVisible():
+                    psPickListPanel.changeSelectedRow(repeat)
+                elif psCombinedPanel.isVisible():
+                    psCombinedPanel.changeSelectedRow(repeat)
+                elif psTeamHistoryPanel.isVisible():
+                    psTeamHistoryPanel.scroll(repeat)
+                elif scoresInFront():
+                    psScoresPanel.changeHighlightTeamRow(repeat)
+                    redrawScores = True
+                if psSelectEventPanel.isVisible():
+                    psSelectEventPanel.changeSelectedIndex(repeat)
+                    psSelectEventPanel.redraw()
+                frameDirty = True
+
+            # up arrow
+            if keyevent == 259:
+                if psPickListPanel.isVisible():
+                    psPickListPanel.changeSelectedRow(-repeat)
+                elif psCombinedPanel.isVisible():
+                    psCombinedPanel.changeSelectedRow(-repeat)
+                elif psTeamHistoryPanel.isVisible():
+                    psTeamHistoryPanel.scroll(-repeat)
+                elif scoresInFront():
+                    psScoresPanel.changeHighlightTeamRow(-repeat)
+                    redrawScores = True
+                if psSelectEventPanel.isVisible():
+                    psSelectEventPanel.changeSelectedIndex(-repeat)
+                    psSelectEventPanel.redraw()
+                frameDirty = True
+
+            # page down
+            if keyevent == 338:
+                if psSelectEventPanel.isVisible():
+                    psSelectEventPanel.pageSelectedIndex(repeat)
+                    psSelectEventPanel.redraw()
+                elif psCombinedPanel.isVisible():
+                    psCombinedPanel.pageSelectedRow(repeat)
+                elif scoresInFront():
+                    psScoresPanel.pageHighlightTeamRow(repeat)
+                    redrawScores = True
+                frameDirty = True
+
+            # page up
+            if keyevent == 339:
+                if psSelectEventPanel.isVisible():
+                    psSelectEventPanel.pageSelectedIndex(-repeat)
+                    psSelectEventPanel.redraw()
+                elif psCombinedPanel.isVisible():
+                    psCombinedPanel.pageSelectedRow(-repeat)
+                elif scoresInFront():
+                    psScoresPanel.pageHighlightTeamRow(-repeat)
+                    redrawScores = True
+                frameDirty = True
+
+            # home
+            if keyevent == 262:
+                if psCombinedPanel.isVisible():
+                    psCombinedPanel.setSelectedRowFirst()
+                elif scoresInFront():
+                    psScoresPanel.setHighlightTeamRowFirst()
+                    redrawScores = True
+                frameDirty = True
+
+            # end
+            if keyevent == 360:
+                if psCombinedPanel.isVisible():
+                    psCombinedPanel.setSelectedRowLast()
+                elif scoresInFront():
+                    psScoresPanel.setHighlightTeamRowLast()
+                    redrawScores = True
+                frameDirty = True
+
+            # left arrow
+            if keyevent == 260:
+                if scoresInFront():
+                    psScoresPanel.changeSortColumn(-1)
+                    redrawScores = True
+                frameDirty = True
+
+            # right arrow
+            if keyevent == 261:
+                if scoresInFront():
+                    psScoresPanel.changeSortColumn(1)
+                    redrawScores = True
+                frameDirty = True
+
+        # (only when they've changed, so an open overlay doesn't keep sending frames)
+        if showTimings:
+            timings = scoringSystems[scoringSystemIndex].stageTimes.format()
+            if timings != shownTimings:
+                statusBar.redrawTimings(timings)
+                shownTimings = timings
+                frameDirty = True
 
         # Has the timer run out?  If so, do an update of the data
-        if int(time.time() >= nextUpdateTimeSec):
+        if time.time() >= nextUpdateTimeSec:
             updateRequested=True
 
-         # Do we need to do an update?  Only update if the psScoresPanel is visible.  Might not be if we're
-         #   selecting a different event
-        if updateRequested and psScoresPanel.isVisible():
+        # ... and the other divisions, if they're all on screen (or being shared)
+        if (psCombinedPanel.isVisible() or refreshAllDivisions) and time.time() >= nextDivisionRefreshSec:
+            startDivisionRefreshes(False)
+            nextDivisionRefreshSec = time.time() + secBetweenAutoUpdates
 
+    pass
 
+# Kiosk mode - for pit screens with nobody at the keyboard.  Cycles through each division, showing each of the
+#   kioskSortColumns in turn and paging through the whole team list, secondsPerView seconds per page.
+#
+# Two scores panels are used.  While one is on screen, the next division's data is fetched on a background thread and
+#   drawn into the other (hidden) panel, so moving to the next division is just swapping which panel is visible.
+def kiosk_main(stdscr: curses.window, scoringSystems: list[ExternalScoring], secondsPerView, metricsLog: MetricsLog = None):
 
-            # Tell the user we're updating
-            psLoadingPanel.setVisible(True)
+    screenHeight, screenWidth = stdscr.getmaxyx()
+    if screenHeight < minstdscrHeight or screenWidth < minstdscrWidth:
+        raise stdscrSizeException(screenWidth,screenHeight)
 
-            # Tell the screen it is now ok to refresh
-            curses.panel.update_panels()
-            curses.doupdate()
+    # set all of the curses settings to our liking
+    setup_curses(stdscr)
 
-            try:
-                # Get the external data and calculate PowerScore
-                scoringSystems[scoringSystemIndex].updateTeamsMatches()
+    # draw the base screen
+    drawBaseScreen(stdscr)
 
-                # Update the data on the page
-                psScoresPanel.redraw(scoringSystems[scoringSystemIndex])
+    eventNamePanel = PSEventNamePanel(stdscr)
+    statusBar = PSStatusBarPanel(stdscr)
 
-                statusBar.redraw("Last Update: "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+    # the panel on screen, and the one the next division is drawn into
+    shownPanel = PSScoresPanel(stdscr)
+    stagedPanel = PSScoresPanel(stdscr)
+    stagedPanel.setVisible(False)
 
-            except requests.exceptions.Timeout:
-                # Handle a timeout on the URL
-                statusBar.redraw("Timeout at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+    # only shown until the first division has loaded
+    psLoadingPanel = PSLoadingPanel(stdscr)
+    psLoadingPanel.setVisible(True)
+
+    curses.panel.update_panels()
+    curses.doupdate()
+
+    worker = UpdateWorker()
 
-            except requests.exceptions.ConnectionError:
-                # Handle any other generic connection error
-                statusBar.redraw("ConnectionError at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S"))
+    startEventLoads(worker, scoringSystems)
 
+    # when each division last fetched data, and what to say about it on the status bar
+    lastUpdateSec = [0] * len(scoringSystems)
+    statusMessages = [""] * len(scoringSystems)
+
+    shownIndex = -1
+    stagedIndex = -1
+    prefetchIndex = 0
+    sortPosition = 0
+    page = 0
+
+    # Fetch (if the data is stale) and pre-render a division into the staged panel.  The fetch runs on the worker; the
+    #   drawing happens in the loop below once it finishes.
+    def startPrefetch(index):
+        if time.time() - lastUpdateSec[index] >= secBetweenAutoUpdates:
+            worker.start("prefetch", scoringSystems[index].updateTeamsMatches)
+        else:
+            worker.start("prefetch", lambda: None)
+
+    startPrefetch(prefetchIndex)
+
+    # nothing moves until the first division is ready
+    nextViewTimeSec = None
+    advancePending = False
+
+    quitRequested = False
+
+    while not quitRequested:
+
+        timeoutSec = None
+        if nextViewTimeSec is not None:
+            timeoutSec = max(0, nextViewTimeSec - time.time())
+
+        select.select([sys.stdin.fileno(), worker.getWakeupFd()], [], [], timeoutSec)
+
+        for name, result, exception in worker.getCompleted():
+
+            if name.startswith("event"):
+                # The event info for one of the divisions has arrived
+                if exception is not None:
+                    raise exception
+
+                if shownIndex != -1:
+                    eventNamePanel.redraw(scoringSystems[shownIndex])
+                    curses.panel.update_panels()
+                    curses.doupdate()
+
+            if name == "prefetch":
+
+                # (the data was only fetched if it was stale)
+                fetched = time.time() - lastUpdateSec[prefetchIndex] >= secBetweenAutoUpdates
+
+                if exception is None:
+                    if fetched:
+                        lastUpdateSec[prefetchIndex] = time.time()
+                        statusMessages[prefetchIndex] = "Last Update: "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+
+                elif isinstance(exception, requests.exceptions.Timeout):
+                    # Handle a timeout on the URL ... show whatever data we already had
+                    statusMessages[prefetchIndex] = "Timeout at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+
+                elif isinstance(exception, requests.exceptions.ConnectionError):
+                    # Handle any other generic connection error
+                    statusMessages[prefetchIndex] = "ConnectionError at "+datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+
+                else:
+                    logRefresh(metricsLog, scoringSystems[prefetchIndex], False)
+                    raise exception
+
+                # Pre-render the first view of the division into the hidden panel
+                stagedPanel.clear()
+                stagedPanel.setSortColumn(kioskSortColumns[0])
+                stagedPanel.showPage(0)
+                stagedPanel.redraw(scoringSystems[prefetchIndex])
+                stagedIndex = prefetchIndex
+
+                if fetched:
+                    logRefresh(metricsLog, scoringSystems[prefetchIndex], True)
+
+                # The very first division goes straight on screen.  Otherwise, if the timer already ran out while
+                #   waiting for this, move on now.
+                if shownIndex == -1 or advancePending:
+                    advancePending = False
+                    nextViewTimeSec = time.time()
+
+        # q to quit ... nothing else does anything in kiosk mode
+        while 1:
+            keyevent = stdscr.getch()
+            if keyevent == -1:
+                break
+            if keyevent == ord("q"):
+                quitRequested = True
+                break
+
+        if nextViewTimeSec is None or time.time() < nextViewTimeSec:
+            continue
+
+        # Time for the next view.  Work out what it is: the next page, then the next sort column, then the next division
+        nextSortPosition = sortPosition
+        nextPage = page + 1
+        if shownIndex == -1 or nextPage >= shownPanel.getPageCount(scoringSystems[shownIndex]):
+            nextSortPosition = sortPosition + 1
+            nextPage = 0
+
+        if shownIndex == -1 or nextSortPosition >= len(kioskSortColumns):
+
+            if stagedIndex == -1 or worker.isBusy("prefetch"):
+                # the next division isn't ready yet - keep showing this view until it is
+                nextViewTimeSec = None
+                advancePending = True
+                continue
+
+            # swap in the pre-rendered division
+            stagedPanel.setVisible(True)
+            shownPanel.setVisible(False)
+            shownPanel, stagedPanel = stagedPanel, shownPanel
+            shownIndex = stagedIndex
+            stagedIndex = -1
+            sortPosition = 0
+            page = 0
+
+            eventNamePanel.redraw(scoringSystems[shownIndex])
+            statusBar.redraw(statusMessages[shownIndex])
             psLoadingPanel.setVisible(False)
 
-            updateRequested = False
-            nextUpdateTimeSec= time.time() + secBetweenAutoUpdates
+            # and start getting the one after it ready
+            prefetchIndex = (shownIndex + 1) % len(scoringSystems)
+            startPrefetch(prefetchIndex)
 
-            # Tell the screen it is now ok to refresh
             curses.panel.update_panels()
             curses.doupdate()
 
-        # Wait for 0.1 seconds before the next time through the loop
-        time.sleep(.1)
+            nextViewTimeSec = time.time() + secondsPerView
+            continue
+
+        if worker.isBusy("prefetch") and prefetchIndex == shownIndex:
+            # a single division is being refreshed underneath us ... don't draw from it until that's done
+            nextViewTimeSec = None
+            advancePending = True
+            continue
+
+        sortPosition = nextSortPosition
+        page = nextPage
+
+        shownPanel.setSortColumn(kioskSortColumns[sortPosition])
+        shownPanel.showPage(page)
+        shownPanel.redraw(scoringSystems[shownIndex])
+
+        curses.panel.update_panels()
+        curses.doupdate()
+
+        nextViewTimeSec = time.time() + secondsPerView
 
     pass
 
-# check for an internet connection
-def network_up():
-    try:
-        r=requests.get('https://ftc-events.firstinspires.org/',  timeout=15)
-        return True
-    except: 
-        return False
+# Replay mode - plays back an archived event one match at a time on a simulated clock, replaySpeed times faster than real
+#   time, to see how the display holds up over a whole day.  Every step is a full refresh (the real PowerScore
+#   calculation) and a redraw of the scores panel.  How late each step finished, measured from when its match was due on
+#   the simulated clock, goes into histogram.
+def replay_main(stdscr: curses.window, scoringSystem: ReplayScoring, speed, hoursPerDay, histogram: LatencyHistogram):
+
+    screenHeight, screenWidth = stdscr.getmaxyx()
+    if screenHeight < minstdscrHeight or screenWidth < minstdscrWidth:
+        raise stdscrSizeException(screenWidth,screenHeight)
+
+    # set all of the curses settings to our liking
+    setup_curses(stdscr)
+
+    # draw the base screen
+    drawBaseScreen(stdscr)
+
+    eventNamePanel = PSEventNamePanel(stdscr)
+    eventNamePanel.redraw(scoringSystem)
+
+    statusBar = PSStatusBarPanel(stdscr)
+    psScoresPanel = PSScoresPanel(stdscr)
+
+    # real seconds between matches
+    matchCount = max(1, scoringSystem.getMatchCount())
+    secPerMatch = hoursPerDay * 3600 / matchCount / speed
+
+    # the start of the day, with no matches played yet
+    scoringSystem.updateTeamsMatches()
+    psScoresPanel.redraw(scoringSystem)
+    curses.panel.update_panels()
+    curses.doupdate()
+
+    startSec = time.perf_counter()
+    step = 0
+
+    while scoringSystem.releaseNextMatch():
+        step = step + 1
+        dueSec = startSec + step * secPerMatch
+
+        # wait for the simulated clock (q to stop early)
+        quitRequested = False
+        while time.perf_counter() < dueSec:
+            select.select([sys.stdin.fileno()], [], [], dueSec - time.perf_counter())
+            if stdscr.getch() == ord("q"):
+                quitRequested = True
+                break
+        if quitRequested:
+            break
+
+        # the step: calculate, draw, and get it on the screen
+        scoringSystem.updateTeamsMatches()
+        psScoresPanel.redraw(scoringSystem)
+        eventNamePanel.redraw(scoringSystem)
+
+        simulated = timedelta(seconds=int(step * secPerMatch * speed))
+        statusBar.redraw(f"Replay at {speed:g}x: match {step} of {matchCount}, {simulated} into the day")
+
+        curses.panel.update_panels()
+        curses.doupdate()
+
+        histogram.add(time.perf_counter() - dueSec)
+
+    pass
+
+# For the modes without a screen: get the event info for all the divisions at once.  Reaching the API is the check that
+#   the network is up ... keep trying until it is.
+def loadEvents(scoringSystems: list[ExternalScoring]):
+
+    def onRetry(x):
+        print(f"Network is unavailable ... will try again in {secBetweenStartupRetries} seconds")
+
+    with ThreadPoolExecutor(max_workers=len(scoringSystems)) as executor:
+        loads = [executor.submit(scoringSystem.loadEvent, secBetweenStartupRetries, onRetry) for scoringSystem in scoringSystems]
+        for load in loads:
+            load.result()
+
+# Event codes from a file, one per line.  Blank lines and anything after a # are ignored.
+def readEventsFile(path):
+
+    eventCodes = []
+    with open(path, "r") as f:
+        for line in f:
+            eventCode = line.split("#")[0].strip()
+            if eventCode != "":
+                eventCodes.append(eventCode)
+    return eventCodes
 
 # Main function ... reads the command line parms and starts up the UI if things look OK
 def main():
@@ -351,39 +1110,178 @@ def main():
         epilog='Note: Additional python3 libraries are required.'
         )
     parser.add_argument('season', help='Event season, for example 2022.  Events in Jan-Apr will be the previous year')
-    parser.add_argument('event', help='Event identifier, for example USMOKSCMP')
-    parser.add_argument('event2', nargs="?", default='', help='optional second event identifier for a multi-division event')
-    parser.add_argument('event3', nargs="?", default='', help='optional third event identifier for a multi-division event')
-    parser.add_argument('event4', nargs="?", default='', help='optional fourth event identifier for a multi-division event')
-
-    args = parser.parse_args()
-
-    # read the api key from the expected file.
-    try:
-        f = open("auth.key", "r")
-        auth_key = f.readline()
-    except Exception as x:
-        print("Error reading expected auth.key file")
-        exit()
-
-    # wait for a network connection
-    while(not network_up()):
-        print("Network is unavailable ... will try again in 10 seconds")
-        time.sleep(10)
+    parser.add_argument('events', metavar='event', nargs="*", help='Event identifier, for example USMOKSCMP.  List more than one for a multi-division event (or a regional hub).')
+    parser.add_argument('--events-file', metavar='FILE', default='', help='read more event identifiers from FILE, one per line (# starts a comment)')
+    parser.add_argument('--max-loaded', metavar='N', type=int, default=maxLoadedDivisions, help=f'keep the data for only the N most recently viewed events in memory (default {maxLoadedDivisions}, 0 for no limit)')
+    parser.add_argument('--profile', metavar='CYCLES', type=int, default=0, help='run the first CYCLES refreshes under cProfile and write the stats to the --profile-file')
+    parser.add_argument('--profile-file', default='powerscore.prof', help='where --profile writes its stats (default powerscore.prof).  View them with: python3 -m pstats powerscore.prof')
+    parser.add_argument('--metrics-log', metavar='FILE', default='', help='append a JSON line describing every refresh (requests, timings, errors) to FILE.  Rotated at 5MB.')
+    parser.add_argument('--store', metavar='FILE', default='', help='save every refresh to the SQLite database FILE, building up a history of the season.  Press h on a team to see it.')
+    parser.add_argument('--backfill', action='store_true', help='no screen: download every event of the season into the --store database.  Safe to interrupt; running it again resumes.')
+    parser.add_argument('--backfill-concurrency', metavar='N', type=int, default=4, help='events to download at once when backfilling (default 4)')
+    parser.add_argument('--backfill-all-events', action='store_true', help='backfill every event the API lists, scrimmages and off-season events too (normally just the competition events)')
+    parser.add_argument('--ratings', action='store_true', help='no screen: rate every team from every match in the --store database and list the best')
+    parser.add_argument('--ratings-top', metavar='N', type=int, default=25, help='teams to list with --ratings (default 25)')
+    parser.add_argument('--replay', metavar='EVENT', default='', help='play back EVENT from the --store database one match at a time, on a simulated clock, and report how long each step took')
+    parser.add_argument('--replay-speed', metavar='N', type=float, default=replaySpeed, help=f'replay N times faster than real time (default {replaySpeed})')
+    parser.add_argument('--replay-hours', metavar='H', type=float, default=hoursPerReplayDay, help=f'length of the simulated qualification day (default {hoursPerReplayDay})')
+    parser.add_argument('--kiosk', action='store_true', help='unattended display: cycle through every division, sort column, and page of teams')
+    parser.add_argument('--kiosk-seconds', type=int, default=secPerKioskView, help=f'seconds to show each page in kiosk mode (default {secPerKioskView})')
+    parser.add_argument('--publish', metavar='DIR', default='', help='headless: write each division\'s PowerScores and schedule to DIR as JSON and self-refreshing HTML instead of using the screen')
+    parser.add_argument('--serve', metavar='PORT', type=int, default=0, help='headless: fetch and calculate for the events and serve the results to pit displays started with --server')
+    parser.add_argument('--server', metavar='URL', default='', help='get the events from a PowerScore server (for example http://10.0.0.5:8080) instead of the FTC API')
+    parser.add_argument('--share', action='store_true', help='share every refresh in memory with other displays on this machine started with --use-shared')
+    parser.add_argument('--use-shared', action='store_true', help='get the events from a display on this machine started with --share instead of the FTC API')
+
+    # (parse_intermixed_args, so options can go between the season and the event codes too)
+    args = parser.parse_intermixed_args()
+
+    if args.backfill and args.store == "":
+        parser.error("--backfill needs a --store database to fill")
+    if args.backfill_all_events and not args.backfill:
+        parser.error("--backfill-all-events goes with --backfill")
+    if args.backfill and args.server != "":
+        parser.error("--backfill gets its data from the FTC API, not a PowerScore server")
+    if args.ratings and args.store == "":
+        parser.error("--ratings needs a --store database of the season (see --backfill)")
+    if args.replay != "" and args.store == "":
+        parser.error("--replay needs the --store database the event was recorded in")
+    if args.use_shared and (args.share or args.server != "" or args.backfill):
+        parser.error("--use-shared gets its data from another display, so it can't be used with --share, --server, or --backfill")
+
+    eventCodes = list(args.events)
+    if args.events_file != "":
+        try:
+            eventCodes.extend(readEventsFile(args.events_file))
+        except OSError as x:
+            parser.error(f"can't read --events-file {args.events_file}: {x.strerror}")
+
+    if not args.backfill and args.replay == "" and not args.ratings and len(eventCodes) == 0:
+        parser.error("an event is required")
+
+    if args.replay != "":
+        # nothing is fetched ... the event comes from the store
+        seasonStore = SeasonStore(args.store)
+        histogram = LatencyHistogram("Time from each match's release to the screen being updated")
+        try:
+            scoringSystem = ReplayScoring(seasonStore, args.season, args.replay)
+            curses.wrapper(replay_main, scoringSystem, args.replay_speed, args.replay_hours, histogram)
+        except (stdscrSizeException, ExternalScoringException) as s:
+            print()
+            print(s)
+            print()
+            return
+        finally:
+            seasonStore.close()
+
+        for line in histogram.format():
+            print(line)
+        print("Stage times for the last step (average in parentheses): " + scoringSystem.stageTimes.format())
+        return
+
+    if args.ratings:
+        # also straight from the store ... nothing is fetched
+        seasonStore = SeasonStore(args.store)
+        try:
+            summary = SeasonRatings(seasonStore, args.season).solve()
+            topRatings = seasonStore.getTopRatings(args.season, args.ratings_top, minMatchesRated)
+        finally:
+            seasonStore.close()
+
+        print(f"{summary['season']}: rated {summary['teams']} teams from {summary['alliances']} alliances in {summary['totalSec']:.2f} s "
+              f"({'starting from the last ratings' if summary['warmStart'] else 'starting from scratch'}, "
+              f"{'/'.join(str(summary['iterations'][key]) for key in ratingKeys)} steps)")
+        print(f"The best {args.ratings_top} teams with at least {minMatchesRated} matches:")
+        print()
+        print("   #   Team  Name                             Rating      A      T      E  Matches")
+        for i, rating in enumerate(topRatings):
+            print("{:>4d} {:>6d}  {:<30.30s}  {:>7.1f} {:>6.1f} {:>6.1f} {:>6.1f}  {:>7d}".format(i + 1, rating['number'], rating['name'] or "",
+                rating['rating'], rating['autoRating'], rating['teleRating'], rating['endgRating'], rating['matches']))
+        return
+
+    if args.server == "" and not args.use_shared:
+        # read the api key from the expected file.  (A thin client gets everything from the PowerScore server, or the
+        #   sharing display, so it doesn't need one.)
+        try:
+            f = open("auth.key", "r")
+            auth_key = f.readline()
+        except Exception as x:
+            print("Error reading expected auth.key file")
+            exit()
+
+    if args.backfill:
+        # the whole season, straight into the store ... no events or screen involved
+        seasonStore = SeasonStore(args.store)
+        metricsLog = None
+        if args.metrics_log != "":
+            metricsLog = MetricsLog(args.metrics_log)
+        try:
+            SeasonBackfill(args.season, auth_key, seasonStore, args.backfill_concurrency, metricsLog, args.backfill_all_events).run()
+        except requests.exceptions.RequestException as x:
+            print()
+            print(f"Backfill stopped: {x}")
+            print()
+        finally:
+            if metricsLog is not None:
+                metricsLog.close()
+            seasonStore.close()
+        return
 
     try:
-        # check and set up the scoring system objects.  
+        # set up the scoring system objects.  This doesn't fetch anything yet.
         scoringSystems = []
-        scoringSystems.append(ExternalScoring(args.season, args.event, auth_key))
-        if (args.event2!=""):
-            scoringSystems.append(ExternalScoring(args.season, args.event2, auth_key))
-        if (args.event3!=""):
-            scoringSystems.append(ExternalScoring(args.season, args.event3, auth_key))
-        if (args.event4!=""):
-            scoringSystems.append(ExternalScoring(args.season, args.event4, auth_key))
-
-        # ready to try and set up the main UI
-        curses.wrapper(ui_main, scoringSystems)
+        for eventCode in eventCodes:
+            if args.server != "":
+                scoringSystems.append(RemoteScoring(args.server, eventCode))
+            elif args.use_shared:
+                scoringSystems.append(SharedScoring(args.season, eventCode))
+            else:
+                scoringSystems.append(ExternalScoring(args.season, eventCode, auth_key))
+
+        # Without a screen, there's nothing to show until the events are known.  With one, the UI comes up right away
+        #   and loads them in the background.
+        if args.publish != "" or args.serve != 0:
+            loadEvents(scoringSystems)
+
+        metricsLog = None
+        if args.metrics_log != "":
+            metricsLog = MetricsLog(args.metrics_log)
+
+        seasonStore = None
+        if args.store != "":
+            seasonStore = SeasonStore(args.store)
+            for scoringSystem in scoringSystems:
+                scoringSystem.setSeasonStore(seasonStore)
+
+        sharedSnapshots = []
+        if args.share:
+            for scoringSystem in scoringSystems:
+                sharedSnapshots.append(SharedSnapshotWriter(getSharedSnapshotPath(args.season, scoringSystem.eventCode)))
+                scoringSystem.setSharedSnapshot(sharedSnapshots[-1])
+
+        # ready to try and set up the main UI ... or no UI at all
+        profiler = None
+        try:
+            if args.publish != "":
+                ScoresPublisher(args.publish, scoringSystems, secBetweenAutoUpdates, metricsLog=metricsLog).run()
+            elif args.serve != 0:
+                SnapshotServer(args.serve, scoringSystems, secBetweenAutoUpdates, metricsLog=metricsLog).run()
+            elif args.kiosk:
+                curses.wrapper(kiosk_main, scoringSystems, args.kiosk_seconds, metricsLog)
+            else:
+                if args.profile > 0:
+                    profiler = cProfile.Profile()
+                curses.wrapper(ui_main, scoringSystems, profiler, args.profile, args.profile_file, metricsLog, seasonStore, args.share, args.max_loaded)
+        finally:
+            # --profile stats get written even if the display was quit (or ctrl-c'd) before all the refreshes ran
+            if profiler is not None:
+                profiler.dump_stats(args.profile_file)
+            for sharedSnapshot in sharedSnapshots:
+                sharedSnapshot.close()
+            if metricsLog is not None:
+                metricsLog.close()
+            if seasonStore is not None:
+                seasonStore.close()
     except stdscrSizeException as s:
         print()
         print(s)
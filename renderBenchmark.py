@@ -0,0 +1,237 @@
+#! /usr/bin/env python3
+
+#
+# renderBenchmark
+#
+# How fast do the panels get a key press onto the screen, and how much do they write to do it?  This runs the real
+#   display (ui_main) in a pseudo-terminal with synthetic events (see SyntheticScoring), types a fixed script of keys
+#   at it, and watches what comes back.  For each action it reports:
+#
+#   latency   key written to the last byte of the frame it caused (the frame is over once the terminal goes quiet for
+#             --settle-ms).  The settle time itself isn't counted.
+#   bytes     how much was written to the terminal for that frame
+#
+# Each terminal size in --sizes gets its own run.  The default is the smallest screen the display will run on
+#   (160x30) and 480x135 (a 4K screen with an 8x16 font).  Run it before and after a rendering change and compare, or save the numbers with --json.
+#
+#   python3 renderBenchmark.py
+#   python3 renderBenchmark.py --sizes 160x30,240x67 --teams 80 --repeat 10 --json before.json
+#
+# Only runs where there are pseudo-terminals (Linux, OSX, the Raspberry Pi).
+#
+
+import argparse
+import fcntl
+import json
+import os
+import pty
+import select
+import struct
+import sys
+import termios
+import time
+from LatencyHistogram import LatencyHistogram
+from pitDisplay import minstdscrWidth, minstdscrHeight
+
+# the terminal is quiet for this long and the frame is done (not counted in the latency)
+settleMs = 50
+
+# give up on an action that never draws anything
+secPerActionLimit = 5
+
+# Named keys for the script, as an xterm sends them once curses has turned the keypad on
+keyBytes = {
+    'down': b'\x1bOB',
+    'up': b'\x1bOA',
+    'left': b'\x1bOD',
+    'right': b'\x1bOC',
+    'pgdn': b'\x1b[6~',
+    'pgup': b'\x1b[5~',
+    'home': b'\x1bOH',
+    'end': b'\x1bOF',
+    'enter': b'\r',
+    'esc': b'\x1b',
+}
+
+# What gets typed, in order: (panel, action, key).  Every action leaves the display where the next one expects it.
+script = [
+    ('scores', 'highlight down', 'down'),
+    ('scores', 'highlight down', 'down'),
+    ('scores', 'highlight up', 'up'),
+    ('scores', 'page down', 'pgdn'),
+    ('scores', 'page up', 'pgup'),
+    ('scores', 'last team', 'end'),
+    ('scores', 'first team', 'home'),
+    ('teamSearch', 'type a digit', '1'),
+    ('teamSearch', 'type a digit', '2'),
+    ('teamSearch', 'finish', 'enter'),
+    ('scores', 'sort column', 'right'),
+    ('scores', 'sort column', 'left'),
+    ('teamSchedule', 'open', 'enter'),
+    ('teamSchedule', 'close', 'esc'),
+    ('teamSchedule', 'open predicted', 'p'),
+    ('teamSchedule', 'close', 'esc'),
+    ('selectEvent', 'open', 'esc'),
+    ('selectEvent', 'next event', 'down'),
+    ('selectEvent', 'previous event', 'up'),
+    ('selectEvent', 'close', 'esc'),
+]
+
+
+# In the child: the display, in the pseudo-terminal, at the given size
+def runDisplay(width, height, teamCount, eventCount):
+
+    # set the size before curses starts, so it sees it from the beginning
+    fcntl.ioctl(sys.stdout.fileno(), termios.TIOCSWINSZ, struct.pack('HHHH', height, width, 0, 0))
+    os.environ['TERM'] = os.environ.get('BENCHMARK_TERM', 'xterm-256color')
+    os.environ.pop('LINES', None)
+    os.environ.pop('COLUMNS', None)
+
+    import curses
+    import pitDisplay
+    from SyntheticScoring import SyntheticScoring
+
+    scoringSystems = [SyntheticScoring(f"BENCH{i + 1}", teamCount) for i in range(eventCount)]
+    curses.wrapper(pitDisplay.ui_main, scoringSystems)
+
+
+class RenderBenchmark:
+
+    # Constructor
+    def __init__(self, width, height, teamCount, eventCount):
+        self.width = width
+        self.height = height
+        self.teamCount = teamCount
+        self.eventCount = eventCount
+
+        # (panel, action) -> list of (latency seconds, bytes)
+        self.results = {}
+        self.histogram = LatencyHistogram(f"{width}x{height}: every action")
+
+    # Read whatever the display writes until it has been quiet for settleMs (or limitSec is up).  Returns (bytes read,
+    #   time of the last byte, or None if nothing came).
+    def readFrame(self, limitSec):
+
+        received = 0
+        lastByteSec = None
+        endSec = time.perf_counter() + limitSec
+        while True:
+            waitSec = settleMs / 1000 if lastByteSec is not None else endSec - time.perf_counter()
+            if waitSec <= 0:
+                break
+            ready, _, _ = select.select([self.fd], [], [], waitSec)
+            if not ready:
+                if lastByteSec is not None or time.perf_counter() >= endSec:
+                    break
+                continue
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError:
+                # the display has exited
+                break
+            if len(data) == 0:
+                break
+            received = received + len(data)
+            lastByteSec = time.perf_counter()
+        return (received, lastByteSec)
+
+    def run(self, repeat):
+
+        pid, self.fd = pty.fork()
+        if pid == 0:
+            try:
+                runDisplay(self.width, self.height, self.teamCount, self.eventCount)
+            finally:
+                os._exit(0)
+
+        try:
+            # the display comes up, loads the events, and draws the first refresh ... wait for all of that to finish
+            received, lastByteSec = self.readFrame(secPerActionLimit)
+            while lastByteSec is not None:
+                received, lastByteSec = self.readFrame(.5)
+
+            for i in range(repeat):
+                for panel, action, key in script:
+                    startSec = time.perf_counter()
+                    os.write(self.fd, keyBytes.get(key, key.encode()))
+                    received, lastByteSec = self.readFrame(secPerActionLimit)
+
+                    latency = (lastByteSec if lastByteSec is not None else time.perf_counter()) - startSec
+                    self.results.setdefault((panel, action), []).append((latency, received))
+                    self.histogram.add(latency)
+
+        finally:
+            try:
+                os.write(self.fd, b'q')
+                self.readFrame(1)
+            except OSError:
+                pass
+            os.waitpid(pid, 0)
+            os.close(self.fd)
+
+    # One line per action: median and slowest latency, and bytes per frame
+    def format(self):
+
+        lines = [f"{self.width}x{self.height}, {self.eventCount} events of {self.teamCount} teams",
+                 f"  {'panel':<14s} {'action':<16s} {'runs':>5s} {'p50 ms':>8s} {'max ms':>8s} {'bytes':>8s}"]
+        for (panel, action), samples in self.results.items():
+            latencies = sorted(sample[0] for sample in samples)
+            bytesPerFrame = sum(sample[1] for sample in samples) / len(samples)
+            lines.append(f"  {panel:<14s} {action:<16s} {len(samples):>5d} {latencies[len(latencies) // 2] * 1000:>8.1f} {latencies[-1] * 1000:>8.1f} {bytesPerFrame:>8.0f}")
+        return lines
+
+    # Everything measured, for --json
+    def getReport(self):
+        return {
+            'width': self.width,
+            'height': self.height,
+            'teams': self.teamCount,
+            'events': self.eventCount,
+            'actions': [{'panel': panel, 'action': action,
+                         'latencyMs': [round(sample[0] * 1000, 3) for sample in samples],
+                         'bytes': [sample[1] for sample in samples]}
+                        for (panel, action), samples in self.results.items()],
+        }
+
+
+def main():
+
+    global settleMs
+
+    parser = argparse.ArgumentParser(description='Measure how fast the PowerScore display draws, in a pseudo-terminal with made-up events.')
+    defaultSizes = f"{minstdscrWidth}x{minstdscrHeight},480x135"
+    parser.add_argument('--sizes', default=defaultSizes, help=f'terminal sizes to try, as WIDTHxHEIGHT separated by commas (default {defaultSizes})')
+    parser.add_argument('--teams', type=int, default=40, help='teams per event (default 40)')
+    parser.add_argument('--events', type=int, default=4, help='events (divisions) to load (default 4)')
+    parser.add_argument('--repeat', type=int, default=5, help='times to run through the key script (default 5)')
+    parser.add_argument('--settle-ms', type=int, default=settleMs, help=f'quiet time that ends a frame (default {settleMs})')
+    parser.add_argument('--json', metavar='FILE', default='', help='also write every measurement to FILE')
+
+    args = parser.parse_args()
+    settleMs = args.settle_ms
+
+    sizes = []
+    for size in args.sizes.split(','):
+        try:
+            width, height = size.lower().split('x')
+            sizes.append((int(width), int(height)))
+        except ValueError:
+            parser.error(f"bad size {size} ... use WIDTHxHEIGHT, for example 240x67")
+
+    reports = []
+    for width, height in sizes:
+        benchmark = RenderBenchmark(width, height, args.teams, args.events)
+        benchmark.run(args.repeat)
+        for line in benchmark.format() + benchmark.histogram.format():
+            print(line)
+        print()
+        reports.append(benchmark.getReport())
+
+    if args.json != "":
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=1)
+
+
+# Kick everything off in a nice way
+if __name__ == "__main__":
+    main()